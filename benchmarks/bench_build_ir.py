@@ -0,0 +1,129 @@
+"""
+Benchmark the LLVM-IR text round-trip used by `LLVMLiteIR.build`.
+
+It compares the previous build path, that kept the LLVM-IR text returned by
+`translate` before parsing it, with the memoized `LLVMLiteIR.parse`, for a
+single build and for a translate + build + JIT workflow on the same ASTx.
+
+Usage:
+
+    python benchmarks/bench_build_ir.py --functions 500 2000 [--memory]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from typing import Any, Callable
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from llvmlite import binding as llvm
+
+
+def make_module(n_functions: int, n_ops: int = 10) -> astx.Module:
+    """Create a module with many functions with arithmetic expressions."""
+    module = astx.Module()
+    for idx in range(n_functions):
+        arg = astx.Argument(name="x", type_=astx.Int32())
+        proto = astx.FunctionPrototype(
+            name=f"fn_{idx}",
+            args=astx.Arguments(arg),
+            return_type=astx.Int32(),
+        )
+        expr: astx.DataType = astx.Variable("x")
+        for value in range(n_ops):
+            expr = astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", expr, astx.LiteralInt32(value + 1)),
+                astx.Variable("x"),
+            )
+        block = astx.Block()
+        block.append(astx.FunctionReturn(expr))
+        module.block.append(astx.Function(prototype=proto, body=block))
+    return module
+
+
+def measure(fn: Callable[[], Any], memory: bool) -> tuple[float, float]:
+    """Return the wall time (s) and the peak of Python memory (MB)."""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del result
+    return elapsed, peak / 1024**2
+
+
+def build_text_path(n_functions: int) -> Any:
+    """Build the object keeping the complete LLVM-IR text (previous path)."""
+    builder = LLVMLiteIR()
+    ir_text = builder.translator.translate(make_module(n_functions))
+    module_ref = llvm.parse_assembly(ir_text)
+    module_ref.verify()
+    return ir_text, builder.translator.target_machine.emit_object(module_ref)
+
+
+def build_parse_path(n_functions: int) -> Any:
+    """Build the object from the memoized parsed module."""
+    builder = LLVMLiteIR()
+    module_ref = builder.parse(make_module(n_functions))
+    return builder.translator.target_machine.emit_object(module_ref)
+
+
+def workflow_text_path(n_functions: int) -> Any:
+    """Translate, build and JIT the same ASTx with the previous path."""
+    results = []
+    for _ in range(3):
+        # each step needed a new builder and a new LLVM-IR round-trip
+        builder = LLVMLiteIR()
+        ir_text = builder.translator.translate(make_module(n_functions))
+        results.append(llvm.parse_assembly(ir_text))
+    return results
+
+
+def workflow_parse_path(n_functions: int) -> Any:
+    """Translate, build and JIT the same ASTx with the memoized module."""
+    builder = LLVMLiteIR()
+    module = make_module(n_functions)
+    ir_text = builder.translate(module)
+    return ir_text, builder.parse(module), builder.compile(module)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--functions", type=int, nargs="+", default=[500, 2000]
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="trace the peak of Python memory (much slower)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'case':<22}{'functions':>10}{'time (s)':>12}{'peak (MB)':>12}")
+    for n_functions in args.functions:
+        for name, fn in (
+            ("build/text", build_text_path),
+            ("build/parse", build_parse_path),
+            ("workflow/text", workflow_text_path),
+            ("workflow/parse", workflow_parse_path),
+        ):
+            elapsed, peak = measure(
+                lambda: fn(n_functions),
+                args.memory,
+            )
+            print(f"{name:<22}{n_functions:>10}{elapsed:>12.3f}{peak:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the parallel batch build of `LLVMLiteIR.build_many`.
+
+It builds a batch of independent modules with a serial loop of
+`LLVMLiteIR().build()` and with `build_many` on process and thread pools of
+different sizes, and reports the speedup over the serial loop.
+
+Usage:
+
+    python benchmarks/bench_build_many.py --modules 32 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_module(n_functions: int, n_ops: int = 10) -> astx.Module:
+    """Create a module with arithmetic functions and a main function."""
+    module = astx.Module()
+    for idx in range(n_functions):
+        arg = astx.Argument(name="x", type_=astx.Int32())
+        proto = astx.FunctionPrototype(
+            name=f"fn_{idx}",
+            args=astx.Arguments(arg),
+            return_type=astx.Int32(),
+        )
+        expr: astx.DataType = astx.Variable("x")
+        for value in range(n_ops):
+            expr = astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", expr, astx.LiteralInt32(value + 1)),
+                astx.Variable("x"),
+            )
+        block = astx.Block()
+        block.append(astx.FunctionReturn(expr))
+        module.block.append(astx.Function(prototype=proto, body=block))
+
+    main_proto = astx.FunctionPrototype(
+        name="main", args=astx.Arguments(), return_type=astx.Int32()
+    )
+    main_block = astx.Block()
+    main_block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    module.block.append(astx.Function(prototype=main_proto, body=main_block))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=32)
+    parser.add_argument("--functions", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    modules = [make_module(args.functions) for _ in range(args.modules)]
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'case':<22}{'workers':>8}{'time (s)':>12}{'speedup':>10}")
+
+    with tempfile.TemporaryDirectory(prefix="irx") as tmp_dir:
+        output_files = [
+            os.path.join(tmp_dir, f"module_{idx}")
+            for idx in range(args.modules)
+        ]
+
+        start = time.perf_counter()
+        for module, output_file in zip(modules, output_files):
+            LLVMLiteIR().build(module, output_file)
+        serial = time.perf_counter() - start
+        print(f"{'serial':<22}{1:>8}{serial:>12.3f}{1:>10.2f}")
+
+        for executor in ("process", "thread"):
+            for workers in args.workers:
+                start = time.perf_counter()
+                results = LLVMLiteIR().build_many(
+                    modules, output_files, workers=workers, executor=executor
+                )
+                elapsed = time.perf_counter() - start
+                assert all(result.ok for result in results)
+                speedup = serial / elapsed
+                name = f"build_many/{executor}"
+                print(
+                    f"{name:<22}{workers:>8}{elapsed:>12.3f}{speedup:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark the construction cost of the LLVM-IR builder.
+
+It measures the first `LLVMLiteIR()` of the process, the following ones,
+and reusing a builder with `reset()` or with a `BuilderPool`. Each case
+also translates a small module, as a service would do for each request.
+
+Usage:
+
+    python benchmarks/bench_builder_construction.py --repeat 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from typing import Callable
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.pool import BuilderPool
+
+
+def make_module() -> astx.Module:
+    """Create a small module with a main function."""
+    proto = astx.FunctionPrototype(
+        name="main", args=astx.Arguments(), return_type=astx.Int32()
+    )
+    block = astx.Block()
+    block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    module = astx.Module()
+    module.block.append(astx.Function(prototype=proto, body=block))
+    return module
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """Return the average wall time of the given function, in ms."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    module = make_module()
+
+    print(f"{'case':<28}{'time (ms)':>12}")
+
+    first = measure(LLVMLiteIR, 1)
+    print(f"{'first LLVMLiteIR()':<28}{first:>12.4f}")
+
+    construction = measure(LLVMLiteIR, args.repeat)
+    print(f"{'LLVMLiteIR()':<28}{construction:>12.4f}")
+
+    def new_builder_translate() -> None:
+        LLVMLiteIR().translate(module)
+
+    elapsed = measure(new_builder_translate, args.repeat)
+    print(f"{'LLVMLiteIR() + translate':<28}{elapsed:>12.4f}")
+
+    builder = LLVMLiteIR()
+
+    def reset_translate() -> None:
+        builder.reset()
+        builder.translate(module)
+
+    elapsed = measure(reset_translate, args.repeat)
+    print(f"{'reset() + translate':<28}{elapsed:>12.4f}")
+
+    pool = BuilderPool(LLVMLiteIR)
+
+    def pool_translate() -> None:
+        with pool.builder() as pooled:
+            pooled.translate(module)
+
+    elapsed = measure(pool_translate, args.repeat)
+    print(f"{'pool + translate':<28}{elapsed:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
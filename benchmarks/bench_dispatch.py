@@ -0,0 +1,105 @@
+"""
+Benchmark the node dispatch of `LLVMLiteIRVisitor.visit`.
+
+It reports the translated nodes per second for modules of different sizes,
+and the calls per second of `visit` for a leaf node (`LiteralInt32`), both
+through the visitor instance (`visitor.visit(node)`, as the builder does)
+and through the plum function of the class
+(`LLVMLiteIRVisitor.visit(visitor, node)`).
+
+Usage:
+
+    python benchmarks/bench_dispatch.py --functions 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from typing import Callable
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR, LLVMLiteIRVisitor
+
+
+def make_module(n_functions: int, n_ops: int = 10) -> tuple[astx.Module, int]:
+    """Create a module with arithmetic functions and its number of nodes."""
+    module = astx.Module()
+    for idx in range(n_functions):
+        arg = astx.Argument(name="x", type_=astx.Int32())
+        proto = astx.FunctionPrototype(
+            name=f"fn_{idx}",
+            args=astx.Arguments(arg),
+            return_type=astx.Int32(),
+        )
+        expr: astx.DataType = astx.Variable("x")
+        for value in range(n_ops):
+            expr = astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", expr, astx.LiteralInt32(value + 1)),
+                astx.Variable("x"),
+            )
+        block = astx.Block()
+        block.append(astx.FunctionReturn(expr))
+        module.block.append(astx.Function(prototype=proto, body=block))
+
+    # module + (function, prototype, block, return, variable) per function
+    # + (2 binary ops, literal, variable) per operation
+    n_nodes = 1 + n_functions * (5 + 4 * n_ops)
+    return module, n_nodes
+
+
+def best_of(fn: Callable[[], None], repeat: int) -> float:
+    """Return the best wall time of the given function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--functions", type=int, nargs="+", default=[100, 1000]
+    )
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'size':>10}{'per second':>14}")
+
+    for n_functions in args.functions:
+        module, n_nodes = make_module(n_functions)
+
+        def translate() -> None:
+            LLVMLiteIR().translator.visit(module)
+
+        rate = n_nodes / best_of(translate, args.repeat)
+        print(f"{'translate (nodes)':<28}{n_nodes:>10}{rate:>14,.0f}")
+
+    visitor = LLVMLiteIR().translator
+    literal = astx.LiteralInt32(1)
+
+    def visit_instance() -> None:
+        for _ in range(args.calls):
+            visitor.visit(literal)
+
+    def visit_plum() -> None:
+        for _ in range(args.calls):
+            LLVMLiteIRVisitor.visit(visitor, literal)
+
+    for name, fn in (
+        ("visitor.visit (calls)", visit_instance),
+        ("plum visit (calls)", visit_plum),
+    ):
+        elapsed = best_of(fn, args.repeat)
+        print(f"{name:<28}{args.calls:>10}{args.calls / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
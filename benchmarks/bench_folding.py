@@ -0,0 +1,77 @@
+"""
+Benchmark the constant folding of the ASTx before the translation.
+
+The functions of the module return a sum of products of literals and of
+the argument `x` multiplied by 1, like the expressions of code generators.
+The module is parsed by LLVM (`LLVMLiteIR.parse`) with and without
+`fold_constants`, and it reports the time of the phases, the size of the
+LLVM-IR and the number of ASTx nodes removed.
+
+Usage:
+
+    python benchmarks/bench_folding.py --functions 200 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_module(n_functions: int, n_terms: int = 20) -> astx.Module:
+    """Create a module with functions with literal arithmetic."""
+    module = astx.Module()
+    for idx in range(n_functions):
+        expr: astx.DataType = astx.BinaryOp(
+            "*", astx.Variable("x"), astx.LiteralInt32(1)
+        )
+        for term in range(n_terms):
+            product = astx.BinaryOp(
+                "*", astx.LiteralInt32(term), astx.LiteralInt32(idx)
+            )
+            expr = astx.BinaryOp("+", expr, product)
+        proto = astx.FunctionPrototype(
+            name=f"f{idx}",
+            args=astx.Arguments(astx.Argument("x", astx.Int32())),
+            return_type=astx.Int32(),
+        )
+        block = astx.Block()
+        block.append(astx.FunctionReturn(expr))
+        module.block.append(astx.Function(prototype=proto, body=block))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, nargs="+", default=[200])
+    args = parser.parse_args()
+
+    print(
+        f"{'functions':>10}{'fold':>6}{'fold (ms)':>11}{'visit (ms)':>12}"
+        f"{'parse (ms)':>12}{'total (ms)':>12}{'IR (KB)':>9}{'removed':>9}"
+    )
+    for n_functions in args.functions:
+        module = make_module(n_functions)
+        for fold in (False, True):
+            builder = LLVMLiteIR(fold_constants=fold)
+            start = time.perf_counter()
+            builder.parse(module)
+            total = (time.perf_counter() - start) * 1000
+            phases = builder.stats.phases
+            size = len(str(builder.translator._llvm.module)) / 1024
+            print(
+                f"{n_functions:>10}{fold!s:>6}"
+                f"{phases.get('fold', 0) * 1000:>11.1f}"
+                f"{phases['visit'] * 1000:>12.1f}"
+                f"{phases['parse_assembly'] * 1000:>12.1f}"
+                f"{total:>12.1f}{size:>9.0f}{builder.folded_nodes:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark the incremental rebuild of a module after changing one function.
+
+It compares a full `LLVMLiteIR.build` with the first and the following
+builds of an `IncrementalBuilder`, where only one function changed. The
+last column is the number of functions compiled again.
+
+Usage:
+
+    python benchmarks/bench_incremental.py --functions 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+import astx
+
+from irx.builders.incremental import IncrementalBuilder
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_function(idx: int, n_ops: int = 10, offset: int = 0) -> astx.Function:
+    """Create a function with an arithmetic expression."""
+    arg = astx.Argument(name="x", type_=astx.Int32())
+    proto = astx.FunctionPrototype(
+        name=f"fn_{idx}", args=astx.Arguments(arg), return_type=astx.Int32()
+    )
+    expr: astx.DataType = astx.Variable("x")
+    for value in range(n_ops):
+        expr = astx.BinaryOp(
+            "+",
+            astx.BinaryOp("*", expr, astx.LiteralInt32(value + offset)),
+            astx.Variable("x"),
+        )
+    block = astx.Block()
+    block.append(astx.FunctionReturn(expr))
+    return astx.Function(prototype=proto, body=block)
+
+
+def make_module(functions: list[astx.Function]) -> astx.Module:
+    """Create a module with the given functions and a main function."""
+    module = astx.Module()
+    for fn in functions:
+        module.block.append(fn)
+
+    main_proto = astx.FunctionPrototype(
+        name="main", args=astx.Arguments(), return_type=astx.Int32()
+    )
+    main_block = astx.Block()
+    main_block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    module.block.append(astx.Function(prototype=main_proto, body=main_block))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, nargs="+", default=[1000])
+    parser.add_argument("--opt-level", type=int, default=2)
+    parser.add_argument("--shards", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'case':<24}{'functions':>10}{'time (s)':>12}{'compiled':>10}")
+
+    with tempfile.TemporaryDirectory(prefix="irx") as tmp_dir:
+        output_file = os.path.join(tmp_dir, "main")
+
+        for n_functions in args.functions:
+            functions = [make_function(idx) for idx in range(n_functions)]
+            module = make_module(functions)
+            functions[n_functions // 2] = make_function(
+                n_functions // 2, offset=1
+            )
+            changed_module = make_module(functions)
+
+            start = time.perf_counter()
+            LLVMLiteIR(opt_level=args.opt_level).build(module, output_file)
+            elapsed = time.perf_counter() - start
+            name = "full build"
+            print(f"{name:<24}{n_functions:>10}{elapsed:>12.3f}{'all':>10}")
+
+            builder = IncrementalBuilder(
+                opt_level=args.opt_level, shards=args.shards
+            )
+            for name, current in (
+                ("incremental first", module),
+                ("incremental 1 changed", changed_module),
+                ("incremental unchanged", changed_module),
+            ):
+                start = time.perf_counter()
+                builder.build(current, output_file)
+                elapsed = time.perf_counter() - start
+                compiled = len(builder.recompiled)
+                print(
+                    f"{name:<24}{n_functions:>10}{elapsed:>12.3f}{compiled:>10}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark nested numeric loops lowered by the LLVM-IR builder.
+
+The kernel sums `i * j` over two nested `ForRangeLoopStmt` (`n * n`
+iterations), as integers and as doubles (with and without fast-math). It is
+compiled with the JIT for each optimization level, and reports the compile
+time, the run time of the kernel and if LLVM vectorized the loop.
+
+Usage:
+
+    python benchmarks/bench_loops.py --n 2000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import astx
+
+from astx.types.base import AnyType
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_range(name: str, end: astx.Expr, body: astx.Block) -> astx.AST:
+    """Create a `for name in range(0, end)` loop."""
+    return astx.ForRangeLoopStmt(
+        variable=astx.InlineVariableDeclaration(
+            name, type_=astx.Int32(), value=astx.LiteralInt32(0)
+        ),
+        start=astx.LiteralInt32(0),
+        end=end,
+        step=astx.LiteralInt32(1),
+        body=body,
+    )
+
+
+def make_kernel(type_: AnyType) -> astx.Module:
+    """Create a function `kernel(n)` with two nested loops."""
+    proto = astx.FunctionPrototype(
+        name="kernel",
+        args=astx.Arguments(astx.Argument(name="n", type_=astx.Int32())),
+        return_type=type_,
+    )
+
+    inner_body = astx.Block()
+    inner_body.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable("acc"),
+            astx.BinaryOp(
+                "+",
+                astx.Variable("acc"),
+                astx.BinaryOp("*", astx.Variable("i"), astx.Variable("j")),
+            ),
+        )
+    )
+    outer_body = astx.Block()
+    outer_body.append(make_range("j", astx.Variable("n"), inner_body))
+
+    block = astx.Block()
+    block.append(
+        astx.VariableDeclaration(
+            name="acc", type_=type_, value=astx.LiteralInt32(0)
+        )
+    )
+    block.append(make_range("i", astx.Variable("n"), outer_body))
+    block.append(astx.FunctionReturn(astx.Variable("acc")))
+
+    module = astx.Module()
+    module.block.append(astx.Function(prototype=proto, body=block))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("int32", astx.Int32(), False),
+        ("float64", astx.Float64(), False),
+        ("float64 fast", astx.Float64(), True),
+    ]
+
+    print(
+        f"{'case':<16}{'opt':>4}{'compile (ms)':>14}{'run (ms)':>12}"
+        f"{'vectorized':>12}"
+    )
+    for name, type_, fast_math in cases:
+        module = make_kernel(type_)
+        for opt_level in (0, 1, 2, 3):
+            builder = LLVMLiteIR(opt_level=opt_level, fast_math=fast_math)
+
+            start = time.perf_counter()
+            jit_module = builder.jit(module)
+            compiled = (time.perf_counter() - start) * 1000
+            vectorized = "vector.body" in builder.translate(module)
+
+            kernel = jit_module["kernel"]
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                kernel(args.n)
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+
+            print(
+                f"{name:<16}{opt_level:>4}{compiled:>14.2f}"
+                f"{elapsed:>12.3f}{vectorized!s:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the compilation of a big module in parallel partitions.
+
+It compiles a module with many functions to object code with
+`LLVMLiteIR.emit_objects`, in one piece and split in partitions compiled by
+worker processes.
+
+Usage:
+
+    python benchmarks/bench_partitions.py --functions 2000 --partitions 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_module(n_functions: int, n_ops: int = 10) -> astx.Module:
+    """Create a module with many functions with arithmetic expressions."""
+    module = astx.Module()
+    for idx in range(n_functions):
+        arg = astx.Argument(name="x", type_=astx.Int32())
+        proto = astx.FunctionPrototype(
+            name=f"fn_{idx}",
+            args=astx.Arguments(arg),
+            return_type=astx.Int32(),
+        )
+        expr: astx.DataType = astx.Variable("x")
+        for value in range(n_ops):
+            expr = astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", expr, astx.LiteralInt32(value + 1)),
+                astx.Variable("x"),
+            )
+        block = astx.Block()
+        block.append(astx.FunctionReturn(expr))
+        module.block.append(astx.Function(prototype=proto, body=block))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=2000)
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--opt-level", type=int, default=2)
+    args = parser.parse_args()
+
+    module = make_module(args.functions)
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'partitions':>10}{'objects':>10}{'time (s)':>12}{'speedup':>10}")
+
+    baseline = 0.0
+    for partitions in args.partitions:
+        builder = LLVMLiteIR(opt_level=args.opt_level, partitions=partitions)
+        start = time.perf_counter()
+        objects = builder.emit_objects(module)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"{partitions:>10}{len(objects):>10}{elapsed:>12.3f}"
+            f"{baseline / elapsed:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark the profile-guided builds of branchy code.
+
+`main` runs a loop that calls `decide(x)` with pseudo-random numbers.
+`decide` is a chain of `if` statements where the `else` branches are taken
+much more often than the others, and the rare branches call `mix`, so they
+can't be turned into selects. The program is built with `-O2`, with the
+profile of an instrumented run (`profile_use`) and without it, and the best
+wall time of each executable is reported.
+
+Usage:
+
+    python benchmarks/bench_profile.py --iterations 100000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from typing import Any
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+# odd multipliers, so each branch tests different bits of the numbers
+MULTIPLIERS = (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+
+
+def make_function(
+    name: str, args: list[str], body: astx.Block
+) -> astx.Function:
+    """Create a function of `Int32` arguments that returns an `Int32`."""
+    proto = astx.FunctionPrototype(
+        name=name,
+        args=astx.Arguments(
+            *[astx.Argument(name=arg, type_=astx.Int32()) for arg in args]
+        ),
+        return_type=astx.Int32(),
+    )
+    return astx.Function(prototype=proto, body=body)
+
+
+def make_add(name: str, value: astx.DataType) -> astx.Block:
+    """Create a block with `name = name + value`."""
+    block = astx.Block()
+    block.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable(name),
+            astx.BinaryOp("+", astx.Variable(name), value),
+        )
+    )
+    return block
+
+
+def make_lcg_step(name: str) -> astx.AST:
+    """Create `name = name * 1103515245 + 12345`, wrapping around."""
+    return astx.BinaryOp(
+        "=",
+        astx.Variable(name),
+        astx.BinaryOp(
+            "+",
+            astx.BinaryOp(
+                "*", astx.Variable(name), astx.LiteralInt32(1103515245)
+            ),
+            astx.LiteralInt32(12345),
+        ),
+    )
+
+
+def make_mix() -> astx.Function:
+    """Create `mix(x)`, that runs 16 steps of the generator from `x`."""
+    loop_body = astx.Block()
+    loop_body.append(make_lcg_step("x"))
+    body = astx.Block()
+    body.append(
+        astx.ForRangeLoopStmt(
+            variable=astx.InlineVariableDeclaration(
+                "j", type_=astx.Int32(), value=astx.LiteralInt32(0)
+            ),
+            start=astx.LiteralInt32(0),
+            end=astx.LiteralInt32(16),
+            step=astx.LiteralInt32(1),
+            body=loop_body,
+        )
+    )
+    body.append(astx.FunctionReturn(astx.Variable("x")))
+    return make_function("mix", ["x"], body)
+
+
+def make_module(n_branches: int, iterations: int) -> astx.Module:
+    """
+    Create the decision code and a `main` that runs it.
+
+    `decide(x)` tests `x * k < threshold` for each branch, with a different
+    odd `k` for each branch and a threshold close to the minimum `Int32`,
+    so the common case is the `else` of each `if` (98% of the runs). `main`
+    passes the states of a linear congruential generator.
+    """
+    mix = make_mix()
+    body = astx.Block()
+    body.append(
+        astx.VariableDeclaration(
+            name="r", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        )
+    )
+    for idx in range(n_branches):
+        body.append(
+            astx.IfStmt(
+                condition=astx.BinaryOp(
+                    "<",
+                    astx.BinaryOp(
+                        "*",
+                        astx.Variable("x"),
+                        astx.LiteralInt32(MULTIPLIERS[idx % len(MULTIPLIERS)]),
+                    ),
+                    astx.LiteralInt32(-(2**31) + 2**25),
+                ),
+                then=make_add(
+                    "r", astx.FunctionCall(mix, [astx.Variable("r")])
+                ),
+                else_=make_add("r", astx.LiteralInt32(1)),
+            )
+        )
+    body.append(astx.FunctionReturn(astx.Variable("r")))
+    decide = make_function("decide", ["x"], body)
+
+    body = astx.Block()
+    for name in ("acc", "state"):
+        body.append(
+            astx.VariableDeclaration(
+                name=name, type_=astx.Int32(), value=astx.LiteralInt32(0)
+            )
+        )
+    loop_body = astx.Block()
+    loop_body.append(make_lcg_step("state"))
+    loop_body.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable("acc"),
+            astx.BinaryOp(
+                "+",
+                astx.Variable("acc"),
+                astx.FunctionCall(decide, [astx.Variable("state")]),
+            ),
+        )
+    )
+    body.append(
+        astx.ForRangeLoopStmt(
+            variable=astx.InlineVariableDeclaration(
+                "i", type_=astx.Int32(), value=astx.LiteralInt32(0)
+            ),
+            start=astx.LiteralInt32(0),
+            end=astx.LiteralInt32(iterations),
+            step=astx.LiteralInt32(1),
+            body=loop_body,
+        )
+    )
+    body.append(astx.FunctionReturn(astx.Variable("acc")))
+
+    module = astx.Module()
+    module.block.append(mix)
+    module.block.append(decide)
+    module.block.append(make_function("main", [], body))
+    return module
+
+
+def best_run(path: str, repeat: int) -> float:
+    """Return the best wall time of the executable, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([path], check=False)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--branches", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=100_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    module = make_module(args.branches, args.iterations)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        profile = os.path.join(tmp_dir, "profile.txt")
+        instrumented = os.path.join(tmp_dir, "instrumented")
+        LLVMLiteIR(opt_level=2, profile_generate=profile).build(
+            module, instrumented
+        )
+        subprocess.run([instrumented], check=False)
+
+        print(f"{'build':<20}{'seconds':>10}")
+        builds: list[tuple[str, dict[str, Any]]] = [
+            ("-O2", {}),
+            ("-O2 + profile", {"profile_use": profile}),
+        ]
+        for name, options in builds:
+            output_file = os.path.join(tmp_dir, "main")
+            LLVMLiteIR(opt_level=2, **options).build(module, output_file)
+            elapsed = best_run(output_file, args.repeat)
+            print(f"{name:<20}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark the pruning of the functions that are not reachable from main.
+
+The module has many small functions, like a library linked by a code
+generator, and `main` only calls a chain of a few of them. The object of
+the module is emitted (`LLVMLiteIR.emit_objects`) with and without
+`roots=["main"]`, and it reports the time of the phases, the size of the
+LLVM-IR and of the object, and the number of functions removed.
+
+Usage:
+
+    python benchmarks/bench_pruning.py --functions 200 1000 --used 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_module(n_functions: int, n_used: int) -> astx.Module:
+    """Create a module where main calls `n_used` of the functions."""
+    module = astx.Module()
+    functions = []
+    for idx in range(n_functions):
+        proto = astx.FunctionPrototype(
+            name=f"f{idx}",
+            args=astx.Arguments(astx.Argument("x", astx.Int32())),
+            return_type=astx.Int32(),
+        )
+        expr: astx.DataType = astx.Variable("x")
+        for term in range(1, 10):
+            expr = astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", expr, astx.Variable("x")),
+                astx.LiteralInt32(term),
+            )
+        block = astx.Block()
+        block.append(astx.FunctionReturn(expr))
+        functions.append(astx.Function(prototype=proto, body=block))
+        module.block.append(functions[-1])
+
+    call: astx.DataType = astx.LiteralInt32(1)
+    for function in functions[:n_used]:
+        call = astx.FunctionCall(function, [call])
+    main_proto = astx.FunctionPrototype(
+        name="main", args=astx.Arguments(), return_type=astx.Int32()
+    )
+    main_block = astx.Block()
+    main_block.append(astx.FunctionReturn(call))
+    module.block.append(astx.Function(prototype=main_proto, body=main_block))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, nargs="+", default=[200])
+    parser.add_argument("--used", type=int, default=10)
+    parser.add_argument("--opt-level", type=int, default=2)
+    args = parser.parse_args()
+
+    print(
+        f"{'functions':>10}{'roots':>7}{'prune (ms)':>12}{'visit (ms)':>12}"
+        f"{'optimize (ms)':>15}{'total (ms)':>12}{'IR (KB)':>9}"
+        f"{'object (KB)':>13}{'removed':>9}"
+    )
+    for n_functions in args.functions:
+        module = make_module(n_functions, args.used)
+        for roots in (None, ["main"]):
+            builder = LLVMLiteIR(opt_level=args.opt_level, roots=roots)
+            start = time.perf_counter()
+            (object_data,) = builder.emit_objects(module)
+            total = (time.perf_counter() - start) * 1000
+            phases = builder.stats.phases
+            size = len(str(builder.translator._llvm.module)) / 1024
+            print(
+                f"{n_functions:>10}{roots is not None!s:>7}"
+                f"{phases.get('prune', 0) * 1000:>12.1f}"
+                f"{phases['visit'] * 1000:>12.1f}"
+                f"{phases['optimize'] * 1000:>15.1f}"
+                f"{total:>12.1f}{size:>9.0f}"
+                f"{len(object_data) / 1024:>13.1f}"
+                f"{builder.pruned_functions:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark the scopes of `ScopedSymbolTable`.
+
+It nests the given number of scopes, defines a few names in each one and
+looks up a name of the outermost scope from the innermost one, and reports
+the operations per second of `ScopedSymbolTable` and of a chain of
+dictionaries (`collections.ChainMap`), where a lookup is linear in the depth.
+
+Usage:
+
+    python benchmarks/bench_symbol_table.py --depth 1 10 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import time
+
+from collections import ChainMap
+from typing import Any, Callable
+
+from irx.builders.symbol_table import ScopedSymbolTable
+
+
+def best_of(fn: Callable[[], None], repeat: int) -> float:
+    """Return the best wall time of the given function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_table(depth: int, n_names: int, n_lookups: int) -> None:
+    """Nest the scopes of a `ScopedSymbolTable` and look up the names."""
+    table = ScopedSymbolTable()
+    for level in range(depth):
+        table.push_scope()
+        for idx in range(n_names):
+            table.define(f"v{level}_{idx}", idx)
+        for _ in range(n_lookups):
+            table.get("v0_0")
+    for _ in range(depth):
+        table.pop_scope()
+
+
+def run_chain_map(depth: int, n_names: int, n_lookups: int) -> None:
+    """Nest the scopes of a `ChainMap` and look up the names."""
+    table: ChainMap[str, Any] = ChainMap()
+    for level in range(depth):
+        table = table.new_child()
+        for idx in range(n_names):
+            table[f"v{level}_{idx}"] = idx
+        for _ in range(n_lookups):
+            table.get("v0_0")
+    for _ in range(depth):
+        table = table.parents
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--names", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'table':<20}{'depth':>8}{'ops per second':>18}")
+
+    for depth in args.depth:
+        n_ops = depth * (args.names + args.lookups + 2)
+        for name, run in (
+            ("ScopedSymbolTable", run_table),
+            ("ChainMap", run_chain_map),
+        ):
+            elapsed = best_of(
+                functools.partial(run, depth, args.names, args.lookups),
+                args.repeat,
+            )
+            print(f"{name:<20}{depth:>8}{n_ops / elapsed:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
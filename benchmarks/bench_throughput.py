@@ -0,0 +1,297 @@
+"""
+Benchmark the throughput of the compiler phases for synthetic modules.
+
+The ASTx modules are generated with a controlled shape and size (the
+number of ASTx nodes):
+
+- `deep`: functions that return deep expression trees;
+- `functions`: many small functions;
+- `loops`: functions with nested `ForRangeLoopStmt`;
+- `wide`: functions with wide `Block`s of statements.
+
+For each module it measures the nodes/sec of `translate` (ASTx to LLVM-IR
+text), `parse_assembly` (LLVM-IR text to a verified LLVM module),
+`emit_object` and link, and the peak RSS of the process. Each case runs in
+a new process, so the peak RSS is not inherited from the previous cases.
+
+The results are written as JSON (see `--output`), and can be compared with
+the results of a previous release with `--baseline`.
+
+Usage:
+
+    python benchmarks/bench_throughput.py --sizes 1000 10000 100000
+    python benchmarks/bench_throughput.py --output new.json
+    python benchmarks/bench_throughput.py --baseline new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+import astx
+import irx
+import llvmlite
+
+from irx.builders.llvmliteir import LLVMLiteIR, link_objects
+from irx.builders.partition import count_nodes
+from llvmlite import binding as llvm
+
+PHASES = ("translate", "parse_assembly", "emit_object", "link")
+
+# depth of the expression trees of the `deep` shape, and nesting level of
+# the loops of the `loops` shape
+EXPRESSION_DEPTH = 100
+LOOP_NESTING = 4
+# number of statements of each block of the `wide` shape
+BLOCK_WIDTH = 200
+
+
+def make_function(name: str, block: astx.Block) -> astx.Function:
+    """Create a function `name(x: int32) -> int32` with the given body."""
+    proto = astx.FunctionPrototype(
+        name=name,
+        args=astx.Arguments(astx.Argument(name="x", type_=astx.Int32())),
+        return_type=astx.Int32(),
+    )
+    return astx.Function(prototype=proto, body=block)
+
+
+def make_main() -> astx.Function:
+    """Create the `main` function, so the module can be linked."""
+    proto = astx.FunctionPrototype(
+        name="main", args=astx.Arguments(), return_type=astx.Int32()
+    )
+    block = astx.Block()
+    block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    return astx.Function(prototype=proto, body=block)
+
+
+def make_expression(depth: int) -> astx.DataType:
+    """Create an expression tree `((x + 1) * x + 2) * x ...`."""
+    expr: astx.DataType = astx.Variable("x")
+    for idx in range(depth):
+        if idx % 2 == 0:
+            expr = astx.BinaryOp("+", expr, astx.LiteralInt32(idx))
+        else:
+            expr = astx.BinaryOp("*", expr, astx.Variable("x"))
+    return expr
+
+
+def make_deep(idx: int) -> astx.Function:
+    """Create a function that returns a deep expression tree."""
+    block = astx.Block()
+    block.append(astx.FunctionReturn(make_expression(EXPRESSION_DEPTH)))
+    return make_function(f"deep_{idx}", block)
+
+
+def make_small(idx: int) -> astx.Function:
+    """Create a small function."""
+    block = astx.Block()
+    block.append(astx.FunctionReturn(make_expression(2)))
+    return make_function(f"small_{idx}", block)
+
+
+def make_loops(idx: int) -> astx.Function:
+    """Create a function with nested loops."""
+    body = astx.Block()
+    body.append(astx.BinaryOp("+", astx.Variable("x"), astx.LiteralInt32(1)))
+    for level in range(LOOP_NESTING):
+        loop = astx.ForRangeLoopStmt(
+            variable=astx.InlineVariableDeclaration(
+                f"i_{level}",
+                type_=astx.Int32(),
+                value=astx.LiteralInt32(0),
+            ),
+            start=astx.LiteralInt32(0),
+            end=astx.LiteralInt32(10),
+            step=astx.LiteralInt32(1),
+            body=body,
+        )
+        body = astx.Block()
+        body.append(loop)
+
+    body.append(astx.FunctionReturn(astx.Variable("x")))
+    return make_function(f"loops_{idx}", body)
+
+
+def make_wide(idx: int) -> astx.Function:
+    """Create a function with a wide block of statements."""
+    block = astx.Block()
+    for value in range(BLOCK_WIDTH):
+        block.append(
+            astx.BinaryOp("+", astx.Variable("x"), astx.LiteralInt32(value))
+        )
+    block.append(astx.FunctionReturn(astx.Variable("x")))
+    return make_function(f"wide_{idx}", block)
+
+
+SHAPES: dict[str, Callable[[int], astx.Function]] = {
+    "deep": make_deep,
+    "functions": make_small,
+    "loops": make_loops,
+    "wide": make_wide,
+}
+
+
+def make_module(shape: str, size: int) -> astx.Module:
+    """Create a module with the given shape and about `size` nodes."""
+    make = SHAPES[shape]
+    module = astx.Module()
+    module.block.append(make_main())
+    n_nodes = count_nodes(module)
+    idx = 0
+    while n_nodes < size:
+        function = make(idx)
+        module.block.append(function)
+        n_nodes += count_nodes(function)
+        idx += 1
+    return module
+
+
+def get_peak_rss() -> int:
+    """Return the peak RSS of the process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # the peak is in KB on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(shape: str, size: int) -> dict[str, Any]:
+    """Run all the phases for a module, in the current process."""
+    module = make_module(shape, size)
+    n_nodes = count_nodes(module)
+    builder = LLVMLiteIR()
+    target_machine = builder.translator.target_machine
+
+    elapsed = {}
+
+    start = time.perf_counter()
+    ir_text = builder.translate(module)
+    elapsed["translate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    module_ref = llvm.parse_assembly(ir_text)
+    module_ref.verify()
+    elapsed["parse_assembly"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    object_data = target_machine.emit_object(module_ref)
+    elapsed["emit_object"] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix="irx") as tmp_dir:
+        start = time.perf_counter()
+        link_objects([object_data], os.path.join(tmp_dir, "main"))
+        elapsed["link"] = time.perf_counter() - start
+
+    return {
+        "shape": shape,
+        "size": size,
+        "nodes": n_nodes,
+        "phases": {
+            phase: {
+                "seconds": elapsed[phase],
+                "nodes_per_sec": n_nodes / elapsed[phase],
+            }
+            for phase in PHASES
+        },
+        "peak_rss": get_peak_rss(),
+    }
+
+
+def get_metadata() -> dict[str, Any]:
+    """Return the versions and the host of the benchmark."""
+    return {
+        "irx": irx.__version__,
+        "llvmlite": llvmlite.__version__,
+        "llvm": ".".join(map(str, llvm.llvm_version_info)),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu": llvm.get_host_cpu_name(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline_file: str) -> None:
+    """Print the speedup of each phase over the baseline results."""
+    with open(baseline_file) as f:
+        baseline = {
+            (item["shape"], item["size"]): item
+            for item in json.load(f)["results"]
+        }
+
+    print(f"\n{'shape':<12}{'size':>10}", end="")
+    print("".join(f"{phase:>16}" for phase in PHASES), f"{'rss':>8}")
+    for item in results:
+        previous = baseline.get((item["shape"], item["size"]))
+        if previous is None:
+            continue
+        ratios = [
+            item["phases"][phase]["nodes_per_sec"]
+            / previous["phases"][phase]["nodes_per_sec"]
+            for phase in PHASES
+        ]
+        rss = item["peak_rss"] / previous["peak_rss"]
+        print(f"{item['shape']:<12}{item['size']:>10}", end="")
+        print("".join(f"{ratio:>15.2f}x" for ratio in ratios), f"{rss:>7.2f}x")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument(
+        "--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES)
+    )
+    parser.add_argument("--output", help="write the results to a JSON file")
+    parser.add_argument(
+        "--baseline", help="compare with the results in a JSON file"
+    )
+    args = parser.parse_args()
+
+    print(f"{'shape':<12}{'size':>10}{'nodes':>10}", end="")
+    print("".join(f"{phase:>16}" for phase in PHASES), f"{'rss (MB)':>10}")
+
+    results = []
+    # a new process for each case, for the peak RSS
+    context = multiprocessing.get_context("spawn")
+    for shape in args.shapes:
+        for size in args.sizes:
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                result = executor.submit(run_case, shape, size).result()
+            results.append(result)
+
+            print(f"{shape:<12}{size:>10}{result['nodes']:>10}", end="")
+            print(
+                "".join(
+                    f"{result['phases'][phase]['nodes_per_sec']:>16,.0f}"
+                    for phase in PHASES
+                ),
+                f"{result['peak_rss'] / 1024**2:>10.1f}",
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"metadata": get_metadata(), "results": results}, f, indent=2
+            )
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark a batch function against calling the scalar function per element.
+
+The scalar function `f(x, y) = x * y + 1` is compiled with its batch
+function (see `make_batch_function`), and both are called over NumPy arrays
+of doubles: the scalar function once per element from Python, the batch
+function once for the whole arrays with `Ufunc`.
+
+Usage:
+
+    python benchmarks/bench_ufunc.py --n 100000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import astx
+import numpy as np
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.ufunc import get_ufunc, make_batch_function
+
+
+def make_module() -> astx.Module:
+    """Create a module with `f(x, y)` and its batch function."""
+    proto = astx.FunctionPrototype(
+        name="f",
+        args=astx.Arguments(
+            astx.Argument("x", astx.Float64()),
+            astx.Argument("y", astx.Float64()),
+        ),
+        return_type=astx.Float64(),
+    )
+    block = astx.Block()
+    block.append(
+        astx.FunctionReturn(
+            astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", astx.Variable("x"), astx.Variable("y")),
+                astx.LiteralFloat64(1),
+            )
+        )
+    )
+    function = astx.Function(prototype=proto, body=block)
+
+    module = astx.Module()
+    module.block.append(function)
+    module.block.append(make_batch_function(function))
+    return module
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    x = np.random.rand(args.n)
+    y = np.random.rand(args.n)
+
+    print(f"{'opt':>4}{'scalar (ms)':>14}{'batch (ms)':>14}{'speedup':>10}")
+    for opt_level in (0, 2):
+        jit_module = LLVMLiteIR(opt_level=opt_level).jit(make_module())
+        scalar = jit_module["f"]
+        batch = get_ufunc(jit_module, "f")
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for x_value, y_value in zip(x.tolist(), y.tolist()):
+                scalar(x_value, y_value)
+        scalar_time = (time.perf_counter() - start) / args.repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            batch(x, y)
+        batch_time = (time.perf_counter() - start) / args.repeat * 1000
+
+        print(
+            f"{opt_level:>4}{scalar_time:>14.2f}{batch_time:>14.3f}"
+            f"{scalar_time / batch_time:>10.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Analyses of the ASTx subtrees used by the lowering of the statements."""
+
+from __future__ import annotations
+
+import astx
+
+from public import public
+
+from irx.builders.buffers import (
+    BufferLength,
+    BufferLoad,
+    BufferType,
+    VectorLoad,
+)
+from irx.builders.partition import _children
+
+# the nodes that only read their buffer
+READ_BUFFER_NODES = (BufferLength, BufferLoad, VectorLoad)
+
+
+@public
+def get_assigned_variables(node: astx.AST) -> set[str]:
+    """Get the name of the variables assigned inside the given subtree."""
+    names = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if (
+            isinstance(current, astx.BinaryOp)
+            and current.op_code == "="
+            and isinstance(current.lhs, astx.Variable)
+        ):
+            names.add(current.lhs.name)
+        stack.extend(_children(current))
+    return names
+
+
+@public
+def get_written_buffers(expr: astx.AST) -> dict[str, list[bool]]:
+    """
+    Check which buffer arguments each function of the ASTx can write to.
+
+    A buffer only used by `BufferLoad`, `VectorLoad` and `BufferLength` is
+    read-only, any other use (e.g. a store or a call) can write to it.
+
+    Parameters
+    ----------
+        expr (astx.AST): A module or a function.
+
+    Returns
+    -------
+        dict[str, list[bool]]: For each function, by name, if each of its
+            buffer arguments can be written.
+    """
+    nodes = expr.nodes if isinstance(expr, astx.Module) else [expr]
+    written_buffers = {}
+    for node in nodes:
+        if not isinstance(node, astx.Function):
+            continue
+        names = [
+            arg.name
+            for arg in node.prototype.args.nodes
+            if isinstance(arg, astx.Argument)
+            and isinstance(arg.type_, BufferType)
+        ]
+        written = set()
+        stack = [node.body]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, astx.Variable) and current.name in names:
+                written.add(current.name)
+            children = _children(current)
+            if isinstance(current, READ_BUFFER_NODES):
+                children = [
+                    child for child in children if child is not current.buffer
+                ]
+            stack.extend(children)
+        written_buffers[node.prototype.name] = [
+            name in written for name in names
+        ]
+    return written_buffers
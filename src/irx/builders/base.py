@@ -4,17 +4,136 @@ from __future__ import annotations
 
 import os
 import sys
+import threading
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from types import GeneratorType, MethodType
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generator,
+    Optional,
+    cast,
+)
 
 import astx
 
-from plum import dispatch
+from plum import Function, Signature, dispatch
+
+from irx.builders.stats import BuildStats
+
+# plum resolves and registers the methods lazily, so the first resolution
+# of a node type is serialized between threads
+_RESOLVE_LOCK = threading.Lock()
+
+# the `visit` methods that translate the children of a node are generators
+# that yield each child: the child is translated (its results pushed to the
+# result stack) before the method is resumed. `self.visit` can still be
+# called for the nodes that aren't part of the ASTx being translated.
+VisitGenerator = Generator[astx.AST, None, None]
+
+
+def _visit_fast(self: BuilderVisitor, expr: astx.AST) -> None:
+    """
+    Translate the given node and its subtree, without recursion.
+
+    The children yielded by the generators are translated with a worklist
+    of suspended generators, so the depth of the ASTx isn't limited.
+    """
+    table = self._visit_table
+    resolve_visit = type(self).resolve_visit
+
+    try:
+        method = table[type(expr)]
+    except KeyError:
+        method = resolve_visit(type(expr))
+    generator = method(self, expr)
+    if type(generator) is not GeneratorType:
+        return
+
+    worklist = [generator]
+    while worklist:
+        try:
+            node = worklist[-1].send(None)
+        except StopIteration:
+            worklist.pop()
+            continue
+
+        try:
+            method = table[type(node)]
+        except KeyError:
+            method = resolve_visit(type(node))
+        generator = method(self, node)
+        if type(generator) is GeneratorType:
+            worklist.append(generator)
+
+
+class VisitDispatcher:
+    """
+    Fast-path dispatch for the `visit` methods of a builder visitor.
+
+    The method is resolved by plum once per node type and cached in a
+    table of the visitor class.
+    """
+
+    def __init__(self, function: Function) -> None:
+        """Initialize VisitDispatcher object."""
+        self.function = function
+
+    def __get__(
+        self, instance: Optional[BuilderVisitor], owner: type
+    ) -> Callable[..., Any]:
+        """Return the plum function, or the fast-path bound method."""
+        # from the class, subclasses can add methods with `@dispatch`
+        if instance is None:
+            return self.function
+        # the results aren't converted to the annotated return types
+        return MethodType(_visit_fast, instance)
 
 
 class BuilderVisitor:
-    """Builder translator visitor."""
+    """
+    Builder translator visitor.
+
+    The `visit` methods should yield the children to be translated, instead
+    of calling `self.visit`, so deep ASTx don't need a deep Python stack.
+    """
+
+    _visit_table: ClassVar[Dict[type, Callable[..., Any]]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Wrap the plum `visit` of the subclass in a VisitDispatcher."""
+        super().__init_subclass__(**kwargs)
+        # each class has its own table, as the methods can be overridden
+        cls._visit_table = {}
+        visit = cls.__dict__.get("visit")
+        if isinstance(visit, Function):
+            cls.visit = VisitDispatcher(visit)  # type: ignore[assignment]
+
+    @classmethod
+    def resolve_visit(cls, node_type: type) -> Callable[..., Any]:
+        """
+        Resolve and cache the `visit` method for the given node type.
+
+        Parameters
+        ----------
+            node_type (type): The concrete ASTx node type.
+
+        Returns
+        -------
+            Callable: The method that translates nodes of this type.
+        """
+        signature = Signature(cls, node_type)
+        with _RESOLVE_LOCK:
+            method, _ = cast(Function, cls.visit).resolve_method(signature)
+            # methods inherited from a parent class resolve to its plum
+            # function
+            while isinstance(method, Function):
+                method, _ = method.resolve_method(signature)
+        cls._visit_table[node_type] = method
+        return method
 
     def translate(self, expr: astx.AST) -> str:
         """
@@ -27,6 +146,10 @@ class BuilderVisitor:
         """
         raise Exception("Not implemented yet.")
 
+    def reset(self) -> None:
+        """Reset the translator state for a new ASTx."""
+        raise Exception("Not implemented yet.")
+
     @dispatch.abstract
     def visit(self, expr: astx.AST) -> None:
         """Translate an ASTx expression."""
@@ -114,6 +237,7 @@ class Builder(ABC):
     translator: BuilderVisitor
     tmp_path: str
     output_file: str
+    stats: BuildStats
 
     sh_args: Dict[str, Any]
 
@@ -122,6 +246,7 @@ class Builder(ABC):
         self.translator = BuilderVisitor()
         self.tmp_path = ""
         self.output_file = ""
+        self.stats = BuildStats()
         self.sh_args: Dict[str, Any] = dict(
             _in=sys.stdin,
             _out=sys.stdout,
@@ -130,6 +255,13 @@ class Builder(ABC):
             # _new_session=True,
         )
 
+    def reset(self) -> None:
+        """Reset the builder state, so it can be reused for a new ASTx."""
+        self.translator.reset()
+        self.tmp_path = ""
+        self.output_file = ""
+        self.stats.clear()
+
     def module(self) -> astx.Module:
         """Create a new ASTx Module."""
         return astx.Module()
@@ -143,7 +275,7 @@ class Builder(ABC):
         self,
         expr: astx.AST,
         output_file: str,  # noqa: F841, RUF100
-    ) -> None:
+    ) -> Optional[BuildStats]:
         """Transpile ASTx to LLVM-IR and build an executable file."""
         ...
 
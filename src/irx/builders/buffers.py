@@ -0,0 +1,305 @@
+"""ASTx types and nodes for buffers (arrays) and SIMD vectors."""
+
+from __future__ import annotations
+
+from typing import cast
+
+import astx
+
+from astx.base import NO_SOURCE_LOCATION, ReprStruct, SourceLocation
+from astx.types.base import AnyType
+from public import public
+
+# the scalar types that can be the elements of buffers and vectors
+ELEMENT_TYPES = (
+    astx.Int8,
+    astx.Int16,
+    astx.Int32,
+    astx.Int64,
+    astx.Float32,
+    astx.Float64,
+)
+
+# the operations supported by `VectorReduce`
+REDUCE_OPERATIONS = ("+", "*")
+
+
+def _check_element_type(element_type: astx.DataType) -> None:
+    if not isinstance(element_type, ELEMENT_TYPES):
+        raise Exception(
+            f"[EE]: element type not supported: {type(element_type).__name__}"
+        )
+
+
+def _element_type(node: astx.AST) -> astx.DataType:
+    """Get the element type of a buffer or vector node, if it is known."""
+    element_type = getattr(getattr(node, "type_", None), "element_type", None)
+    return element_type if element_type is not None else AnyType()
+
+
+def _struct(node: astx.AST, simplified: bool) -> ReprStruct:
+    value = {
+        key: item.get_struct(simplified)
+        for key, item in vars(node).items()
+        if key not in ("parent", "type_") and isinstance(item, astx.AST)
+    }
+    return node._prepare_struct(
+        f"{type(node).__name__.upper()}", cast(ReprStruct, value), simplified
+    )
+
+
+@public
+class BufferType(astx.DataType):
+    """
+    A contiguous buffer of scalar elements, e.g. a NumPy array.
+
+    It can only be the type of a function argument, lowered to the pointer
+    to the first element and the length (`int64`).
+    """
+
+    element_type: astx.DataType
+
+    def __init__(
+        self,
+        element_type: astx.DataType,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """
+        Initialize BufferType object.
+
+        Parameters
+        ----------
+            element_type (astx.DataType): The scalar type of the elements,
+                e.g. `astx.Float64()`.
+            loc (SourceLocation): The source location.
+        """
+        super().__init__(loc=loc)
+        _check_element_type(element_type)
+        self.element_type = element_type
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return _struct(self, simplified)
+
+
+@public
+class VectorType(astx.DataType):
+    """A SIMD vector of scalar elements, lowered to a LLVM vector type."""
+
+    element_type: astx.DataType
+    width: int
+
+    def __init__(
+        self,
+        element_type: astx.DataType,
+        width: int,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """
+        Initialize VectorType object.
+
+        Parameters
+        ----------
+            element_type (astx.DataType): The scalar type of the lanes.
+            width (int): The number of lanes.
+            loc (SourceLocation): The source location.
+        """
+        super().__init__(loc=loc)
+        _check_element_type(element_type)
+        if width < 1:
+            raise Exception("[EE]: width must be positive.")
+        self.element_type = element_type
+        self.width = width
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return self._prepare_struct(
+            f"VECTORTYPE[{self.width}]",
+            self.element_type.get_struct(simplified),
+            simplified,
+        )
+
+
+@public
+class BufferLength(astx.DataTypeOps):
+    """The number of elements of a buffer, as `int64`."""
+
+    buffer: astx.AST
+
+    def __init__(
+        self, buffer: astx.AST, loc: SourceLocation = NO_SOURCE_LOCATION
+    ) -> None:
+        """Initialize BufferLength object."""
+        super().__init__(loc=loc)
+        self.buffer = buffer
+        self.type_ = astx.Int64()
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return _struct(self, simplified)
+
+
+@public
+class BufferLoad(astx.DataTypeOps):
+    """
+    Load the element of a buffer at the given index (`buffer[index]`).
+
+    The index is not checked against the length of the buffer.
+    """
+
+    buffer: astx.AST
+    index: astx.AST
+
+    def __init__(
+        self,
+        buffer: astx.AST,
+        index: astx.AST,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """
+        Initialize BufferLoad object.
+
+        Parameters
+        ----------
+            buffer (astx.AST): The buffer, e.g. an `astx.Variable`.
+            index (astx.AST): The index of the element.
+            loc (SourceLocation): The source location.
+        """
+        super().__init__(loc=loc)
+        self.buffer = buffer
+        self.index = index
+        self.type_ = _element_type(buffer)
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return _struct(self, simplified)
+
+
+@public
+class BufferStore(astx.StatementType):
+    """
+    Store a value in the element of a buffer (`buffer[index] = value`).
+
+    The value is converted to the element type, and the index is not
+    checked against the length of the buffer.
+    """
+
+    buffer: astx.AST
+    index: astx.AST
+    value: astx.AST
+
+    def __init__(
+        self,
+        buffer: astx.AST,
+        index: astx.AST,
+        value: astx.AST,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """Initialize BufferStore object."""
+        super().__init__(loc=loc)
+        self.buffer = buffer
+        self.index = index
+        self.value = value
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return _struct(self, simplified)
+
+
+@public
+class VectorLoad(astx.DataTypeOps):
+    """
+    Load `width` consecutive elements of a buffer, from `index`, as a vector.
+
+    The elements don't need to be aligned to the vector size.
+    """
+
+    buffer: astx.AST
+    index: astx.AST
+    width: int
+
+    def __init__(
+        self,
+        buffer: astx.AST,
+        index: astx.AST,
+        width: int,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """Initialize VectorLoad object."""
+        super().__init__(loc=loc)
+        if width < 1:
+            raise Exception("[EE]: width must be positive.")
+        self.buffer = buffer
+        self.index = index
+        self.width = width
+        element_type = _element_type(buffer)
+        self.type_ = (
+            VectorType(element_type, width)
+            if isinstance(element_type, ELEMENT_TYPES)
+            else AnyType()
+        )
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return _struct(self, simplified)
+
+
+@public
+class VectorStore(astx.StatementType):
+    """Store the lanes of a vector in consecutive elements of a buffer."""
+
+    buffer: astx.AST
+    index: astx.AST
+    value: astx.AST
+
+    def __init__(
+        self,
+        buffer: astx.AST,
+        index: astx.AST,
+        value: astx.AST,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """Initialize VectorStore object."""
+        super().__init__(loc=loc)
+        self.buffer = buffer
+        self.index = index
+        self.value = value
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return _struct(self, simplified)
+
+
+@public
+class VectorReduce(astx.DataTypeOps):
+    """
+    Reduce the lanes of a vector to a scalar, with `+` or `*`.
+
+    The lanes are combined in order, from the first to the last one, so
+    the result of a floating-point reduction doesn't depend on fast-math.
+    """
+
+    op_code: str
+    value: astx.AST
+
+    def __init__(
+        self,
+        op_code: str,
+        value: astx.AST,
+        loc: SourceLocation = NO_SOURCE_LOCATION,
+    ) -> None:
+        """Initialize VectorReduce object."""
+        super().__init__(loc=loc)
+        if op_code not in REDUCE_OPERATIONS:
+            raise Exception(f"[EE]: reduce operation not valid: {op_code}")
+        self.op_code = op_code
+        self.value = value
+        self.type_ = _element_type(value)
+
+    def get_struct(self, simplified: bool = False) -> ReprStruct:
+        """Return the AST structure of the object."""
+        return self._prepare_struct(
+            f"VECTORREDUCE[{self.op_code}]",
+            self.value.get_struct(simplified),
+            simplified,
+        )
@@ -0,0 +1,334 @@
+"""Content-addressed cache for the files generated by the builders."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import astx
+
+from public import public
+
+# attributes that don't change the semantics of a node
+IGNORED_ATTRIBUTES = {"comment", "loc", "parent", "position", "ref"}
+# name automatically generated by astx for data type nodes
+TEMP_NAME_PATTERN = re.compile(r"^temp_\d+$")
+
+DEFAULT_MAX_SIZE = 512 * 1024**2
+
+
+class _Token:
+    """Marker used by the fingerprint traversal."""
+
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+
+_NODE_END = _Token(">")
+_LIST_END = _Token("]")
+_DICT_END = _Token("}")
+_ITEM_SEPARATOR = _Token(",")
+_TYPE_TOKENS: dict[type, str] = {}
+_KEY_TOKENS: dict[str, _Token] = {}
+
+
+def _type_token(node_type: type) -> str:
+    token = _TYPE_TOKENS.get(node_type)
+    if token is None:
+        token = f"<{node_type.__module__}.{node_type.__name__}"
+        _TYPE_TOKENS[node_type] = token
+    return token
+
+
+def _key_token(key: str) -> _Token:
+    token = _KEY_TOKENS.get(key)
+    if token is None:
+        token = _Token(f".{key}=")
+        _KEY_TOKENS[key] = token
+    return token
+
+
+def _node_items(
+    node: astx.AST, calls_by_name: bool = False
+) -> list[tuple[str, Any]]:
+    items = []
+    for key, value in vars(node).items():
+        if key in IGNORED_ATTRIBUTES:
+            continue
+        if (
+            calls_by_name
+            and key == "fn"
+            and isinstance(node, astx.FunctionCall)
+        ):
+            items.append((key, value.name))
+            continue
+        if (
+            key == "name"
+            and isinstance(node, astx.DataType)
+            and isinstance(value, str)
+            and TEMP_NAME_PATTERN.match(value)
+        ):
+            continue
+        items.append((key, value))
+    # the keys are unique, so the values are never compared
+    items.sort()
+    return items
+
+
+@public
+def ast_fingerprint(node: Any, calls_by_name: bool = False) -> str:
+    """
+    Compute a stable structural hash for the given ASTx tree.
+
+    Parameters
+    ----------
+        node: The ASTx node (or a list of nodes).
+        calls_by_name (bool): Hash only the name of the functions called,
+            instead of their definition.
+
+    Returns
+    -------
+        str: The hexadecimal SHA-256 digest.
+    """
+    parts: list[str] = []
+    seen: dict[int, int] = {}
+    stack: list[Any] = [node]
+
+    while stack:
+        value = stack.pop()
+
+        if type(value) is _Token:
+            parts.append(value.value)
+        elif isinstance(value, astx.AST):
+            if id(value) in seen:
+                parts.append(f"@{seen[id(value)]}")
+                continue
+            seen[id(value)] = len(seen)
+            parts.append(_type_token(type(value)))
+            stack.append(_NODE_END)
+            for key, item in reversed(_node_items(value, calls_by_name)):
+                stack.append(item)
+                stack.append(_key_token(key))
+        elif isinstance(value, (list, tuple)):
+            parts.append("[")
+            stack.append(_LIST_END)
+            for item in reversed(value):
+                stack.append(item)
+                stack.append(_ITEM_SEPARATOR)
+        elif isinstance(value, dict):
+            parts.append("{")
+            stack.append(_DICT_END)
+            for key in sorted(value, key=str, reverse=True):
+                stack.append(value[key])
+                stack.append(_Token(f"{key!r}:"))
+        elif isinstance(value, Enum):
+            parts.append(str(value))
+        else:
+            parts.append(repr(value))
+
+    # hashing the tokens at once is much faster than one update per token
+    digest = hashlib.sha256("\0".join(parts).encode("utf8"))
+    return digest.hexdigest()
+
+
+@public
+def cache_key(*parts: Any) -> str:
+    """Compute the cache key for the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_default_cache_path() -> Path:
+    """Return the default directory used by the build cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "irx"
+
+
+@public
+class BuildCache:
+    """
+    On-disk cache for executables and object files.
+
+    Each entry is stored with the key computed from the ASTx and the build
+    options. When the total size of the cache is greater than `max_size`,
+    the least recently used entries are removed.
+    """
+
+    path: Path
+    max_size: int
+    hardlink: bool
+
+    hits: int
+    misses: int
+    evictions: int
+
+    EXECUTABLE_SUFFIX = ".exe"
+    OBJECT_SUFFIX = ".o"
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        hardlink: bool = False,
+    ) -> None:
+        """
+        Initialize BuildCache object.
+
+        Parameters
+        ----------
+            path (str, optional): The cache directory, by default
+                `$XDG_CACHE_HOME/irx`.
+            max_size (int): The maximum size of the cache, in bytes.
+            hardlink (bool): Restore the executables using hard links,
+                when possible, so they must not be modified in place.
+        """
+        self.path = Path(path) if path else get_default_cache_path()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hardlink = hardlink
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def executable_path(self, key: str) -> Path:
+        """Return the path of the cached executable for the given key."""
+        return self.path / f"{key}{self.EXECUTABLE_SUFFIX}"
+
+    def object_path(self, key: str) -> Path:
+        """Return the path of the cached object file for the given key."""
+        return self.path / f"{key}{self.OBJECT_SUFFIX}"
+
+    def get(
+        self,
+        key: str,
+        output_file: Union[str, Path],
+        object_file: Optional[Union[str, Path]] = None,
+    ) -> bool:
+        """
+        Restore the cached executable (and object file) for the given key.
+
+        Parameters
+        ----------
+            key (str): The cache key.
+            output_file (str): The path for the executable.
+            object_file (str, optional): The path for the object file.
+
+        Returns
+        -------
+            bool: True if the entry was found in the cache.
+        """
+        executable = self.executable_path(key)
+        obj = self.object_path(key)
+
+        if not executable.exists() or (object_file and not obj.exists()):
+            self.misses += 1
+            return False
+
+        self._restore(executable, Path(output_file))
+        if object_file:
+            self._restore(obj, Path(object_file))
+
+        # update the access time used by the LRU eviction
+        for path in (executable, obj):
+            if path.exists():
+                os.utime(path)
+
+        self.hits += 1
+        return True
+
+    def put(
+        self,
+        key: str,
+        output_file: Union[str, Path],
+        object_data: Optional[bytes] = None,
+    ) -> None:
+        """
+        Store the executable (and the object data) for the given key.
+
+        Parameters
+        ----------
+            key (str): The cache key.
+            output_file (str): The path of the executable to be stored.
+            object_data (bytes, optional): The content of the object file.
+        """
+        if object_data is not None:
+            self._write_atomic(self.object_path(key), object_data)
+
+        with open(output_file, "rb") as f:
+            self._write_atomic(self.executable_path(key), f.read(), 0o755)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries over the size limit."""
+        # the executable and the object file of a key are removed together
+        entries: dict[str, tuple[float, int, list[Path]]] = {}
+        total_size = 0
+        for path in self.path.iterdir():
+            if path.suffix not in (self.EXECUTABLE_SUFFIX, self.OBJECT_SUFFIX):
+                continue
+            stat = path.stat()
+            mtime, size, paths = entries.get(path.stem, (0.0, 0, []))
+            entries[path.stem] = (
+                max(mtime, stat.st_mtime),
+                size + stat.st_size,
+                [*paths, path],
+            )
+            total_size += stat.st_size
+
+        for _, size, paths in sorted(entries.values(), key=lambda e: e[0]):
+            if total_size <= self.max_size:
+                break
+            for path in paths:
+                path.unlink(missing_ok=True)
+            total_size -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all the entries from the cache."""
+        for path in self.path.iterdir():
+            if path.suffix in (self.EXECUTABLE_SUFFIX, self.OBJECT_SUFFIX):
+                path.unlink(missing_ok=True)
+
+    @property
+    def size(self) -> int:
+        """Return the total size of the cache, in bytes."""
+        return sum(
+            path.stat().st_size
+            for path in self.path.iterdir()
+            if path.suffix in (self.EXECUTABLE_SUFFIX, self.OBJECT_SUFFIX)
+        )
+
+    def _restore(self, source: Path, target: Path) -> None:
+        if target.exists() or target.is_symlink():
+            target.unlink()
+        if self.hardlink:
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+
+    def _write_atomic(
+        self, path: Path, data: bytes, mode: int = 0o644
+    ) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
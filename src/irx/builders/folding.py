@@ -0,0 +1,413 @@
+"""Constant folding and algebraic simplification of ASTx expressions."""
+
+from __future__ import annotations
+
+import copy
+import ctypes
+import math
+
+from typing import Any, Optional, Union, cast
+
+import astx
+
+from public import public
+
+from irx.builders.partition import SKIPPED_ATTRIBUTES
+
+# the numeric types of the `LLVMLiteIRVisitor`, as (floating-point, width)
+Kind = tuple[bool, int]
+NUMERIC_KINDS: dict[type, Kind] = {
+    astx.Int8: (False, 8),
+    astx.Int16: (False, 16),
+    astx.Int32: (False, 32),
+    astx.Int64: (False, 64),
+    astx.Float32: (True, 32),
+    astx.Float64: (True, 64),
+}
+LITERAL_KINDS: dict[type, Kind] = {
+    astx.LiteralInt8: (False, 8),
+    astx.LiteralInt16: (False, 16),
+    astx.LiteralInt32: (False, 32),
+    astx.LiteralInt64: (False, 64),
+    astx.LiteralFloat32: (True, 32),
+    astx.LiteralFloat64: (True, 64),
+}
+LITERAL_TYPES = {kind: literal for literal, kind in LITERAL_KINDS.items()}
+_LITERAL_TEMPLATES: dict[Kind, Any] = {}
+
+_LEAF_TYPES = {astx.Variable, *LITERAL_KINDS}
+_DECLARATION_TYPES = {
+    astx.Argument,
+    astx.VariableDeclaration,
+    astx.InlineVariableDeclaration,
+}
+
+# the binary operations of the visitor that are folded
+FOLDED_OPERATIONS = ("+", "-", "*", "/", "<", ">")
+
+# the largest integers converted exactly to each floating-point width
+_EXACT_INTEGERS = {32: 2**24, 64: 2**53}
+
+Number = Union[int, float]
+
+
+def _get_kind(type_: Any) -> Optional[Kind]:
+    return NUMERIC_KINDS.get(type(type_))
+
+
+def _common_kind(lhs: Kind, rhs: Kind) -> Kind:
+    """Get the type of a binary operation, as `LLVMLiteIRVisitor.promote`."""
+    if lhs[0] != rhs[0]:
+        return lhs if lhs[0] else rhs
+    return lhs if lhs[1] >= rhs[1] else rhs
+
+
+def _wrap(value: int, width: int) -> int:
+    """Wrap an integer to a signed integer of the given width."""
+    value &= (1 << width) - 1
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+def _round(value: float, width: int) -> float:
+    return ctypes.c_float(value).value if width == 32 else value  # noqa: PLR2004
+
+
+def _convert(value: Number, kind: Kind) -> Optional[Number]:
+    """Convert a literal value to the given type, None if not exact."""
+    is_fp, width = kind
+    if not is_fp:
+        return _wrap(int(value), width)
+    if isinstance(value, int) and abs(value) > _EXACT_INTEGERS[width]:
+        # the rounding of big integers would depend on the conversion
+        return None
+    return _round(float(value), width)
+
+
+def _literal_value(node: Any) -> Number:
+    """Get the value of a literal, as it is translated by the visitor."""
+    is_fp, width = LITERAL_KINDS[type(node)]
+    value = cast(Number, node.value)
+    return _round(float(value), width) if is_fp else _wrap(int(value), width)
+
+
+def _make_literal(value: Number, kind: Kind, node: astx.AST) -> astx.AST:
+    """Create the literal that replaces a node."""
+    # astx checks the types of the arguments of the literals, so copying a
+    # literal is much faster than creating a new one
+    template = _LITERAL_TEMPLATES.get(kind)
+    if template is None:
+        template = LITERAL_TYPES[kind](0)
+        _LITERAL_TEMPLATES[kind] = template
+    literal: astx.AST = _copy(template)
+    literal.value = value  # type: ignore[attr-defined]
+    literal.loc = node.loc
+    return literal
+
+
+def _fold_values(
+    op_code: str, lhs: Number, rhs: Number, kind: Kind
+) -> Optional[Number]:
+    """Compute a binary operation as the visitor, None if it can't be."""
+    is_fp, width = kind
+    if op_code in ("<", ">"):
+        result = lhs < rhs if op_code == "<" else lhs > rhs
+        return float(result) if is_fp else int(result)
+
+    if is_fp:
+        if op_code == "/" and rhs == 0:
+            return None
+        if op_code == "+":
+            return _round(lhs + rhs, width)
+        if op_code == "-":
+            return _round(lhs - rhs, width)
+        if op_code == "*":
+            return _round(lhs * rhs, width)
+        return _round(lhs / rhs, width)
+
+    if op_code == "/":
+        # division by zero and overflow are undefined behavior in LLVM
+        if rhs == 0 or (lhs == -(1 << (width - 1)) and rhs == -1):
+            return None
+        quotient = abs(int(lhs)) // abs(int(rhs))
+        return quotient if (lhs < 0) == (rhs < 0) else -quotient
+    if op_code == "+":
+        return _wrap(int(lhs + rhs), width)
+    if op_code == "-":
+        return _wrap(int(lhs - rhs), width)
+    return _wrap(int(lhs * rhs), width)
+
+
+def _is_identity(op_code: str, value: Number, is_left: bool) -> bool:
+    """Check if `x op value` (or `value op x`) is always `x`."""
+    if op_code == "*":
+        return value == 1
+    if op_code == "+":
+        # x + 0.0 is 0.0 for x = -0.0, but x + -0.0 is always x
+        return value == 0 and (
+            isinstance(value, int) or math.copysign(1.0, value) < 0
+        )
+    if is_left:
+        return False
+    if op_code == "-":
+        return value == 0 and (
+            isinstance(value, int) or math.copysign(1.0, value) > 0
+        )
+    return op_code == "/" and value == 1
+
+
+def _children(node: astx.AST) -> list[tuple[str, Optional[int], Any]]:
+    """Get the children of a node, with their attribute and index."""
+    children: list[tuple[str, Optional[int], Any]] = []
+    for key, value in vars(node).items():
+        if key in SKIPPED_ATTRIBUTES or key == "type_":
+            continue
+        # the callee of a function call is defined elsewhere
+        if key == "fn" and isinstance(node, astx.FunctionCall):
+            continue
+        if isinstance(value, astx.AST):
+            children.append((key, None, value))
+        elif isinstance(value, (list, tuple)):
+            children.extend(
+                (key, index, item)
+                for index, item in enumerate(value)
+                if isinstance(item, astx.AST)
+            )
+    return children
+
+
+def _copy(node: Any) -> Any:
+    """Copy a node, without its children (faster than `copy.copy`)."""
+    new_node = object.__new__(type(node))
+    new_node.__dict__.update(node.__dict__)
+    return new_node
+
+
+def _copy_node(
+    node: astx.AST, changes: dict[tuple[str, Optional[int]], astx.AST]
+) -> astx.AST:
+    """Copy a node, with some of its children replaced."""
+    new_node: astx.AST = _copy(node)
+    for key in {key for key, _ in changes}:
+        value = getattr(node, key)
+        if isinstance(value, astx.AST):
+            setattr(new_node, key, changes[key, None])
+            continue
+        items = list(value)
+        for index, item in enumerate(items):
+            items[index] = changes.get((key, index), item)
+        if isinstance(value, tuple):
+            setattr(new_node, key, tuple(items))
+        else:
+            new_value = copy.copy(value)
+            new_value[:] = items
+            setattr(new_node, key, new_value)
+    return new_node
+
+
+class _ConstantFolder:
+    """Simplify the binary operations of an ASTx."""
+
+    def __init__(self) -> None:
+        self.removed = 0
+        # the type of the translated value of each node, when it is known
+        self.kinds: dict[int, Optional[Kind]] = {}
+
+    def get_kind(
+        self, node: astx.AST, variables: dict[str, Optional[Kind]]
+    ) -> Optional[Kind]:
+        literal_kind = LITERAL_KINDS.get(type(node))
+        if literal_kind is not None:
+            return literal_kind
+        if isinstance(node, astx.Variable):
+            return variables.get(node.name)
+        if isinstance(node, astx.BinaryOp):
+            return self.kinds.get(id(node))
+        if isinstance(node, astx.FunctionCall):
+            return _get_kind(node.fn.prototype.return_type)
+        return _get_kind(getattr(node, "type_", None))
+
+    def simplify(
+        self,
+        node: astx.BinaryOp,
+        lhs: astx.AST,
+        rhs: astx.AST,
+        variables: dict[str, Optional[Kind]],
+    ) -> astx.AST:
+        """Get the simplified node of a binary operation."""
+        op_code = node.op_code
+        lhs_kind = self.get_kind(lhs, variables)
+        if op_code == "=":
+            result = self.keep(node, lhs, rhs)
+            self.kinds[id(result)] = lhs_kind
+            return result
+
+        rhs_kind = self.get_kind(rhs, variables)
+        if lhs_kind is None or rhs_kind is None:
+            return self.keep(node, lhs, rhs)
+        kind = _common_kind(lhs_kind, rhs_kind)
+        if op_code in FOLDED_OPERATIONS:
+            simplified = self.simplify_operation(
+                node, lhs, rhs, kind, lhs_kind, rhs_kind
+            )
+            if simplified is not None:
+                self.removed += 2
+                return simplified
+
+        result = self.keep(node, lhs, rhs)
+        self.kinds[id(result)] = kind
+        return result
+
+    def simplify_operation(  # noqa: PLR0913, PLR0917
+        self,
+        node: astx.BinaryOp,
+        lhs: astx.AST,
+        rhs: astx.AST,
+        kind: Kind,
+        lhs_kind: Kind,
+        rhs_kind: Kind,
+    ) -> Optional[astx.AST]:
+        """Get the simplified node of an operation, None if it is kept."""
+        op_code = node.op_code
+        lhs_literal = type(lhs) in LITERAL_KINDS
+        rhs_literal = type(rhs) in LITERAL_KINDS
+        if lhs_literal and rhs_literal:
+            lhs_value = _convert(_literal_value(lhs), kind)
+            rhs_value = _convert(_literal_value(rhs), kind)
+            if lhs_value is None or rhs_value is None:
+                return None
+            value = _fold_values(op_code, lhs_value, rhs_value, kind)
+            if value is None:
+                return None
+            return _make_literal(value, kind, node)
+
+        if lhs_literal == rhs_literal:
+            return None
+        literal, operand = (lhs, rhs) if lhs_literal else (rhs, lhs)
+        operand_kind = rhs_kind if lhs_literal else lhs_kind
+        value = _convert(_literal_value(literal), kind)
+        # the operand is only kept when the operation doesn't convert it
+        if value is None or operand_kind != kind:
+            return None
+
+        if _is_identity(op_code, value, lhs_literal):
+            return operand
+        if (
+            op_code == "*"
+            and value == 0
+            and not kind[0]
+            and isinstance(operand, astx.Variable)
+        ):
+            # x * 0 is 0 for integers, and reading a variable has no effects
+            return _make_literal(0, kind, node)
+        return None
+
+    @staticmethod
+    def keep(node: astx.BinaryOp, lhs: astx.AST, rhs: astx.AST) -> astx.AST:
+        """Get the node of an operation kept, with its new operands."""
+        if lhs is node.lhs and rhs is node.rhs:
+            return node
+        new_node = _copy(node)
+        new_node.lhs = lhs
+        new_node.rhs = rhs
+        return cast(astx.AST, new_node)
+
+    def fold(self, expr: astx.AST) -> astx.AST:
+        """Get the ASTx with the binary operations simplified."""
+        # the result of each node visited, as nodes can be shared (the ASTx
+        # is not changed, so the ids of its nodes are not reused)
+        results: dict[int, astx.AST] = {}
+
+        def get_result(node: astx.AST) -> astx.AST:
+            return results.get(id(node), node)
+
+        # items: (node, variables in scope, children or None before they
+        # are visited)
+        stack: list[tuple[Any, dict[str, Optional[Kind]], Any]] = [
+            (expr, {}, None)
+        ]
+        while stack:
+            node, variables, children = stack.pop()
+            if children is None:
+                node_type = type(node)
+                # the leaves are never replaced
+                if node_type in _LEAF_TYPES or id(node) in results:
+                    continue
+                if node_type is astx.BinaryOp:
+                    lhs, rhs = node.lhs, node.rhs
+                    # fast path for the operations on leaves
+                    if type(lhs) in _LEAF_TYPES and type(rhs) in _LEAF_TYPES:
+                        result = self.simplify(node, lhs, rhs, variables)
+                        results[id(node)] = result
+                        continue
+                    children = [("lhs", None, lhs), ("rhs", None, rhs)]
+                elif node_type is astx.Function:
+                    variables = {}
+                    children = _children(node)
+                else:
+                    if node_type in _DECLARATION_TYPES:
+                        self.declare(variables, node.name, node.type_)
+                    children = _children(node)
+                stack.append((node, variables, children))
+                stack.extend(
+                    (child, variables, None)
+                    for *_, child in reversed(children)
+                )
+                continue
+
+            if type(node) is astx.BinaryOp:
+                result = self.simplify(
+                    node,
+                    get_result(node.lhs),
+                    get_result(node.rhs),
+                    variables,
+                )
+                results[id(node)] = result
+                continue
+
+            # the nodes with simplified children are copied, so the ASTx
+            # given is not changed
+            changes = {}
+            for key, index, child in children:
+                child_result = get_result(child)
+                if child_result is not child:
+                    changes[key, index] = child_result
+            result = _copy_node(node, changes) if changes else node
+            if isinstance(result, astx.BinaryOp):
+                result = self.simplify(
+                    result, result.lhs, result.rhs, variables
+                )
+            results[id(node)] = result
+        return get_result(expr)
+
+    @staticmethod
+    def declare(
+        variables: dict[str, Optional[Kind]], name: str, type_: Any
+    ) -> None:
+        kind = _get_kind(type_)
+        # a name declared with different types is not known anymore
+        if name in variables and variables[name] != kind:
+            kind = None
+        variables[name] = kind
+
+
+@public
+def fold_constants(expr: astx.AST) -> tuple[astx.AST, int]:
+    """
+    Fold the constant binary operations of an ASTx.
+
+    The literal operations are computed with the semantics of
+    `LLVMLiteIRVisitor`, and the identities (e.g. `x * 1`) are simplified
+    when the type of `x` is known. The ASTx given is not changed.
+
+    Parameters
+    ----------
+        expr (astx.AST): The ASTx to be simplified, e.g. a module.
+
+    Returns
+    -------
+        tuple[astx.AST, int]: The simplified ASTx (the same ASTx when
+            nothing is simplified) and the number of nodes removed.
+    """
+    folder = _ConstantFolder()
+    result = folder.fold(expr)
+    return result, folder.removed
@@ -0,0 +1,261 @@
+"""Optimization hints of the ASTx loops, lowered to `llvm.loop` metadata."""
+
+from __future__ import annotations
+
+import re
+
+from typing import Optional, Union
+
+import astx
+
+from public import public
+
+# attribute of the loop nodes with their hints
+LOOP_HINTS_ATTRIBUTE = "loop_hints"
+
+LoopNode = Union[astx.ForRangeLoopStmt, astx.ForCountLoopStmt]
+
+_DEFINE_PATTERN = re.compile(r"^define [^@]*@\"?([^\"(]+)\"?\(")
+_LABEL_PATTERN = re.compile(r"^([\w.\-]+):")
+_LOOP_BRANCH_PATTERN = re.compile(r"!llvm\.loop !(\d+)")
+_METADATA_PATTERN = re.compile(r"^!(\d+) = (?:distinct )?!\{(.*)\}$")
+_PROPERTY_PATTERN = re.compile(r'^!"([^"]+)"(?:, i\d+ (-?\d+|true|false))?')
+_BOOLEAN_VALUES = {"true": "1", "false": "0"}
+_VECTOR_PATTERN = re.compile(r"<(\d+) x ")
+
+
+@public
+class LoopHints:
+    """Optimization hints of a loop for the LLVM loop passes."""
+
+    unroll_count: Optional[int]
+    vectorize_width: Optional[int]
+    interleave_count: Optional[int]
+    vectorize: Optional[bool]
+
+    def __init__(
+        self,
+        unroll_count: Optional[int] = None,
+        vectorize_width: Optional[int] = None,
+        interleave_count: Optional[int] = None,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        """
+        Initialize LoopHints object.
+
+        Parameters
+        ----------
+            unroll_count (int, optional): Unroll the loop by this factor,
+                1 disables the unrolling.
+            vectorize_width (int, optional): The number of lanes of the
+                vectorized loop, it also enables the vectorization.
+            interleave_count (int, optional): The number of vector
+                iterations interleaved in each iteration of the vectorized
+                loop.
+            vectorize (bool, optional): Force (True) or disable (False) the
+                vectorization of the loop, None lets LLVM decide.
+        """
+        for name, value in (
+            ("unroll_count", unroll_count),
+            ("vectorize_width", vectorize_width),
+            ("interleave_count", interleave_count),
+        ):
+            if value is not None and value < 1:
+                raise Exception(f"[EE]: {name} must be positive.")
+        if vectorize is False and vectorize_width not in (None, 1):
+            raise Exception(
+                "[EE]: vectorize_width can't be used with vectorize=False."
+            )
+
+        self.unroll_count = unroll_count
+        self.vectorize_width = vectorize_width
+        self.interleave_count = interleave_count
+        self.vectorize = vectorize
+
+    def get_properties(self) -> list[tuple[str, Optional[int], int]]:
+        """
+        Get the properties of the `llvm.loop` metadata of the hints.
+
+        Returns
+        -------
+            list[tuple[str, Optional[int], int]]: The name, the value (None
+                for a property without value) and the bit width of the
+                value of each property.
+        """
+        properties: list[tuple[str, Optional[int], int]] = []
+        if self.unroll_count == 1:
+            properties.append(("llvm.loop.unroll.disable", None, 0))
+        elif self.unroll_count is not None:
+            properties.append(
+                ("llvm.loop.unroll.count", self.unroll_count, 32)
+            )
+        if self.vectorize is not None:
+            properties.append(
+                ("llvm.loop.vectorize.enable", int(self.vectorize), 1)
+            )
+        elif self.vectorize_width is not None:
+            properties.append(("llvm.loop.vectorize.enable", 1, 1))
+        if self.vectorize_width is not None:
+            properties.append(
+                ("llvm.loop.vectorize.width", self.vectorize_width, 32)
+            )
+        if self.interleave_count is not None:
+            properties.append(
+                ("llvm.loop.interleave.count", self.interleave_count, 32)
+            )
+        return properties
+
+    def __repr__(self) -> str:
+        """Return a string that represents the object."""
+        # it is also used by the fingerprint of the cache key
+        return (
+            f"LoopHints(unroll_count={self.unroll_count}, "
+            f"vectorize_width={self.vectorize_width}, "
+            f"interleave_count={self.interleave_count}, "
+            f"vectorize={self.vectorize})"
+        )
+
+
+@public
+def set_loop_hints(loop: LoopNode, hints: Optional[LoopHints]) -> LoopNode:
+    """
+    Attach optimization hints to a loop node.
+
+    Parameters
+    ----------
+        loop (astx.ForRangeLoopStmt | astx.ForCountLoopStmt): The loop.
+        hints (LoopHints, optional): The hints, None removes them.
+
+    Returns
+    -------
+        astx.ForRangeLoopStmt | astx.ForCountLoopStmt: The same loop node.
+    """
+    if not isinstance(loop, (astx.ForRangeLoopStmt, astx.ForCountLoopStmt)):
+        raise Exception(
+            f"[EE]: Loop hints not supported by {type(loop).__name__}."
+        )
+    if hints is None:
+        vars(loop).pop(LOOP_HINTS_ATTRIBUTE, None)
+    else:
+        setattr(loop, LOOP_HINTS_ATTRIBUTE, hints)
+    return loop
+
+
+@public
+def get_loop_hints(loop: astx.AST) -> Optional[LoopHints]:
+    """Get the optimization hints of a loop node, if any."""
+    return getattr(loop, LOOP_HINTS_ATTRIBUTE, None)
+
+
+@public
+class LoopMetadata:
+    """The `llvm.loop` metadata of a loop in the LLVM-IR."""
+
+    function: str
+    block: str
+    properties: dict[str, Optional[int]]
+    vector_width: Optional[int]
+
+    def __init__(
+        self,
+        function: str,
+        block: str,
+        properties: dict[str, Optional[int]],
+        vector_width: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize LoopMetadata object.
+
+        Parameters
+        ----------
+            function (str): The name of the function of the loop.
+            block (str): The label of the block with the latch branch.
+            properties (dict[str, Optional[int]]): The value of each
+                property of the metadata (None for a property without
+                value), e.g. `{"llvm.loop.isvectorized": 1}`.
+            vector_width (int, optional): The widest vector type (in
+                lanes) used by the block with the latch branch.
+        """
+        self.function = function
+        self.block = block
+        self.properties = properties
+        self.vector_width = vector_width
+
+    @property
+    def is_vectorized(self) -> bool:
+        """Return True if the loop was vectorized by LLVM."""
+        return bool(self.properties.get("llvm.loop.isvectorized"))
+
+    def __repr__(self) -> str:
+        """Return a string that represents the object."""
+        return (
+            f"LoopMetadata(function={self.function!r}, "
+            f"block={self.block!r}, properties={self.properties!r}, "
+            f"vector_width={self.vector_width})"
+        )
+
+
+@public
+def get_loop_metadata(ir_text: str) -> list[LoopMetadata]:
+    """
+    Get the `llvm.loop` metadata of the loops of a LLVM-IR module.
+
+    Parameters
+    ----------
+        ir_text (str): The LLVM-IR module.
+
+    Returns
+    -------
+        list[LoopMetadata]: The metadata of each latch branch, in the order
+            of the module.
+    """
+    lines = ir_text.splitlines()
+
+    nodes: dict[str, list[str]] = {}
+    for line in lines:
+        match = _METADATA_PATTERN.match(line)
+        if match:
+            nodes[match.group(1)] = [
+                item.strip() for item in match.group(2).split(", !")
+            ]
+
+    def get_properties(node_id: str) -> dict[str, Optional[int]]:
+        properties: dict[str, Optional[int]] = {}
+        for operand in nodes.get(node_id, []):
+            operand_id = operand.lstrip("!")
+            if operand_id == node_id or operand_id not in nodes:
+                continue
+            match = _PROPERTY_PATTERN.match(", !".join(nodes[operand_id]))
+            if match:
+                value = match.group(2)
+                properties[match.group(1)] = (
+                    None
+                    if value is None
+                    else int(_BOOLEAN_VALUES.get(value, value))
+                )
+        return properties
+
+    loops = []
+    function = block = ""
+    widths: list[int] = []
+    for line in lines:
+        match = _DEFINE_PATTERN.match(line)
+        if match:
+            function, block, widths = match.group(1), "entry", []
+            continue
+        match = _LABEL_PATTERN.match(line)
+        if match:
+            block, widths = match.group(1), []
+            continue
+        widths.extend(int(width) for width in _VECTOR_PATTERN.findall(line))
+        match = _LOOP_BRANCH_PATTERN.search(line)
+        if match:
+            loops.append(
+                LoopMetadata(
+                    function,
+                    block,
+                    get_properties(match.group(1)),
+                    max(widths) if widths else None,
+                )
+            )
+    return loops
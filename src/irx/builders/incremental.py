@@ -0,0 +1,281 @@
+"""Incremental builds of ASTx modules at function granularity."""
+
+from __future__ import annotations
+
+import zlib
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Optional, Sequence, Union, cast
+
+import astx
+
+from llvmlite import binding as llvm
+from public import public
+
+from irx.builders.cache import ast_fingerprint, cache_key
+from irx.builders.llvmliteir import (
+    BUILTIN_FUNCTIONS,
+    LLVMLiteIR,
+    _emit_partition,
+    link_objects,
+)
+from irx.builders.partition import get_callees
+from irx.builders.profile import BlockProfile, ProfilePath
+
+# name of the unit with the builtins and the top-level nodes that are not
+# functions
+BUILTINS_UNIT = ""
+
+
+@public
+class CompiledUnit:
+    """Code generated for a compilation unit of a module."""
+
+    key: str
+    bitcode: bytes
+    object_data: bytes
+
+    def __init__(self, key: str, bitcode: bytes, object_data: bytes) -> None:
+        """
+        Initialize CompiledUnit object.
+
+        Parameters
+        ----------
+            key (str): The key of the functions and options of the unit.
+            bitcode (bytes): The optimized LLVM bitcode.
+            object_data (bytes): The object code.
+        """
+        self.key = key
+        self.bitcode = bitcode
+        self.object_data = object_data
+
+
+@public
+class IncrementalBuilder:
+    """
+    Build ASTx modules incrementally, at function granularity.
+
+    Only the compilation units (shards) with functions that changed, or
+    that call a function whose signature changed, are compiled again.
+    """
+
+    builder: LLVMLiteIR
+    shards: Optional[int]
+    workers: int
+    options_key: str
+    units: dict[str, CompiledUnit]
+    changed: list[str]
+    recompiled: list[str]
+
+    def __init__(  # noqa: PLR0913
+        self,
+        opt_level: int = 0,
+        size_level: int = 0,
+        shards: Optional[int] = 64,
+        workers: int = 1,
+        fast_math: Union[bool, Sequence[str]] = False,
+        *,
+        fold_constants: bool = True,
+        roots: Optional[Sequence[str]] = None,
+        profile_generate: Optional[ProfilePath] = None,
+        profile_use: Optional[Union[ProfilePath, BlockProfile]] = None,
+    ) -> None:
+        """
+        Initialize IncrementalBuilder object.
+
+        Parameters
+        ----------
+            opt_level (int): The speed optimization level (0-3).
+            size_level (int): The size optimization level (0-2).
+            shards (int, optional): The number of compilation units for the
+                functions, or None for one unit per function.
+            workers (int): The number of worker processes used to compile
+                the changed units, 1 compiles them in this process.
+            fast_math (bool | Sequence[str]): The fast-math flags of the
+                floating-point instructions, see `LLVMLiteIR`.
+            fold_constants (bool): Fold the constant operations of the
+                module before it is split, see `LLVMLiteIR.fold`.
+            roots (Sequence[str], optional): Only build the functions that
+                can be reached from these ones, see `LLVMLiteIR.prune`.
+            profile_generate (ProfilePath, optional): Instrument the units,
+                see `LLVMLiteIR`.
+            profile_use (ProfilePath | BlockProfile, optional): The profile
+                used to optimize the units, see `LLVMLiteIR`.
+        """
+        if shards is not None and shards < 1:
+            raise Exception("[EE]: shards must be positive.")
+        self.builder = LLVMLiteIR(
+            opt_level=opt_level,
+            size_level=size_level,
+            fast_math=fast_math,
+            fold_constants=fold_constants,
+            roots=roots,
+            profile_generate=profile_generate,
+            profile_use=profile_use,
+        )
+        self.shards = shards
+        self.workers = workers
+        # the target, the options and the versions used by all the units
+        self.options_key = self.builder.get_cache_key(
+            astx.Module(), opt_level, size_level
+        )
+        self.units = {}
+        self.changed = []
+        self.recompiled = []
+        self._function_keys: dict[str, str] = {}
+
+    def get_unit_name(self, function_name: str) -> str:
+        """Get the name of the compilation unit of the given function."""
+        if self.shards is None:
+            return function_name
+        shard = zlib.crc32(function_name.encode("utf8")) % self.shards
+        return f"shard_{shard}"
+
+    def get_function_key(
+        self,
+        node: astx.AST,
+        name: str,
+        prototypes: dict[str, astx.FunctionPrototype],
+    ) -> str:
+        """Compute the key of a function (or of the builtins unit)."""
+        callees = sorted(
+            (callee, ast_fingerprint(prototypes[callee]))
+            for callee in get_callees(node)
+            if callee in prototypes and callee != name
+        )
+        return cache_key(
+            ast_fingerprint(node, calls_by_name=True),
+            callees,
+            self.options_key,
+        )
+
+    def compile(self, module: astx.Module) -> dict[str, CompiledUnit]:
+        """
+        Compile the units of the module with functions that changed.
+
+        The functions that changed are stored in `self.changed`, and all
+        the functions compiled again in `self.recompiled`.
+
+        Parameters
+        ----------
+            module (astx.Module): The module to be compiled.
+
+        Returns
+        -------
+            dict[str, CompiledUnit]: The compiled units, by name.
+        """
+        # the units are compiled without folding, see `_emit_partition`
+        module = cast(
+            astx.Module, self.builder.fold(self.builder.prune(module))
+        )
+        prototypes = {
+            node.prototype.name: node.prototype
+            for node in module.nodes
+            if isinstance(node, astx.Function)
+        }
+
+        units = {BUILTINS_UNIT: astx.Module(name=module.name)}
+        members = {BUILTINS_UNIT: [BUILTINS_UNIT]}
+        function_keys = {}
+        for node in module.nodes:
+            if not isinstance(node, astx.Function):
+                units[BUILTINS_UNIT].nodes.append(node)
+                continue
+
+            unit_name = self.get_unit_name(node.name)
+            if unit_name not in units:
+                units[unit_name] = astx.Module(name=module.name)
+                members[unit_name] = []
+            units[unit_name].nodes.append(node)
+            members[unit_name].append(node.name)
+            function_keys[node.name] = self.get_function_key(
+                node, node.name, prototypes
+            )
+        # with `roots`, the builtins unit only defines the builtins used
+        builtins: list[str] = []
+        if self.builder.translator.lazy_builtins:
+            builtins = sorted(
+                set(BUILTIN_FUNCTIONS) & get_callees(module) - set(prototypes)
+            )
+        function_keys[BUILTINS_UNIT] = cache_key(
+            self.get_function_key(
+                units[BUILTINS_UNIT], BUILTINS_UNIT, prototypes
+            ),
+            builtins,
+        )
+
+        self.changed = [
+            name
+            for name, key in function_keys.items()
+            if self._function_keys.get(name) != key
+        ]
+
+        unit_keys = {
+            unit_name: cache_key(
+                unit_name == BUILTINS_UNIT,
+                [(name, function_keys[name]) for name in names],
+            )
+            for unit_name, names in members.items()
+        }
+        dirty = [
+            unit_name
+            for unit_name, key in unit_keys.items()
+            if unit_name not in self.units or self.units[unit_name].key != key
+        ]
+        self.recompiled = [name for unit in dirty for name in members[unit]]
+
+        options: list[dict[str, Any]] = [
+            {
+                "opt_level": self.builder.opt_level,
+                "size_level": self.builder.size_level,
+                "define_builtins": unit_name == BUILTINS_UNIT,
+                "fast_math": self.builder.fast_math,
+                "lazy_builtins": self.builder.translator.lazy_builtins,
+                "profile_generate": self.builder.profile_generate,
+                "profile_use": self.builder.profile_use,
+                "bitcode": True,
+            }
+            for unit_name in dirty
+        ]
+        if BUILTINS_UNIT in dirty:
+            options[dirty.index(BUILTINS_UNIT)]["builtins"] = builtins
+        args = ([units[name] for name in dirty], repeat(prototypes), options)
+
+        if self.workers > 1 and len(dirty) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(_emit_partition, *args))
+        else:
+            results = list(map(_emit_partition, *args))
+
+        compiled = {
+            unit_name: CompiledUnit(
+                unit_keys[unit_name], bitcode or b"", object_data
+            )
+            for unit_name, (object_data, bitcode, _) in zip(dirty, results)
+        }
+        # the units without functions in the module are dropped
+        self.units = {
+            unit_name: compiled.get(unit_name) or self.units[unit_name]
+            for unit_name in unit_keys
+        }
+        self._function_keys = function_keys
+        return self.units
+
+    def translate(self, module: astx.Module) -> str:
+        """Compile the module and return its optimized LLVM-IR."""
+        result_mod = None
+        for unit in self.compile(module).values():
+            unit_mod = llvm.parse_bitcode(unit.bitcode)
+            if result_mod is None:
+                result_mod = unit_mod
+            else:
+                result_mod.link_in(unit_mod)
+        return str(result_mod)
+
+    def build(self, module: astx.Module, output_file: str) -> None:
+        """Compile the module and link it to an executable file."""
+        units = self.compile(module)
+        link_objects(
+            [unit.object_data for unit in units.values()], output_file
+        )
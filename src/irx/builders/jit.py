@@ -0,0 +1,297 @@
+"""In-process JIT execution for the LLVM-IR builder."""
+
+from __future__ import annotations
+
+import ctypes
+import math
+import sys
+
+from typing import Any, Callable, Optional, Sequence, cast
+
+from llvmlite import binding as llvm
+from llvmlite import ir
+from public import public
+
+# the kind of each element type, as in the NumPy type strings (e.g. `<f8`)
+ELEMENT_KINDS = {
+    ctypes.c_float: "f",
+    ctypes.c_double: "f",
+    ctypes.c_int8: "i",
+    ctypes.c_int16: "i",
+    ctypes.c_int32: "i",
+    ctypes.c_int64: "i",
+}
+# the kind of the formats of the buffer protocol (see the `struct` module)
+FORMAT_KINDS = {
+    "e": "f",
+    "f": "f",
+    "d": "f",
+    "b": "i",
+    "h": "i",
+    "i": "i",
+    "l": "i",
+    "q": "i",
+    "n": "i",
+}
+NATIVE_BYTE_ORDERS = ("|", "=", "@", "<" if sys.byteorder == "little" else ">")
+
+
+def get_ctypes_type(llvm_type: ir.types.Type) -> Any:
+    """
+    Get the ctypes type equivalent to the given LLVM type.
+
+    Parameters
+    ----------
+        llvm_type (ir.Type): The LLVM type.
+
+    Returns
+    -------
+        The ctypes type, or None for `void`.
+    """
+    if isinstance(llvm_type, ir.VoidType):
+        return None
+    if isinstance(llvm_type, ir.PointerType):
+        return ctypes.POINTER(get_ctypes_type(llvm_type.pointee))
+    if isinstance(llvm_type, ir.FloatType):
+        return ctypes.c_float
+    if isinstance(llvm_type, ir.DoubleType):
+        return ctypes.c_double
+    if isinstance(llvm_type, ir.IntType):
+        int_types = {
+            1: ctypes.c_bool,
+            8: ctypes.c_int8,
+            16: ctypes.c_int16,
+            32: ctypes.c_int32,
+            64: ctypes.c_int64,
+        }
+        if llvm_type.width in int_types:
+            return int_types[llvm_type.width]
+
+    raise Exception(f"[EE]: LLVM type not supported by ctypes: {llvm_type}")
+
+
+def get_ctypes_function_type(fn: ir.Function) -> Any:
+    """Create the ctypes function type for the given LLVM function."""
+    fn_type = fn.function_type
+    return ctypes.CFUNCTYPE(
+        get_ctypes_type(fn_type.return_type),
+        *[get_ctypes_type(arg_type) for arg_type in fn_type.args],
+    )
+
+
+def is_pointer_type(ctypes_type: Any) -> bool:
+    """Check if the ctypes type is a pointer type."""
+    return isinstance(ctypes_type, type) and issubclass(
+        ctypes_type, ctypes._Pointer
+    )
+
+
+def get_buffer_argument(
+    obj: Any, pointer_type: Any, writable: bool = True
+) -> tuple[Any, int]:
+    """
+    Get the pointer to the data and the length of a buffer, without a copy.
+
+    Parameters
+    ----------
+        obj (Any): The C-contiguous array, with elements of the same type
+            of the buffer.
+        pointer_type (Any): The ctypes pointer type of the data argument.
+        writable (bool): If the function can write to the buffer, so the
+            read-only arrays are rejected.
+
+    Returns
+    -------
+        tuple[Any, int]: The pointer (or a ctypes array sharing the memory
+            of the object) and the number of elements.
+    """
+    element_type = pointer_type._type_
+    kind = ELEMENT_KINDS[element_type]
+    size = ctypes.sizeof(element_type)
+
+    # the NumPy arrays are passed by the address of their data
+    interface = getattr(obj, "__array_interface__", None)
+    if interface is not None and interface.get("data") is not None:
+        typestr = interface["typestr"]
+        if typestr[0] not in NATIVE_BYTE_ORDERS or typestr[1:] != (
+            f"{kind}{size}"
+        ):
+            raise Exception(
+                f"[EE]: buffer type not valid: {typestr}, "
+                f"expected {kind}{size}."
+            )
+        if interface.get("strides") is not None:
+            raise Exception("[EE]: buffer must be C-contiguous.")
+        address, readonly = interface["data"]
+        if readonly and writable:
+            raise Exception("[EE]: buffer must be writable.")
+        length = math.prod(interface["shape"])
+        return ctypes.cast(address, pointer_type), length
+
+    view = memoryview(obj)
+    format_ = view.format.lstrip("".join(NATIVE_BYTE_ORDERS))
+    if FORMAT_KINDS.get(format_) != kind or view.itemsize != size:
+        raise Exception(
+            f"[EE]: buffer format not valid: {view.format}, "
+            f"expected {element_type.__name__}."
+        )
+    if not view.c_contiguous:
+        raise Exception("[EE]: buffer must be C-contiguous.")
+    length = view.nbytes // size
+    if view.readonly:
+        if writable:
+            raise Exception("[EE]: buffer must be writable.")
+        # ctypes can only point to writable buffers, so the read-only ones
+        # are copied
+        return (element_type * length).from_buffer_copy(view), length
+    # the ctypes array shares the memory of the object
+    return (element_type * length).from_buffer(view), length
+
+
+@public
+class BufferFunction:
+    """
+    Python callable for a compiled function with buffer arguments.
+
+    It takes one array for each buffer, e.g. a NumPy array, and passes its
+    data and length to the compiled function, without a copy.
+    """
+
+    function: Any
+    buffer_types: list[Any]
+    writable: list[bool]
+
+    def __init__(
+        self, function: Any, written: Optional[Sequence[bool]] = None
+    ) -> None:
+        """
+        Initialize BufferFunction object.
+
+        Parameters
+        ----------
+            function (Any): The ctypes function, where each pointer argument
+                is followed by the length of the buffer.
+            written (Sequence[bool], optional): If the function can write to
+                each buffer, by default all the buffers.
+        """
+        self.function = function
+        # the pointer type of each argument, or None for the scalars
+        self.buffer_types = []
+        self.writable = []
+        argtypes = list(function.argtypes)
+        written_iter = iter(written or [])
+        while argtypes:
+            argtype = argtypes.pop(0)
+            if is_pointer_type(argtype):
+                argtypes.pop(0)
+                self.buffer_types.append(argtype)
+                self.writable.append(next(written_iter, True))
+            else:
+                self.buffer_types.append(None)
+                self.writable.append(False)
+
+    def __call__(self, *args: Any) -> Any:
+        """Call the compiled function with the given arguments."""
+        if len(args) != len(self.buffer_types):
+            raise Exception(
+                f"[EE]: {len(self.buffer_types)} arguments expected, "
+                f"got {len(args)}."
+            )
+        c_args = []
+        for arg, buffer_type, writable in zip(
+            args, self.buffer_types, self.writable
+        ):
+            if buffer_type is None:
+                c_args.append(arg)
+            else:
+                c_args.extend(get_buffer_argument(arg, buffer_type, writable))
+        return self.function(*c_args)
+
+
+def wrap_buffer_function(
+    function: Any, written: Optional[Sequence[bool]] = None
+) -> Callable[..., Any]:
+    """Wrap a ctypes function with buffer arguments in a BufferFunction."""
+    if any(is_pointer_type(argtype) for argtype in function.argtypes):
+        return BufferFunction(function, written)
+    return cast(Callable[..., Any], function)
+
+
+@public
+class JITModule:
+    """
+    Compiled module loaded in the current process.
+
+    The functions defined in the module can be called directly from Python,
+    e.g. `jit_module["main"]()` or `jit_module.get_function("add")(1, 2)`.
+    """
+
+    engine: llvm.ExecutionEngine
+    module: ir.Module
+    written_buffers: dict[str, list[bool]]
+
+    def __init__(
+        self,
+        module: ir.Module,
+        module_ref: llvm.ModuleRef,
+        target_machine: llvm.TargetMachine,
+        written_buffers: Optional[dict[str, list[bool]]] = None,
+    ) -> None:
+        """Initialize JITModule object."""
+        self.module = module
+        self.written_buffers = written_buffers or {}
+        self._functions: dict[str, Callable[..., Any]] = {}
+
+        self.engine = llvm.create_mcjit_compiler(module_ref, target_machine)
+        self.engine.finalize_object()
+        self.engine.run_static_constructors()
+
+    @property
+    def function_names(self) -> list[str]:
+        """Return the names of the functions defined in the module."""
+        return [
+            fn.name for fn in self.module.functions if not fn.is_declaration
+        ]
+
+    def get_function(self, name: str) -> Callable[..., Any]:
+        """
+        Get a Python callable for the compiled function with the given name.
+
+        Parameters
+        ----------
+            name (str): The function name.
+
+        Returns
+        -------
+            A ctypes callable for the compiled function (a BufferFunction
+            for the functions with buffer arguments).
+        """
+        if name in self._functions:
+            return self._functions[name]
+
+        fn = self._get_ir_function(name)
+        if fn is None or fn.is_declaration:
+            raise Exception(f"[EE]: Function not defined: {name}")
+
+        address = self.engine.get_function_address(name)
+        cfunc = get_ctypes_function_type(fn)(address)
+        # the machine code is owned by the execution engine, so it should be
+        # alive while the function is referenced
+        cfunc.jit_module = self
+        function = wrap_buffer_function(cfunc, self.written_buffers.get(name))
+        self._functions[name] = function
+        return function
+
+    def _get_ir_function(self, name: str) -> Optional[ir.Function]:
+        value = self.module.globals.get(name)
+        if isinstance(value, ir.Function):
+            return value
+        return None
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        """Get the compiled function with the given name."""
+        return self.get_function(name)
+
+    def __contains__(self, name: str) -> bool:
+        """Check if the module defines a function with the given name."""
+        return name in self.function_names
@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import os
 import subprocess
-import tempfile
+import threading
+import time
 
-from typing import Any, Optional, cast
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from typing import Any, Callable, Optional, Sequence, TypeVar, Union, cast
 
 import astx
+import llvmlite
 import sh
 
 from llvmlite import binding as llvm
@@ -15,16 +23,210 @@ from llvmlite import ir
 from plum import dispatch
 from public import public
 
-from irx.builders.base import Builder, BuilderVisitor
-
+import irx
+
+from irx.builders.analysis import get_assigned_variables, get_written_buffers
+from irx.builders.base import Builder, BuilderVisitor, VisitGenerator
+from irx.builders.buffers import (
+    BufferLength,
+    BufferLoad,
+    BufferStore,
+    BufferType,
+    VectorLoad,
+    VectorReduce,
+    VectorStore,
+    VectorType,
+)
+from irx.builders.cache import BuildCache, ast_fingerprint, cache_key
+from irx.builders.folding import fold_constants
+from irx.builders.hints import LoopHints, get_loop_hints
+from irx.builders.jit import JITModule, get_ctypes_function_type
+from irx.builders.optimization import (
+    OptimizationReport,
+    check_optimization_levels,
+    optimize_module,
+)
+from irx.builders.output import (
+    OutputTarget,
+    linker_files,
+    write_output,
+)
+from irx.builders.partition import get_callees, partition_module
+from irx.builders.process import (
+    ProcessResult,
+    get_link_semaphore,
+    run_process,
+)
+from irx.builders.profile import (
+    BlockProfile,
+    ProfilePath,
+    declare_count_function,
+    emit_profile_runtime,
+    get_block_key,
+    set_function_profile,
+)
+from irx.builders.pruning import prune_module
+from irx.builders.shared import SharedLibrary
+from irx.builders.stats import BuildStats
+from irx.builders.symbol_table import ScopedSymbolTable
+from irx.builders.target import (
+    create_target_machine,
+    get_target_machine,
+    initialize_llvm,
+)
+
+
+def run_command(
+    command: list[str], pass_fds: Sequence[int] = ()
+) -> ProcessResult:
+    """Run a command, raising an exception with its stderr if it fails."""
+    start = time.perf_counter()
+    process = subprocess.run(
+        command, capture_output=True, check=False, pass_fds=tuple(pass_fds)
+    )
+    return ProcessResult(
+        command,
+        process.returncode,
+        process.stdout,
+        process.stderr,
+        time.perf_counter() - start,
+    ).check()
+
+
+def get_link_command(
+    object_files: Sequence[str], output_file: str, shared: bool = False
+) -> list[str]:
+    """Return the command that links the object files."""
+    shared_args = ["-shared"] if shared else []
+    return ["clang", *shared_args, *object_files, "-o", output_file]
+
+
+def link_objects(
+    objects: Sequence[bytes],
+    output_file: Optional[str],
+    shared: bool = False,
+    stats: Optional[BuildStats] = None,
+) -> Optional[bytes]:
+    """
+    Link the given object files into an executable file.
+
+    The objects are handed to the linker with `linker_files`.
+
+    Parameters
+    ----------
+        objects (Sequence[bytes]): The content of the object files.
+        output_file (str, optional): The executable (or shared library)
+            file. When it is None, the linked file is returned as bytes,
+            without being written to the disk.
+        shared (bool): Link a shared library instead of an executable.
+        stats (BuildStats, optional): Record the `write_objects` and `link`
+            phases.
+
+    Returns
+    -------
+        bytes, optional: The linked file, only when `output_file` is None.
+    """
+    stats = BuildStats() if stats is None else stats
+
+    with ExitStack() as stack:
+        with stats.phase("write_objects"):
+            object_files, outputs, fds = stack.enter_context(
+                linker_files(objects, 1 if output_file is None else 0)
+            )
+        link_file = outputs[0] if output_file is None else output_file
 
-def run_command(command: list[str]) -> None:
-    """Run a command in the operating system."""
-    try:
-        subprocess.run(command, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"An error occurred: {e}")
-        # Handle the error as needed
+        with stats.phase("link"):
+            run_command(
+                get_link_command(object_files, link_file, shared),
+                pass_fds=fds,
+            )
+        if output_file is not None:
+            return None
+        with open(link_file, "rb") as f:
+            return f.read()
+
+
+# the fast-math flags accepted by the LLVM floating-point instructions
+FAST_MATH_FLAGS = (
+    "fast",
+    "nnan",
+    "ninf",
+    "nsz",
+    "arcp",
+    "contract",
+    "afn",
+    "reassoc",
+)
+
+# the name (see `VariablesLLVM.get_data_type`) of each ASTx data type
+ASTX_TYPE_NAMES: dict[type, str] = {
+    astx.Int8: "int8",
+    astx.Int16: "int16",
+    astx.Int32: "int32",
+    astx.Int64: "int64",
+    astx.Float32: "float",
+    astx.Float64: "double",
+}
+
+
+def get_fast_math_flags(
+    fast_math: Union[bool, Sequence[str]],
+) -> tuple[str, ...]:
+    """
+    Get the fast-math flags for the floating-point instructions.
+
+    Parameters
+    ----------
+        fast_math (bool | Sequence[str]): True for all the fast-math
+            optimizations (`fast`), False for none, or the flags to be
+            used, e.g. `("reassoc", "contract")`.
+
+    Returns
+    -------
+        tuple[str, ...]: The fast-math flags.
+    """
+    if isinstance(fast_math, bool):
+        return ("fast",) if fast_math else ()
+
+    for flag in fast_math:
+        if flag not in FAST_MATH_FLAGS:
+            raise Exception(f"[EE]: fast-math flag not valid: {flag}")
+    return tuple(fast_math)
+
+
+# the output formats of `LLVMLiteIR.emit`
+EMIT_FORMATS = ("bitcode", "assembly", "object", "shared")
+
+# the functions added to the modules by `LLVMLiteIRVisitor.add_builtin`
+BUILTIN_FUNCTIONS = ("putchar", "putchard")
+
+# the comparisons of the loop variable supported in the condition of a
+# counted loop, and the equivalent comparison with the operands swapped
+LOOP_COMPARISONS = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "!=": "!="}
+
+# the width of the LLVM floating-point types, to compare them
+FP_WIDTHS = {ir.HalfType: 16, ir.FloatType: 32, ir.DoubleType: 64}
+
+
+def is_fp_type(llvm_type: ir.Type) -> bool:
+    """Check if the LLVM type is a floating-point type."""
+    return type(llvm_type) in FP_WIDTHS
+
+
+def get_element_type(llvm_type: ir.Type) -> ir.Type:
+    """Get the type of the lanes of a vector type (or the scalar type)."""
+    if isinstance(llvm_type, ir.VectorType):
+        return llvm_type.element
+    return llvm_type
+
+
+def is_buffer_type(llvm_type: ir.Type) -> bool:
+    """Check if the LLVM type is a buffer (`{T*, i64}`), see `BufferType`."""
+    return (
+        isinstance(llvm_type, ir.LiteralStructType)
+        and len(llvm_type.elements) == 2  # noqa: PLR2004
+        and isinstance(llvm_type.elements[0], ir.PointerType)
+    )
 
 
 def safe_pop(lst: list[ir.Value | ir.Function]) -> ir.Value | ir.Function:
@@ -41,7 +243,9 @@ class VariablesLLVM:
     FLOAT_TYPE: ir.types.Type
     DOUBLE_TYPE: ir.types.Type
     INT8_TYPE: ir.types.Type
+    INT16_TYPE: ir.types.Type
     INT32_TYPE: ir.types.Type
+    INT64_TYPE: ir.types.Type
     VOID_TYPE: ir.types.Type
 
     context: ir.context.Context
@@ -67,8 +271,12 @@ class VariablesLLVM:
             return self.DOUBLE_TYPE
         elif type_name == "int8":
             return self.INT8_TYPE
+        elif type_name == "int16":
+            return self.INT16_TYPE
         elif type_name == "int32":
             return self.INT32_TYPE
+        elif type_name == "int64":
+            return self.INT64_TYPE
         elif type_name == "char":
             return self.INT8_TYPE
         elif type_name == "void":
@@ -80,46 +288,113 @@ class VariablesLLVM:
 class LLVMLiteIRVisitor(BuilderVisitor):
     """LLVM-IR Translator."""
 
-    # AllocaInst
-    named_values: dict[str, Any] = {}  # noqa: RUF012
+    # the allocas of the variables (and the values of the loop variables)
+    symbols: ScopedSymbolTable
     _llvm: VariablesLLVM
 
     function_protos: dict[str, astx.FunctionPrototype]
-    result_stack: list[ir.Value | ir.Function] = []  # noqa: RUF012
+    result_stack: list[ir.Value | ir.Function]
+    define_builtins: bool
+    lazy_builtins: bool
+    fast_math_flags: tuple[str, ...]
+    profile_generate: Optional[ProfilePath]
+    profile_use: Optional[BlockProfile]
+    profile_counters: list[str]
+
+    def __init__(
+        self,
+        define_builtins: bool = True,
+        fast_math: Union[bool, Sequence[str]] = False,
+        lazy_builtins: bool = False,
+        profile_generate: Optional[ProfilePath] = None,
+        profile_use: Optional[BlockProfile] = None,
+    ) -> None:
+        """
+        Initialize LLVMTranslator object.
 
-    def __init__(self) -> None:
-        """Initialize LLVMTranslator object."""
+        Parameters
+        ----------
+            define_builtins (bool): Define the builtin functions (e.g.
+                `putchard`) in the module, otherwise they are only declared.
+            fast_math (bool | Sequence[str]): The fast-math flags of the
+                floating-point instructions, see `get_fast_math_flags`.
+            lazy_builtins (bool): Add each builtin function to the module
+                only when it is first used, instead of adding all of them
+                to each module.
+            profile_generate (ProfilePath, optional): Instrument the
+                module: the entry block of each function and the blocks of
+                the `if` statements and of the loops count their runs, and
+                the counts are appended to this profile file at exit, see
+                `emit_profile_runtime`.
+            profile_use (BlockProfile, optional): The profile of an
+                instrumented build of the same ASTx, used to add the
+                `branch_weights` of the `if` statements and of the loops
+                and the `inlinehint` and `cold` function attributes.
+        """
         super().__init__()
+        self.define_builtins = define_builtins
+        self.lazy_builtins = lazy_builtins
+        self.fast_math_flags = get_fast_math_flags(fast_math)
+        self.profile_generate = profile_generate
+        self.profile_use = profile_use
+        self.profile_counters = []
+        self.symbols = ScopedSymbolTable()
         self.function_protos: dict[str, astx.FunctionPrototype] = {}
         self.result_stack: list[ir.Value | ir.Function] = []
 
         self.initialize()
 
         self.target = llvm.Target.from_default_triple()
-        self.target_machine = self.target.create_target_machine(
-            codemodel="small"
+        # position independent code, so the objects can be linked in
+        # executables and in shared libraries
+        self.target_machine = get_target_machine(
+            codemodel="small", reloc="pic"
         )
 
-        self._add_builtins()
+        if not self.lazy_builtins:
+            self._add_builtins()
+
+    def reset(self) -> None:
+        """
+        Reset the translator state for a new module.
+
+        The LLVM initialization, the data types and the target machine are
+        kept, so it is cheaper than creating a new translator.
+        """
+        self.function_protos = {}
+        self.result_stack = []
+        self.symbols.clear()
+        self.profile_counters = []
+
+        self.new_module()
+        self._llvm.ir_builder = ir.IRBuilder()
+
+        if not self.lazy_builtins:
+            self._add_builtins()
 
     def translate(self, expr: astx.AST) -> str:
         """Translate an ASTx expression to string."""
         self.visit(expr)
         return str(self._llvm.module)
 
+    def new_module(self) -> ir.Module:
+        """
+        Create the LLVM module to be translated, with its own context.
+
+        The types and the names of llvmlite are scoped by the context, so
+        the modules translated in different threads don't share any state.
+        """
+        self._llvm.context = ir.Context()
+        self._llvm.module = ir.Module("Arx", context=self._llvm.context)
+        return self._llvm.module
+
     def initialize(self) -> None:
         """Initialize self."""
-        # self._llvm.context = ir.context.Context()
         self._llvm = VariablesLLVM()
-        self._llvm.module = ir.module.Module("Arx")
+        self.new_module()
 
-        # initialize the target registry etc.
-        llvm.initialize()
-        llvm.initialize_all_asmprinters()
-        llvm.initialize_all_targets()
-        llvm.initialize_native_target()
-        llvm.initialize_native_asmparser()
-        llvm.initialize_native_asmprinter()
+        # initialize the target registry etc. (once per process)
+        initialize_llvm()
 
         # Create a new builder for the module.
         self._llvm.ir_builder = ir.IRBuilder()
@@ -128,36 +403,57 @@ class LLVMLiteIRVisitor(BuilderVisitor):
         self._llvm.FLOAT_TYPE = ir.FloatType()
         self._llvm.DOUBLE_TYPE = ir.DoubleType()
         self._llvm.INT8_TYPE = ir.IntType(8)
+        self._llvm.INT16_TYPE = ir.IntType(16)
         self._llvm.INT32_TYPE = ir.IntType(32)
+        self._llvm.INT64_TYPE = ir.IntType(64)
         self._llvm.VOID_TYPE = ir.VoidType()
 
     def _add_builtins(self) -> None:
+        for name in BUILTIN_FUNCTIONS:
+            self.add_builtin(name)
+
+    def add_builtin(self, name: str) -> ir.Function:
+        """
+        Add a builtin function to the module, if it isn't there yet.
+
+        Parameters
+        ----------
+            name (str): The name of the builtin, see `BUILTIN_FUNCTIONS`.
+
+        Returns
+        -------
+            ir.Function: The function added, or the existing one.
+        """
+        if name in self._llvm.module.globals:
+            return cast(ir.Function, self._llvm.module.get_global(name))
+        if name not in BUILTIN_FUNCTIONS:
+            raise Exception(f"[EE]: builtin function not defined: {name}")
+
         # The C++ tutorial adds putchard() simply by defining it in the host
         # C++ code, which is then accessible to the JIT. It doesn't work as
         # simply for us; but luckily it's very easy to define new "C level"
         # functions for our JITed code to use - just emit them as LLVM IR.
         # This is what this method does.
-
-        # Add the declaration of putchar
-        putchar_ty = ir.FunctionType(
+        function_ty = ir.FunctionType(
             self._llvm.INT32_TYPE, [self._llvm.INT32_TYPE]
         )
-        putchar = ir.Function(self._llvm.module, putchar_ty, "putchar")
+        function = ir.Function(self._llvm.module, function_ty, name)
 
-        # Add putchard
-        putchard_ty = ir.FunctionType(
-            self._llvm.INT32_TYPE, [self._llvm.INT32_TYPE]
-        )
-        putchard = ir.Function(self._llvm.module, putchard_ty, "putchard")
+        # putchar comes from the C library, and without define_builtins
+        # putchard is defined by another module linked together with this one
+        if name == "putchar" or not self.define_builtins:
+            return function
 
-        ir_builder = ir.IRBuilder(putchard.append_basic_block("entry"))
+        putchar = self.add_builtin("putchar")
+        ir_builder = ir.IRBuilder(function.append_basic_block("entry"))
 
         ival = ir_builder.fptoui(
-            putchard.args[0], self._llvm.INT32_TYPE, "intcast"
+            function.args[0], self._llvm.INT32_TYPE, "intcast"
         )
 
         ir_builder.call(putchar, [ival])
         ir_builder.ret(ir.Constant(self._llvm.INT32_TYPE, 0))
+        return function
 
     def get_function(self, name: str) -> Optional[ir.Function]:
         """
@@ -174,10 +470,154 @@ class LLVMLiteIRVisitor(BuilderVisitor):
             self.visit(self.function_protos[name])
             return cast(ir.Function, self.result_stack.pop())
 
+        if self.lazy_builtins and name in BUILTIN_FUNCTIONS:
+            return self.add_builtin(name)
+
         return None
 
+    def get_type_name(self, type_: astx.AST) -> str:
+        """
+        Get the LLVM data type name for the given ASTx data type.
+
+        Parameters
+        ----------
+            type_ (astx.DataType): The ASTx data type, e.g. `astx.Float64()`.
+
+        Returns
+        -------
+            str: The type name used by `VariablesLLVM.get_data_type`.
+        """
+        type_name = ASTX_TYPE_NAMES.get(type(type_))
+        if type_name is None:
+            raise Exception(
+                f"[EE]: type not supported: {type(type_).__name__}"
+            )
+        return type_name
+
+    def get_llvm_type(self, type_: astx.AST) -> ir.Type:
+        """
+        Get the LLVM data type for the given ASTx data type.
+
+        A `VectorType` is lowered to a LLVM vector, and a `BufferType` to a
+        struct with the pointer to the data and the length (`{T*, i64}`).
+        """
+        if isinstance(type_, VectorType):
+            element_type = self.get_llvm_type(type_.element_type)
+            return ir.VectorType(element_type, type_.width)
+        if isinstance(type_, BufferType):
+            element_type = self.get_llvm_type(type_.element_type)
+            return ir.LiteralStructType(
+                [element_type.as_pointer(), self._llvm.INT64_TYPE]
+            )
+        return self._llvm.get_data_type(self.get_type_name(type_))
+
+    def convert(self, value: ir.Value, llvm_type: ir.Type) -> ir.Value:
+        """
+        Convert the value to the given LLVM type.
+
+        Integers are signed, except the `i1` booleans, and a scalar
+        converted to a vector type is broadcast to all the lanes.
+
+        Parameters
+        ----------
+            value (ir.Value): The value to be converted.
+            llvm_type (ir.Type): The LLVM type of the result.
+
+        Returns
+        -------
+            ir.Value: The converted value (the same value if it already has
+                the given type).
+        """
+        value_type = value.type
+        if value_type == llvm_type:
+            return value
+
+        if isinstance(llvm_type, ir.VectorType):
+            if not isinstance(value_type, ir.VectorType):
+                return self.emit_splat(
+                    self.convert(value, llvm_type.element), llvm_type.count
+                )
+            if value_type.count != llvm_type.count:
+                raise Exception(
+                    f"[EE]: vector width mismatch: {value_type} and "
+                    f"{llvm_type}"
+                )
+        elif isinstance(value_type, ir.VectorType):
+            raise Exception(f"[EE]: vector can't be converted to {llvm_type}")
+
+        ir_builder = self._llvm.ir_builder
+        from_type = get_element_type(value_type)
+        to_type = get_element_type(llvm_type)
+        if is_fp_type(from_type) and is_fp_type(to_type):
+            if FP_WIDTHS[type(from_type)] < FP_WIDTHS[type(to_type)]:
+                return ir_builder.fpext(value, llvm_type, "fpexttmp")
+            return ir_builder.fptrunc(value, llvm_type, "fptrunctmp")
+        is_bool = not is_fp_type(from_type) and from_type.width == 1
+        if is_fp_type(to_type):
+            if is_bool:
+                return ir_builder.uitofp(value, llvm_type, "uitofptmp")
+            return ir_builder.sitofp(value, llvm_type, "sitofptmp")
+        if is_fp_type(from_type):
+            return ir_builder.fptosi(value, llvm_type, "fptositmp")
+        if from_type.width < to_type.width:
+            if is_bool:
+                return ir_builder.zext(value, llvm_type, "zexttmp")
+            return ir_builder.sext(value, llvm_type, "sexttmp")
+        return ir_builder.trunc(value, llvm_type, "trunctmp")
+
+    def emit_splat(self, value: ir.Value, width: int) -> ir.Value:
+        """Broadcast a scalar value to all the lanes of a new vector."""
+        ir_builder = self._llvm.ir_builder
+        vector_type = ir.VectorType(value.type, width)
+        undef = ir.Constant(vector_type, ir.Undefined)
+        lane = ir_builder.insert_element(
+            undef, value, ir.Constant(self._llvm.INT32_TYPE, 0), "splattmp"
+        )
+        mask = ir.Constant(
+            ir.VectorType(self._llvm.INT32_TYPE, width), [0] * width
+        )
+        return ir_builder.shuffle_vector(lane, undef, mask, "splat")
+
+    def promote(
+        self, lhs: ir.Value, rhs: ir.Value
+    ) -> tuple[ir.Value, ir.Value]:
+        """
+        Convert the operands of a binary operation to a common type.
+
+        It is the widest floating-point type of the operands, if any,
+        otherwise the widest integer type, and a vector of it if one of the
+        operands is a vector.
+        """
+        if lhs.type == rhs.type:
+            return lhs, rhs
+
+        vector_type = next(
+            (
+                value.type
+                for value in (lhs, rhs)
+                if isinstance(value.type, ir.VectorType)
+            ),
+            None,
+        )
+        lhs_type = get_element_type(lhs.type)
+        rhs_type = get_element_type(rhs.type)
+
+        lhs_fp, rhs_fp = is_fp_type(lhs_type), is_fp_type(rhs_type)
+        if lhs_fp and rhs_fp:
+            wider = FP_WIDTHS[type(lhs_type)] >= FP_WIDTHS[type(rhs_type)]
+            common_type = lhs_type if wider else rhs_type
+        elif lhs_fp or rhs_fp:
+            common_type = lhs_type if lhs_fp else rhs_type
+        else:
+            wider = lhs_type.width >= rhs_type.width
+            common_type = lhs_type if wider else rhs_type
+
+        if vector_type is not None:
+            common_type = ir.VectorType(common_type, vector_type.count)
+        return self.convert(lhs, common_type), self.convert(rhs, common_type)
+
     def create_entry_block_alloca(
-        self, var_name: str, type_name: str
+        self, var_name: str, type_name: Union[str, ir.Type]
     ) -> Any:  # llvm.AllocaInst
         """
         Create an alloca instruction in the entry block of the function.
@@ -188,19 +628,22 @@ class LLVMLiteIRVisitor(BuilderVisitor):
         ----------
         fn: The llvm function
         var_name: The variable name
-        type_name: The type name
+        type_name: The type name, or the LLVM type
 
         Returns
         -------
           An llvm allocation instance.
         """
+        saved_block = self._llvm.ir_builder.block
         self._llvm.ir_builder.position_at_start(
             self._llvm.ir_builder.function.entry_basic_block
         )
-        alloca = self._llvm.ir_builder.alloca(
-            self._llvm.get_data_type(type_name), None, var_name
-        )
-        self._llvm.ir_builder.position_at_end(self._llvm.ir_builder.block)
+        if isinstance(type_name, str):
+            llvm_type = self._llvm.get_data_type(type_name)
+        else:
+            llvm_type = type_name
+        alloca = self._llvm.ir_builder.alloca(llvm_type, None, var_name)
+        self._llvm.ir_builder.position_at_end(saved_block)
         return alloca
 
     @dispatch.abstract
@@ -209,8 +652,13 @@ class LLVMLiteIRVisitor(BuilderVisitor):
         raise Exception("Not implemented yet.")
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.BinaryOp) -> None:
-        """Translate binary operation expression."""
+    def visit(self, expr: astx.BinaryOp) -> VisitGenerator:
+        """
+        Translate binary operation expression.
+
+        The operands are converted to a common type (see `promote`), and
+        the comparisons return 1 or 0 in this type.
+        """
         if expr.op_code == "=":
             # Special case '=' because we don't want to emit the lhs as an
             # expression.
@@ -221,112 +669,118 @@ class LLVMLiteIRVisitor(BuilderVisitor):
             # dynamic_cast for automatic error checking.
             var_lhs = expr.lhs
 
-            if not isinstance(var_lhs, astx.VariableExprAST):
+            if not isinstance(var_lhs, astx.Variable):
                 raise Exception("destination of '=' must be a variable")
 
             # Codegen the rhs.
-            self.visit(expr.rhs)
+            yield expr.rhs
             llvm_rhs = safe_pop(self.result_stack)
 
             if not llvm_rhs:
                 raise Exception("codegen: Invalid rhs expression.")
 
             # Look up the name.
-            llvm_lhs = self.named_values.get(var_lhs.get_name())
+            llvm_lhs = self.symbols.get(var_lhs.name)
 
             if not llvm_lhs:
                 raise Exception("codegen: Invalid lhs variable name")
 
+            if not isinstance(llvm_lhs, ir.AllocaInstr):
+                raise Exception("codegen: buffers can't be assigned")
+
+            llvm_rhs = self.convert(llvm_rhs, llvm_lhs.type.pointee)
             self._llvm.ir_builder.store(llvm_rhs, llvm_lhs)
             result = llvm_rhs
             self.result_stack.append(result)
             return
 
-        self.visit(expr.lhs)
+        yield expr.lhs
         llvm_lhs = safe_pop(self.result_stack)
 
-        self.visit(expr.rhs)
+        yield expr.rhs
         llvm_rhs = safe_pop(self.result_stack)
 
         if not llvm_lhs or not llvm_rhs:
             raise Exception("codegen: Invalid lhs/rhs")
 
-        if expr.op_code == "+":
-            # note: it should be according the datatype,
-            #       e.g. for float it should be fadd
-            result = self._llvm.ir_builder.add(llvm_lhs, llvm_rhs, "addtmp")
-            self.result_stack.append(result)
-            return
-        elif expr.op_code == "-":
-            # note: it should be according the datatype,
-            #       e.g. for float it should be fsub
-            result = self._llvm.ir_builder.sub(llvm_lhs, llvm_rhs, "subtmp")
-            self.result_stack.append(result)
-            return
-        elif expr.op_code == "*":
-            # note: it should be according the datatype,
-            #       e.g. for float it should be fmul
-            result = self._llvm.ir_builder.mul(llvm_lhs, llvm_rhs, "multmp")
-            self.result_stack.append(result)
-            return
-        elif expr.op_code == "<":
-            # note: it should be according the datatype,
-            #       e.g. for float it should be fcmp
-            cmp_result = self._llvm.ir_builder.cmp_unordered(
-                "<", llvm_lhs, llvm_rhs, "lttmp"
-            )
-            result = self._llvm.ir_builder.uitofp(
-                cmp_result, self._llvm.INT32_TYPE, "booltmp"
-            )
-            self.result_stack.append(result)
-            return
-        elif expr.op_code == ">":
-            # note: it should be according the datatype,
-            #       e.g. for float it should be fcmp
-            cmp_result = self._llvm.ir_builder.cmp_unordered(
-                ">", llvm_lhs, llvm_rhs, "gttmp"
+        llvm_lhs, llvm_rhs = self.promote(llvm_lhs, llvm_rhs)
+        if is_fp_type(get_element_type(llvm_lhs.type)):
+            result = self.emit_fp_binary_op(expr.op_code, llvm_lhs, llvm_rhs)
+        else:
+            result = self.emit_int_binary_op(expr.op_code, llvm_lhs, llvm_rhs)
+        self.result_stack.append(result)
+
+    def emit_fp_binary_op(
+        self, op_code: str, llvm_lhs: ir.Value, llvm_rhs: ir.Value
+    ) -> ir.Value:
+        """Emit a binary operation on floating-point operands."""
+        ir_builder = self._llvm.ir_builder
+        flags = self.fast_math_flags
+
+        if op_code == "+":
+            return ir_builder.fadd(llvm_lhs, llvm_rhs, "addtmp", flags)
+        elif op_code == "-":
+            return ir_builder.fsub(llvm_lhs, llvm_rhs, "subtmp", flags)
+        elif op_code == "*":
+            return ir_builder.fmul(llvm_lhs, llvm_rhs, "multmp", flags)
+        elif op_code == "/":
+            return ir_builder.fdiv(llvm_lhs, llvm_rhs, "divtmp", flags)
+        elif op_code in ("<", ">"):
+            cmp_result = ir_builder.fcmp_ordered(
+                op_code, llvm_lhs, llvm_rhs, "cmptmp", flags
             )
-            result = self._llvm.ir_builder.uitofp(
-                cmp_result, self._llvm.INT32_TYPE, "booltmp"
+            return ir_builder.uitofp(cmp_result, llvm_lhs.type, "booltmp")
+
+        raise Exception(f"Binary op {op_code} not implemented yet.")
+
+    def emit_int_binary_op(
+        self, op_code: str, llvm_lhs: ir.Value, llvm_rhs: ir.Value
+    ) -> ir.Value:
+        """Emit a binary operation on integer operands."""
+        ir_builder = self._llvm.ir_builder
+
+        if op_code == "+":
+            return ir_builder.add(llvm_lhs, llvm_rhs, "addtmp")
+        elif op_code == "-":
+            return ir_builder.sub(llvm_lhs, llvm_rhs, "subtmp")
+        elif op_code == "*":
+            return ir_builder.mul(llvm_lhs, llvm_rhs, "multmp")
+        elif op_code == "/":
+            # Assuming the division is signed by default. Use `udiv` for
+            # unsigned division.
+            return ir_builder.sdiv(llvm_lhs, llvm_rhs, "divtmp")
+        elif op_code in ("<", ">"):
+            cmp_result = ir_builder.icmp_signed(
+                op_code, llvm_lhs, llvm_rhs, "cmptmp"
             )
-            self.result_stack.append(result)
-            return
-        elif expr.op_code == "/":
-            # Check the datatype to decide between floating-point and integer
-            # division
-            if self._llvm.FLOAT_TYPE in (llvm_lhs.type, llvm_rhs.type):
-                # Floating-point division
-                result = self._llvm.ir_builder.fdiv(
-                    llvm_lhs, llvm_rhs, "divtmp"
-                )
-            else:
-                # Assuming the division is signed by default. Use `udiv` for
-                # unsigned division.
-                result = self._llvm.ir_builder.sdiv(
-                    llvm_lhs, llvm_rhs, "divtmp"
-                )
-            self.result_stack.append(result)
-            return
+            return ir_builder.zext(cmp_result, llvm_lhs.type, "booltmp")
 
-        raise Exception(f"Binary op {expr.op_code} not implemented yet.")
+        raise Exception(f"Binary op {op_code} not implemented yet.")
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, block: astx.Block) -> None:
-        """Translate ASTx Block to LLVM-IR."""
-        result = []
+    def visit(self, block: astx.Block) -> VisitGenerator:
+        """
+        Translate ASTx Block to LLVM-IR.
+
+        The value of the block is the last result of its statements, and
+        the variables declared in the block are only visible in the block.
+        """
+        result = None
+        self.symbols.push_scope()
         for node in block.nodes:
-            self.visit(node)
-            try:
-                result.append(self.result_stack.pop())
-            except IndexError:
-                # some nodes doesn't add anything in the stack
-                pass
+            depth = len(self.result_stack)
+            yield node
+            # some nodes doesn't add anything in the stack
+            if len(self.result_stack) > depth:
+                result = self.result_stack[-1]
+                del self.result_stack[depth:]
+        self.symbols.pop_scope()
         self.result_stack.append(result)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.IfStmt) -> None:
+    def visit(self, expr: astx.IfStmt) -> VisitGenerator:
         """Translate IF statement."""
-        self.visit(expr.cond)
+        yield expr.condition
         cond_v = self.result_stack.pop()
 
         if not cond_v:
@@ -354,280 +808,479 @@ class LLVMLiteIRVisitor(BuilderVisitor):
         else_bb = ir.Block(self._llvm.ir_builder.function, "else")
         merge_bb = ir.Block(self._llvm.ir_builder.function, "ifcont")
 
-        self._llvm.ir_builder.cbranch(cond_v, then_bb, else_bb)
+        branch = self._llvm.ir_builder.cbranch(cond_v, then_bb, else_bb)
+        self.set_branch_weights(branch, then_bb, else_bb)
 
         # Emit then value.
         self._llvm.ir_builder.position_at_start(then_bb)
-        self.visit(expr.then_)
+        self.emit_block_counter(then_bb)
+        yield expr.then
         then_v = self.result_stack.pop()
 
-        if not then_v:
-            raise Exception("codegen: `Then` expression is invalid.")
-
-        self._llvm.ir_builder.branch(merge_bb)
-
         # Codegen of 'then' can change the current block, update then_bb
-        # for the PHI.
+        # for the PHI. A block that returns doesn't reach the merge block.
         then_bb = self._llvm.ir_builder.block
+        if then_bb.is_terminated:
+            then_bb = None
+        else:
+            self._llvm.ir_builder.branch(merge_bb)
 
         # Emit else block.
         self._llvm.ir_builder.function.basic_blocks.append(else_bb)
         self._llvm.ir_builder.position_at_start(else_bb)
-        self.visit(expr.else_)
-        else_v = self.result_stack.pop()
-        if not else_v:
-            raise Exception("Revisit this!")
+        self.emit_block_counter(else_bb)
+        else_v = None
+        if expr.else_ is not None:
+            yield expr.else_
+            else_v = self.result_stack.pop()
+        elif then_v is not None:
+            else_v = ir.Constant(then_v.type, 0)
+
+        self.result_stack.append(
+            self.emit_if_merge(then_v, then_bb, else_v, merge_bb)
+        )
 
-        # Emission of else_val could have modified the current basic block.
-        else_bb = self._llvm.ir_builder.block
-        self._llvm.ir_builder.branch(merge_bb)
+    def emit_if_merge(
+        self,
+        then_v: Optional[ir.Value],
+        then_bb: Optional[ir.Block],
+        else_v: Optional[ir.Value],
+        merge_bb: ir.Block,
+    ) -> Optional[ir.Value]:
+        """
+        Emit the merge block of an `if` statement, after its else block.
 
-        # Emit merge block.
-        self._llvm.ir_builder.function.basic_blocks.append(merge_bb)
-        self._llvm.ir_builder.position_at_start(merge_bb)
-        phi = self._llvm.ir_builder.phi(self._llvm.INT32_TYPE, "iftmp")
+        Parameters
+        ----------
+            then_v (ir.Value, optional): The value of the then block.
+            then_bb (ir.Block, optional): The last block of the then block,
+                None if it doesn't reach the merge block.
+            else_v (ir.Value, optional): The value of the else block.
+            merge_bb (ir.Block): The merge block, not added yet.
 
+        Returns
+        -------
+            ir.Value, optional: The value of the `if` statement, only when
+                both blocks reach the merge block with a value.
+        """
+        ir_builder = self._llvm.ir_builder
+        # Emission of else_val could have modified the current basic block.
+        else_bb = ir_builder.block
+        if else_bb.is_terminated or then_bb is None or then_v is None:
+            else_v = None
+        elif else_v is not None:
+            else_v = self.convert(else_v, then_v.type)
+
+        if not else_bb.is_terminated:
+            ir_builder.branch(merge_bb)
+        elif then_bb is None:
+            # the code after an `if` where both blocks return is unreachable
+            return None
+
+        ir_builder.function.basic_blocks.append(merge_bb)
+        ir_builder.position_at_start(merge_bb)
+        if then_v is None or else_v is None:
+            return None
+
+        phi = ir_builder.phi(then_v.type, "iftmp")
         phi.add_incoming(then_v, then_bb)
         phi.add_incoming(else_v, else_bb)
+        return phi
 
-        self.result_stack.append(phi)
-
-    @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.ForCountLoopStmt) -> None:
-        """Translate ASTx For Range Loop to LLVM-IR."""
-        saved_block = self._llvm.ir_builder.block
-        var_addr = self.create_entry_block_alloca("for_count_loop", "int32")
-        self._llvm.ir_builder.position_at_end(saved_block)
-
-        # Emit the start code first, without 'variable' in scope.
-        self.visit(expr.initializer)
-        initializer_val = self.result_stack.pop()
-        if not initializer_val:
-            raise Exception("codegen: Invalid start argument.")
-
-        # Store the value into the alloca.
-        self._llvm.ir_builder.store(initializer_val, var_addr)
-
-        # Make the new basic block for the loop header, inserting after
-        # current block.
-        loop_bb = self._llvm.ir_builder.function.append_basic_block("loop")
-
-        # Insert an explicit fall through from the current block to the
-        # loop_bb.
-        self._llvm.ir_builder.branch(loop_bb)
-
-        # Start insertion in loop_bb.
-        self._llvm.ir_builder.position_at_start(loop_bb)
-
-        # Within the loop, the variable is defined equal to the PHI node.
-        # If it shadows an existing variable, we have to restore it, so save
-        # it now.
-        old_val = self.named_values.get(expr.initializer.name)
-        self.named_values[expr.initializer.name] = var_addr
+    def get_count_loop_bounds(
+        self, expr: astx.ForCountLoopStmt
+    ) -> tuple[str, astx.AST, astx.AST]:
+        """
+        Get the comparison, the end and the step of a counted loop.
 
-        # Emit the body of the loop. This, like any other expr, can change
-        # the current basic_block. Note that we ignore the value computed by
-        # the body, but don't allow an error.
-        self.visit(expr.body)
-        body_val = self.result_stack.pop()
+        The update should be `++`, `--`, `+=`, `-=` or `x = x + step`.
 
-        if not body_val:
-            return
+        Parameters
+        ----------
+            expr (astx.ForCountLoopStmt): The loop.
 
-        # Emit the step value.
-        if expr.step:
-            self.visit(expr.step)
-            step_val = self.result_stack.pop()
-            if not step_val:
-                return
+        Returns
+        -------
+            tuple[str, astx.AST, astx.AST]: The comparison operator (applied
+                as `variable <op> end`), the end and the step expressions.
+        """
+        name = expr.initializer.name
+        cond = expr.condition
+        update = expr.update
+
+        def is_loop_variable(node: astx.AST) -> bool:
+            return isinstance(node, astx.Variable) and node.name == name
+
+        if not isinstance(cond, astx.BinaryOp) or cond.op_code not in (
+            LOOP_COMPARISONS
+        ):
+            raise Exception("[EE]: For loop condition not supported.")
+        if is_loop_variable(cond.lhs):
+            op_code, end = cond.op_code, cond.rhs
+        elif is_loop_variable(cond.rhs):
+            op_code, end = LOOP_COMPARISONS[cond.op_code], cond.lhs
         else:
-            # If not specified, use 1.0.
-            step_val = ir.Constant(self._llvm.INT32_TYPE, 1)
-
-        # Compute the end condition.
-        self.visit(expr.end)
-        end_cond = self.result_stack.pop()
-        if not end_cond:
-            return
+            raise Exception("[EE]: For loop condition not supported.")
+
+        step: Optional[astx.AST] = None
+        if isinstance(update, astx.UnaryOp) and is_loop_variable(
+            update.operand
+        ):
+            if update.op_code in ("++", "--"):
+                step = astx.LiteralInt32(1 if update.op_code == "++" else -1)
+        elif isinstance(update, astx.BinaryOp) and is_loop_variable(
+            update.lhs
+        ):
+            rhs = update.rhs
+            if update.op_code == "+=":
+                step = rhs
+            elif update.op_code == "-=":
+                step = astx.UnaryOp("-", rhs)
+            elif (
+                update.op_code == "="
+                and isinstance(rhs, astx.BinaryOp)
+                and rhs.op_code == "+"
+                and is_loop_variable(rhs.lhs)
+            ):
+                step = rhs.rhs
+
+        if step is None:
+            raise Exception("[EE]: For loop update not supported.")
+        return op_code, end, step
+
+    def emit_loop(  # noqa: PLR0913
+        self,
+        variable: astx.InlineVariableDeclaration,
+        start: astx.AST,
+        end: astx.AST,
+        step: astx.AST,
+        *,
+        body: astx.Block,
+        op_code: Optional[str] = None,
+        hints: Optional[LoopHints] = None,
+    ) -> VisitGenerator:
+        """
+        Lower a counted loop to the canonical LLVM loop form.
 
-        # Reload, increment, and restore the var_addr. This handles the case
-        # where the body of the loop mutates the variable.
-        cur_var = self._llvm.ir_builder.load(var_addr, expr.initializer.name)
-        next_var = self._llvm.ir_builder.add(cur_var, step_val, "nextvar")
-        self._llvm.ir_builder.store(next_var, var_addr)
+        The loop is tested at the top, so the LLVM loop passes can compute
+        its trip count.
 
-        # Convert condition to a bool by comparing non-equal to zero
-        if isinstance(end_cond.type, (ir.FloatType, ir.DoubleType)):
-            cmp_instruction = self._llvm.ir_builder.fcmp_ordered
-            zero_val = ir.Constant(end_cond.type, 0.0)
+        Parameters
+        ----------
+            variable (astx.InlineVariableDeclaration): The loop variable.
+            start (astx.AST): The initial value of the variable.
+            end (astx.AST): The end of the loop (excluded).
+            step (astx.AST): The value added to the variable each iteration.
+            body (astx.Block): The loop body.
+            op_code (str, optional): The comparison of the variable with the
+                end that keeps the loop running, by default `<` for a
+                positive step and `>` for a negative one.
+            hints (LoopHints, optional): The optimization hints, attached
+                as `llvm.loop` metadata to the latch branch.
+        """
+        ir_builder = self._llvm.ir_builder
+        var_type = self.get_llvm_type(variable.type_)
+
+        # the preheader: the loop-invariant values
+        yield start
+        start_val = self.convert(safe_pop(self.result_stack), var_type)
+        yield end
+        end_val = self.convert(safe_pop(self.result_stack), var_type)
+        yield step
+        step_val = self.convert(safe_pop(self.result_stack), var_type)
+
+        var_addr = None
+        if variable.name in get_assigned_variables(body):
+            var_addr = self.create_entry_block_alloca(variable.name, var_type)
+            ir_builder.store(start_val, var_addr)
+
+        preheader_bb = ir_builder.block
+        function = ir_builder.function
+        header_bb = function.append_basic_block("loop.header")
+        body_bb = function.append_basic_block("loop.body")
+        exit_bb = ir.Block(function, "loop.exit")
+        ir_builder.branch(header_bb)
+
+        # the header: the induction variable and the exit test, a direct
+        # comparison with the end. The induction variable is a phi node,
+        # unless the body assigns it: then the next iteration starts from the
+        # value assigned.
+        ir_builder.position_at_end(header_bb)
+        if var_addr is not None:
+            induction = ir_builder.load(var_addr, variable.name)
         else:
-            cmp_instruction = self._llvm.ir_builder.icmp_signed
-            zero_val = ir.Constant(end_cond.type, 0)
-
-        end_cond = cmp_instruction(
-            "!=",
-            end_cond,
-            zero_val,
-            "loopcond",
-        )
-
-        # Create the "after loop" block and insert it.
-        after_bb = self._llvm.ir_builder.function.append_basic_block(
-            "afterloop"
+            induction = ir_builder.phi(var_type, variable.name)
+            induction.add_incoming(start_val, preheader_bb)
+
+        if op_code is not None:
+            cond = self.emit_loop_comparison(op_code, induction, end_val)
+        elif isinstance(step_val, ir.Constant):
+            op_code = "<" if step_val.constant >= 0 else ">"
+            cond = self.emit_loop_comparison(op_code, induction, end_val)
+        else:
+            # the direction of the loop is only known at run time
+            zero = ir.Constant(var_type, 0)
+            cond = ir_builder.select(
+                self.emit_loop_comparison(">", step_val, zero),
+                self.emit_loop_comparison("<", induction, end_val),
+                self.emit_loop_comparison(">", induction, end_val),
+                "loopcond",
+            )
+        branch = ir_builder.cbranch(cond, body_bb, exit_bb)
+        self.set_branch_weights(branch, body_bb, exit_bb)
+
+        # the body and the latch
+        ir_builder.position_at_end(body_bb)
+        self.emit_block_counter(body_bb)
+        # the loop variable shadows a variable of the same name
+        self.symbols.push_scope()
+        self.symbols.define(
+            variable.name, induction if var_addr is None else var_addr
         )
 
-        # Insert the conditional branch into the end of loop_bb.
-        self._llvm.ir_builder.cbranch(end_cond, loop_bb, after_bb)
+        depth = len(self.result_stack)
+        yield body
+        # the value of the body is not used
+        del self.result_stack[depth:]
 
-        # Any new code will be inserted in after_bb.
-        self._llvm.ir_builder.position_at_start(after_bb)
+        if not ir_builder.block.is_terminated:
+            self.emit_loop_latch(
+                induction, var_addr, step_val, header_bb, hints=hints
+            )
 
-        # Restore the unshadowed variable.
-        if old_val:
-            self.named_values[expr.initializer.name] = old_val
+        # the exit
+        function.basic_blocks.append(exit_bb)
+        ir_builder.position_at_end(exit_bb)
+        self.emit_block_counter(exit_bb)
+
+        self.symbols.pop_scope()
+
+        # for expr always returns 0.
+        self.result_stack.append(ir.Constant(self._llvm.INT32_TYPE, 0))
+
+    def emit_loop_latch(
+        self,
+        induction: ir.Instruction,
+        var_addr: Optional[ir.AllocaInstr],
+        step_val: ir.Value,
+        header_bb: ir.Block,
+        *,
+        hints: Optional[LoopHints] = None,
+    ) -> None:
+        """Add the step to the loop variable and branch to the header."""
+        ir_builder = self._llvm.ir_builder
+        current = induction
+        if var_addr is not None:
+            current = ir_builder.load(var_addr)
+        if is_fp_type(current.type):
+            next_val = ir_builder.fadd(
+                current, step_val, "nextvar", self.fast_math_flags
+            )
         else:
-            self.named_values.pop(expr.initializer.name, None)
-
-        # for expr always returns 0.0.
-        result = ir.Constant(self._llvm.INT32_TYPE, 0)
-        self.result_stack.append(result)
+            # the overflow of a signed induction variable is undefined, so
+            # LLVM can compute the trip count
+            next_val = ir_builder.add(
+                current, step_val, "nextvar", flags=("nsw",)
+            )
+        if var_addr is not None:
+            ir_builder.store(next_val, var_addr)
+        else:
+            induction.add_incoming(next_val, ir_builder.block)
+        latch = ir_builder.branch(header_bb)
+        if hints is not None:
+            latch.set_metadata("llvm.loop", self.get_loop_id(hints))
+
+    def get_loop_id(self, hints: LoopHints) -> ir.MDValue:
+        """Create the `llvm.loop` metadata (the loop ID) of the hints."""
+        module = self._llvm.module
+        operands = []
+        for name, value, width in hints.get_properties():
+            values: list[ir.Value] = [ir.MetaDataString(module, name)]
+            if value is not None:
+                values.append(ir.Constant(ir.IntType(width), value))
+            operands.append(module.add_metadata(values))
+
+        # the first operand is the loop ID itself, so each loop has a distinct
+        # ID: `add_metadata` would reuse the ID of another loop with the same
+        # hints, and the self reference is only added after the node exists
+        loop_id = ir.MDValue(module, operands, name=str(len(module.metadata)))
+        loop_id.operands = (loop_id, *operands)
+        return loop_id
+
+    def emit_loop_comparison(
+        self, op_code: str, lhs: ir.Value, rhs: ir.Value
+    ) -> ir.Value:
+        """Emit the comparison (an `i1` value) of a loop exit test."""
+        if is_fp_type(lhs.type):
+            return self._llvm.ir_builder.fcmp_ordered(
+                op_code, lhs, rhs, "loopcond", self.fast_math_flags
+            )
+        return self._llvm.ir_builder.icmp_signed(op_code, lhs, rhs, "loopcond")
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.ForRangeLoopStmt) -> None:
-        """Translate ASTx For Range Loop to LLVM-IR."""
-        saved_block = self._llvm.ir_builder.block
-        var_addr = self.create_entry_block_alloca("for_count_loop", "int32")
-        self._llvm.ir_builder.position_at_end(saved_block)
-
-        # Emit the start code first, without 'variable' in scope.
-        self.visit(expr.start)
-        start_val = self.result_stack.pop()
-        if not start_val:
-            raise Exception("codegen: Invalid start argument.")
-
-        # Store the value into the alloca.
-        self._llvm.ir_builder.store(start_val, var_addr)
-
-        # Make the new basic block for the loop header, inserting after
-        # current block.
-        loop_bb = self._llvm.ir_builder.function.append_basic_block("loop")
+    def visit(self, expr: astx.ForCountLoopStmt) -> VisitGenerator:
+        """
+        Translate ASTx For Count Loop to LLVM-IR.
 
-        # Insert an explicit fall through from the current block to the
-        # loop_bb.
-        self._llvm.ir_builder.branch(loop_bb)
+        The loop is lowered like a `ForRangeLoopStmt`, see `emit_loop`.
+        """
+        op_code, end, step = self.get_count_loop_bounds(expr)
+        initializer = expr.initializer
+        if initializer.value is None:
+            start: astx.AST = astx.LiteralInt32(0)
+        else:
+            start = initializer.value
+        yield from self.emit_loop(
+            initializer,
+            start,
+            end,
+            step,
+            body=expr.body,
+            op_code=op_code,
+            hints=get_loop_hints(expr),
+        )
 
-        # Start insertion in loop_bb.
-        self._llvm.ir_builder.position_at_start(loop_bb)
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: astx.ForRangeLoopStmt) -> VisitGenerator:
+        """
+        Translate ASTx For Range Loop to LLVM-IR.
 
-        # Within the loop, the variable is defined equal to the PHI node.
-        # If it shadows an existing variable, we have to restore it, so save
-        # it now.
-        old_val = self.named_values.get(expr.variable.name)
-        self.named_values[expr.variable.name] = var_addr
+        The loop runs from `start` (included) to `end` (excluded), like
+        `range(start, end, step)` in Python, see `emit_loop`.
+        """
+        step = expr.step if expr.step is not None else astx.LiteralInt32(1)
+        yield from self.emit_loop(
+            expr.variable,
+            expr.start,
+            expr.end,
+            step,
+            body=expr.body,
+            hints=get_loop_hints(expr),
+        )
 
-        # Emit the body of the loop. This, like any other expr, can change
-        # the current basic_block. Note that we ignore the value computed by
-        # the body, but don't allow an error.
-        self.visit(expr.body)
-        body_val = self.result_stack.pop()
+    def emit_block_counter(self, block: ir.Block) -> None:
+        """
+        Count the runs of the block, in an instrumented module.
 
-        if not body_val:
+        The counter is incremented at the current position of the builder,
+        that should be the start of the block.
+        """
+        if self.profile_generate is None:
             return
+        function = self._llvm.ir_builder.function
+        idx = len(self.profile_counters)
+        self.profile_counters.append(get_block_key(function.name, block.name))
+        self._llvm.ir_builder.call(
+            declare_count_function(self._llvm.module),
+            [ir.Constant(self._llvm.INT32_TYPE, idx)],
+        )
 
-        # Emit the step value.
-        if expr.step:
-            self.visit(expr.step)
-            step_val = self.result_stack.pop()
-            if not step_val:
-                return
-        else:
-            # If not specified, use 1.0.
-            step_val = ir.Constant(self._llvm.INT32_TYPE, 1)
-
-        # Compute the end condition.
-        self.visit(expr.end)
-        end_cond = self.result_stack.pop()
-        if not end_cond:
+    def set_branch_weights(
+        self,
+        branch: ir.Instruction,
+        true_block: ir.Block,
+        false_block: ir.Block,
+    ) -> None:
+        """Add the `branch_weights` of the profile to a conditional branch."""
+        if self.profile_use is None:
             return
-
-        # Reload, increment, and restore the var_addr. This handles the case
-        # where the body of the loop mutates the variable.
-        cur_var = self._llvm.ir_builder.load(var_addr, expr.variable.name)
-        next_var = self._llvm.ir_builder.add(cur_var, step_val, "nextvar")
-        self._llvm.ir_builder.store(next_var, var_addr)
-
-        # Convert condition to a bool by comparing non-equal to 0.0.
-        if isinstance(end_cond.type, (ir.FloatType, ir.DoubleType)):
-            cmp_instruction = self._llvm.ir_builder.fcmp_ordered
-            zero_val = ir.Constant(end_cond.type, 0.0)
-        else:
-            cmp_instruction = self._llvm.ir_builder.icmp_signed
-            zero_val = ir.Constant(end_cond.type, 0)
-
-        end_cond = cmp_instruction(
-            "!=",
-            end_cond,
-            zero_val,
-            "loopcond",
+        weights = self.profile_use.get_branch_weights(
+            self._llvm.ir_builder.function.name,
+            true_block.name,
+            false_block.name,
         )
+        if weights is not None:
+            branch.set_weights(weights)
 
-        # Create the "after loop" block and insert it.
-        after_bb = self._llvm.ir_builder.function.append_basic_block(
-            "afterloop"
-        )
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: astx.Module) -> VisitGenerator:
+        """Translate ASTx Module to LLVM-IR."""
+        for node in expr.nodes:
+            depth = len(self.result_stack)
+            yield node
+            # the results of the top-level nodes are not used
+            del self.result_stack[depth:]
+
+        if self.profile_generate is not None and self.profile_counters:
+            emit_profile_runtime(
+                self._llvm.module, self.profile_counters, self.profile_generate
+            )
 
-        # Insert the conditional branch into the end of loop_bb.
-        self._llvm.ir_builder.cbranch(end_cond, loop_bb, after_bb)
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: astx.LiteralInt32) -> None:
+        """Translate ASTx LiteralInt32 to LLVM-IR."""
+        result = ir.Constant(self._llvm.INT32_TYPE, expr.value)
+        self.result_stack.append(result)
 
-        # Any new code will be inserted in after_bb.
-        self._llvm.ir_builder.position_at_start(after_bb)
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: astx.LiteralInt8) -> None:
+        """Translate ASTx LiteralInt8 to LLVM-IR."""
+        result = ir.Constant(self._llvm.INT8_TYPE, expr.value)
+        self.result_stack.append(result)
 
-        # Restore the unshadowed variable.
-        if old_val:
-            self.named_values[expr.variable.name] = old_val
-        else:
-            self.named_values.pop(expr.variable.name, None)
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: astx.LiteralInt16) -> None:
+        """Translate ASTx LiteralInt16 to LLVM-IR."""
+        result = ir.Constant(self._llvm.INT16_TYPE, expr.value)
+        self.result_stack.append(result)
 
-        # for expr always returns 0.0.
-        result = ir.Constant(self._llvm.INT32_TYPE, 0)
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: astx.LiteralInt64) -> None:
+        """Translate ASTx LiteralInt64 to LLVM-IR."""
+        result = ir.Constant(self._llvm.INT64_TYPE, expr.value)
         self.result_stack.append(result)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.Module) -> None:
-        """Translate ASTx Module to LLVM-IR."""
-        for node in expr.nodes:
-            self.visit(node)
+    def visit(self, expr: astx.LiteralFloat32) -> None:
+        """Translate ASTx LiteralFloat32 to LLVM-IR."""
+        result = ir.Constant(self._llvm.FLOAT_TYPE, expr.value)
+        self.result_stack.append(result)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.LiteralInt32) -> None:
-        """Translate ASTx LiteralInt32 to LLVM-IR."""
-        result = ir.Constant(self._llvm.INT32_TYPE, expr.value)
+    def visit(self, expr: astx.LiteralFloat64) -> None:
+        """Translate ASTx LiteralFloat64 to LLVM-IR."""
+        result = ir.Constant(self._llvm.DOUBLE_TYPE, expr.value)
         self.result_stack.append(result)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.FunctionCall) -> None:
+    def visit(self, expr: astx.FunctionCall) -> VisitGenerator:
         """Translate Function FunctionCall."""
-        callee_f = self.get_function(expr.callee)
+        callee_f = self.get_function(expr.fn.name)
 
         if not callee_f:
             raise Exception("Unknown function referenced")
 
-        if len(callee_f.args) != len(expr.args):
-            raise Exception("codegen: Incorrect # arguments passed.")
-
         llvm_args = []
         for arg in expr.args:
-            self.visit(arg)
+            yield arg
             llvm_arg = self.result_stack.pop()
             if not llvm_arg:
                 raise Exception("codegen: Invalid callee argument.")
+            if is_buffer_type(llvm_arg.type):
+                # a buffer is passed as its data pointer and its length
+                llvm_args.append(
+                    self._llvm.ir_builder.extract_value(llvm_arg, 0)
+                )
+                llvm_args.append(
+                    self._llvm.ir_builder.extract_value(llvm_arg, 1)
+                )
+                continue
             llvm_args.append(llvm_arg)
 
+        if len(callee_f.args) != len(llvm_args):
+            raise Exception("codegen: Incorrect # arguments passed.")
+
+        # the arguments are converted to the parameter types, like the
+        # operands of a `BinaryOp`
+        for idx, param in enumerate(callee_f.args):
+            if not isinstance(param.type, ir.PointerType):
+                llvm_args[idx] = self.convert(llvm_args[idx], param.type)
+
         result = self._llvm.ir_builder.call(callee_f, llvm_args, "calltmp")
         self.result_stack.append(result)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.Function) -> None:
+    def visit(self, expr: astx.Function) -> VisitGenerator:
         """Translate ASTx Function to LLVM-IR."""
         proto = expr.prototype
         self.function_protos[proto.name] = proto
@@ -639,42 +1292,77 @@ class LLVMLiteIRVisitor(BuilderVisitor):
         # Create a new basic block to start insertion into.
         basic_block = fn.append_basic_block("entry")
         self._llvm.ir_builder = ir.IRBuilder(basic_block)
+        self.emit_block_counter(basic_block)
+        if self.profile_use is not None:
+            set_function_profile(fn, self.profile_use)
+        # the arguments and the variables are local to the function
+        self.symbols.push_scope()
+
+        llvm_args = iter(fn.args)
+        for arg in proto.args.nodes:
+            llvm_arg = next(llvm_args)
+            if isinstance(arg.type_, BufferType):
+                # the buffers are read-only values, bound to the struct of
+                # the data pointer and the length
+                self.symbols.define(
+                    arg.name, self.emit_buffer(llvm_arg, next(llvm_args))
+                )
+                continue
 
-        for llvm_arg in fn.args:
             # Create an alloca for this variable.
             alloca = self._llvm.ir_builder.alloca(
-                self._llvm.INT32_TYPE, name=llvm_arg.name
+                llvm_arg.type, name=llvm_arg.name
             )
 
             # Store the initial value into the alloca.
             self._llvm.ir_builder.store(llvm_arg, alloca)
 
             # Add arguments to variable symbol table.
-            self.named_values[llvm_arg.name] = alloca
+            self.symbols.define(llvm_arg.name, alloca)
 
-        self.visit(expr.body)
+        yield expr.body
+        self.symbols.pop_scope()
+        self.result_stack.pop()
         self.result_stack.append(fn)
 
     @dispatch  # type: ignore[no-redef]
     def visit(self, expr: astx.FunctionPrototype) -> None:
-        """Translate ASTx Function Prototype to LLVM-IR."""
-        args_type = [self._llvm.INT32_TYPE] * len(expr.args.nodes)
-        # note: it should be dynamic
-        return_type = self._llvm.get_data_type("int32")
+        """
+        Translate ASTx Function Prototype to LLVM-IR.
+
+        A `BufferType` argument is lowered to the pointer to the data and
+        the length (`i64`).
+        """
+        args_type = []
+        arg_names = []
+        for arg in expr.args.nodes:
+            llvm_type = self.get_llvm_type(arg.type_)
+            if is_buffer_type(llvm_type):
+                args_type.extend(llvm_type.elements)
+                arg_names.extend([f"{arg.name}.data", f"{arg.name}.len"])
+            else:
+                args_type.append(llvm_type)
+                arg_names.append(arg.name)
+
+        if isinstance(expr.return_type, BufferType):
+            raise Exception("[EE]: buffers can't be returned.")
+        return_type = self.get_llvm_type(expr.return_type)
         fn_type = ir.FunctionType(return_type, args_type, False)
 
         fn = ir.Function(self._llvm.module, fn_type, expr.name)
 
         # Set names for all arguments.
-        for idx, arg in enumerate(fn.args):
-            arg.name = expr.args[idx].name
+        for arg, name in zip(fn.args, arg_names):
+            arg.name = name
+            if isinstance(arg.type, ir.PointerType):
+                arg.add_attribute("nocapture")
 
         self.result_stack.append(fn)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.FunctionReturn) -> None:
+    def visit(self, expr: astx.FunctionReturn) -> VisitGenerator:
         """Translate ASTx FunctionReturn to LLVM-IR."""
-        self.visit(expr.value)
+        yield expr.value
 
         try:
             retval = self.result_stack.pop()
@@ -682,105 +1370,1141 @@ class LLVMLiteIRVisitor(BuilderVisitor):
             retval = None
 
         if retval:
-            self._llvm.ir_builder.ret(retval)
+            return_type = self._llvm.ir_builder.function.function_type
+            self._llvm.ir_builder.ret(
+                self.convert(retval, return_type.return_type)
+            )
             return
         self._llvm.ir_builder.ret_void()
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.InlineVariableDeclaration) -> None:
+    def visit(self, expr: astx.InlineVariableDeclaration) -> VisitGenerator:
         """Translate an ASTx InlineVariableDeclaration expression."""
-        if self.named_values.get(expr.name):
+        if expr.name in self.symbols:
             raise Exception(f"Variable already declared: {expr.name}")
 
         # Emit the initializer
         if expr.value is not None:
-            self.visit(expr.value)
+            yield expr.value
             init_val = self.result_stack.pop()
             if init_val is None:
                 raise Exception("Initializer code generation failed.")
         else:
-            init_val = ir.Constant(self._llvm.get_data_type("int32"), 0)
+            init_val = ir.Constant(self.get_llvm_type(expr.type_), None)
 
-        alloca = self.create_entry_block_alloca(expr.name, "int32")
+        llvm_type = self.get_llvm_type(expr.type_)
+        alloca = self.create_entry_block_alloca(expr.name, llvm_type)
+        init_val = self.convert(init_val, alloca.type.pointee)
         self._llvm.ir_builder.store(init_val, alloca)
-        self.named_values[expr.name] = alloca
+        self.symbols.define(expr.name, alloca)
 
         self.result_stack.append(init_val)
 
     @dispatch  # type: ignore[no-redef]
     def visit(self, expr: astx.Variable) -> None:
         """Translate ASTx Variable to LLVM-IR."""
-        expr_var = self.named_values.get(expr.name)
+        expr_var = self.symbols.get(expr.name)
 
         if not expr_var:
             raise Exception(f"Unknown variable name: {expr.name}")
 
-        result = self._llvm.ir_builder.load(expr_var, expr.name)
+        if isinstance(expr_var, ir.AllocaInstr):
+            result = self._llvm.ir_builder.load(expr_var, expr.name)
+        else:
+            # the loop variables are bound to SSA values, not to allocas
+            result = expr_var
         self.result_stack.append(result)
 
     @dispatch  # type: ignore[no-redef]
-    def visit(self, expr: astx.VariableDeclaration) -> None:
+    def visit(self, expr: astx.VariableDeclaration) -> VisitGenerator:
         """Translate ASTx Variable to LLVM-IR."""
-        if self.named_values.get(expr.name):
+        if expr.name in self.symbols:
             raise Exception(f"Variable already declared: {expr.name}")
 
         # Emit the initializer
         if expr.value is not None:
-            self.visit(expr.value)
+            yield expr.value
             init_val = self.result_stack.pop()
             if init_val is None:
                 raise Exception("Initializer code generation failed.")
         else:
             # If not specified, use 0 as the initializer.
-            # note: it should create something according to the defined type
-            init_val = ir.Constant(self._llvm.get_data_type("int32"), 0)
+            init_val = ir.Constant(self.get_llvm_type(expr.type_), None)
 
         # Create an alloca in the entry block.
-        # note: it should create the type according to the defined type
-        alloca = self.create_entry_block_alloca(expr.name, "int32")
+        llvm_type = self.get_llvm_type(expr.type_)
+        alloca = self.create_entry_block_alloca(expr.name, llvm_type)
 
-        # Store the initial value.
+        # Store the initial value, converted to the declared type.
+        init_val = self.convert(init_val, alloca.type.pointee)
         self._llvm.ir_builder.store(init_val, alloca)
 
         # Remember this binding.
-        self.named_values[expr.name] = alloca
+        self.symbols.define(expr.name, alloca)
+
+    def emit_buffer(self, data: ir.Value, length: ir.Value) -> ir.Value:
+        """Create a buffer value (`{T*, i64}`) from its data and length."""
+        ir_builder = self._llvm.ir_builder
+        buffer_type = ir.LiteralStructType([data.type, length.type])
+        buffer = ir.Constant(buffer_type, ir.Undefined)
+        buffer = ir_builder.insert_value(buffer, data, 0)
+        return ir_builder.insert_value(buffer, length, 1, "buffer")
+
+    def get_buffer_value(self, expr: astx.AST) -> ir.Value:
+        """Pop the buffer value of the given node from the result stack."""
+        buffer = safe_pop(self.result_stack)
+        if buffer is None or not is_buffer_type(buffer.type):
+            raise Exception(
+                f"[EE]: buffer expected, got {type(expr).__name__}."
+            )
+        return buffer
+
+    def emit_element_pointer(
+        self, buffer: ir.Value, index: ir.Value
+    ) -> ir.Value:
+        """Emit the pointer to the element of a buffer at the index."""
+        ir_builder = self._llvm.ir_builder
+        data = ir_builder.extract_value(buffer, 0, "data")
+        index = self.convert(index, self._llvm.INT64_TYPE)
+        return ir_builder.gep(data, [index], inbounds=True, name="eltptr")
+
+    def get_element_alignment(self, llvm_type: ir.Type) -> int:
+        """Get the alignment (in bytes) of the elements of a buffer."""
+        element_type = get_element_type(llvm_type)
+        if is_fp_type(element_type):
+            return FP_WIDTHS[type(element_type)] // 8
+        width: int = element_type.width
+        return max(width // 8, 1)
+
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: BufferLength) -> VisitGenerator:
+        """Translate the length of a buffer to LLVM-IR."""
+        yield expr.buffer
+        buffer = self.get_buffer_value(expr.buffer)
+        result = self._llvm.ir_builder.extract_value(buffer, 1, "len")
+        self.result_stack.append(result)
+
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: BufferLoad) -> VisitGenerator:
+        """Translate the load of a buffer element to LLVM-IR."""
+        yield expr.buffer
+        buffer = self.get_buffer_value(expr.buffer)
+        yield expr.index
+        pointer = self.emit_element_pointer(buffer, self.result_stack.pop())
+        result = self._llvm.ir_builder.load(pointer, "elt")
+        self.result_stack.append(result)
+
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: BufferStore) -> VisitGenerator:
+        """Translate the store of a buffer element to LLVM-IR."""
+        yield expr.buffer
+        buffer = self.get_buffer_value(expr.buffer)
+        yield expr.index
+        pointer = self.emit_element_pointer(buffer, self.result_stack.pop())
+        yield expr.value
+        value = self.convert(self.result_stack.pop(), pointer.type.pointee)
+        self._llvm.ir_builder.store(value, pointer)
+        self.result_stack.append(value)
+
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: VectorLoad) -> VisitGenerator:
+        """
+        Translate the load of a vector from a buffer to LLVM-IR.
+
+        The load is aligned to the element size, not to the vector size,
+        so any index can be used.
+        """
+        yield expr.buffer
+        buffer = self.get_buffer_value(expr.buffer)
+        yield expr.index
+        pointer = self.emit_element_pointer(buffer, self.result_stack.pop())
+        vector_type = ir.VectorType(pointer.type.pointee, expr.width)
+        vector_pointer = self._llvm.ir_builder.bitcast(
+            pointer, vector_type.as_pointer(), "vecptr"
+        )
+        result = self._llvm.ir_builder.load(
+            vector_pointer,
+            "vec",
+            align=self.get_element_alignment(vector_type),
+        )
+        self.result_stack.append(result)
+
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: VectorStore) -> VisitGenerator:
+        """Translate the store of a vector in a buffer to LLVM-IR."""
+        yield expr.buffer
+        buffer = self.get_buffer_value(expr.buffer)
+        yield expr.index
+        pointer = self.emit_element_pointer(buffer, self.result_stack.pop())
+        yield expr.value
+        value = self.result_stack.pop()
+        if not isinstance(value.type, ir.VectorType):
+            raise Exception("[EE]: VectorStore value must be a vector.")
+        vector_type = ir.VectorType(pointer.type.pointee, value.type.count)
+        value = self.convert(value, vector_type)
+        vector_pointer = self._llvm.ir_builder.bitcast(
+            pointer, vector_type.as_pointer(), "vecptr"
+        )
+        self._llvm.ir_builder.store(
+            value,
+            vector_pointer,
+            align=self.get_element_alignment(vector_type),
+        )
+        self.result_stack.append(value)
+
+    @dispatch  # type: ignore[no-redef]
+    def visit(self, expr: VectorReduce) -> VisitGenerator:
+        """
+        Translate the reduction of the lanes of a vector to LLVM-IR.
+
+        The lanes are combined in order, with the same instructions (and
+        fast-math flags) of a `BinaryOp`.
+        """
+        yield expr.value
+        value = self.result_stack.pop()
+        if not isinstance(value.type, ir.VectorType):
+            raise Exception("[EE]: VectorReduce value must be a vector.")
+
+        ir_builder = self._llvm.ir_builder
+        if is_fp_type(value.type.element):
+            emit_binary_op = self.emit_fp_binary_op
+        else:
+            emit_binary_op = self.emit_int_binary_op
+
+        result = ir_builder.extract_element(
+            value, ir.Constant(self._llvm.INT32_TYPE, 0), "lane"
+        )
+        for idx in range(1, value.type.count):
+            lane = ir_builder.extract_element(
+                value, ir.Constant(self._llvm.INT32_TYPE, idx), "lane"
+            )
+            result = emit_binary_op(expr.op_code, result, lane)
+        self.result_stack.append(result)
+
+
+@public
+class BuildResult:
+    """Result of a module built by `LLVMLiteIR.build_many`."""
+
+    output_file: str
+    error: Optional[str]
+    elapsed: float
+
+    def __init__(
+        self, output_file: str, error: Optional[str] = None, elapsed: float = 0
+    ) -> None:
+        """
+        Initialize BuildResult object.
+
+        Parameters
+        ----------
+            output_file (str): The executable file of the module.
+            error (str, optional): The error raised by the build, if any.
+            elapsed (float): The build time in seconds.
+        """
+        self.output_file = output_file
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the module was built."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        """Return the representation of the result."""
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"BuildResult({self.output_file!r}, {status})"
+
+
+def _build_module(
+    expr: astx.AST, output_file: str, options: dict[str, Any]
+) -> BuildResult:
+    """Build one module with a new builder, for `build_many` workers."""
+    start = time.perf_counter()
+    try:
+        LLVMLiteIR(**options).build(expr, output_file)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return BuildResult(output_file, error, time.perf_counter() - start)
+    return BuildResult(output_file, None, time.perf_counter() - start)
+
+
+def _emit_partition(
+    module: astx.Module,
+    prototypes: dict[str, astx.FunctionPrototype],
+    options: dict[str, Any],
+) -> tuple[bytes, Optional[bytes], Optional[OptimizationReport]]:
+    """
+    Compile a module partition to an object, for `build` workers.
+
+    It returns the object, the optimized LLVM bitcode (only when the
+    `bitcode` option is set) and the optimization report.
+    """
+    # the partitions are folded before the module is split
+    builder = LLVMLiteIR(
+        opt_level=options["opt_level"],
+        size_level=options["size_level"],
+        fold_constants=False,
+        report_passes=options.get("report_passes", False),
+    )
+    translator = LLVMLiteIRVisitor(
+        define_builtins=options["define_builtins"],
+        fast_math=options.get("fast_math", False),
+        lazy_builtins=options.get("lazy_builtins", False),
+        profile_generate=options.get("profile_generate"),
+        profile_use=options.get("profile_use"),
+    )
+    # the builtins called from the other partitions are defined here
+    for name in options.get("builtins", ()):
+        translator.add_builtin(name)
+    # the functions of the other partitions are declared when they are used
+    translator.function_protos.update(prototypes)
+    builder.translator = translator
+
+    result_mod = builder.compile(module)
+    return (
+        translator.target_machine.emit_object(result_mod),
+        result_mod.as_bitcode() if options.get("bitcode") else None,
+        builder.optimization_report,
+    )
+
+
+MethodType = TypeVar("MethodType", bound=Callable[..., Any])
+
+
+def _synchronized(method: MethodType) -> MethodType:
+    """Run the method of a builder holding its lock."""
+
+    @functools.wraps(method)
+    def wrapper(self: LLVMLiteIR, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            self._call_depth += 1
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._call_depth -= 1
+                # the ASTx can be changed in place between two calls
+                if not self._call_depth:
+                    self._call_fingerprint = None
+
+    return cast(MethodType, wrapper)
 
 
 @public
 class LLVMLiteIR(Builder):
     """LLVM-IR transpiler and compiler."""
 
-    def __init__(self) -> None:
-        """Initialize LLVMIR."""
+    opt_level: int
+    size_level: int
+    optimization_report: Optional[OptimizationReport]
+    cache: Optional[BuildCache]
+    partitions: int
+    fast_math: Union[bool, Sequence[str]]
+    fold_constants: bool
+    folded_nodes: int
+    roots: Optional[tuple[str, ...]]
+    pruned_functions: int
+    profile_generate: Optional[ProfilePath]
+    profile_use: Optional[BlockProfile]
+    report_passes: bool
+
+    _translated_key: Optional[str]
+    _module_ref: Optional[llvm.ModuleRef]
+    _lock: threading.RLock
+    _call_depth: int
+    _call_fingerprint: Optional[tuple[astx.AST, str]]
+    link_result: Optional[ProcessResult]
+
+    def __init__(  # noqa: PLR0913
+        self,
+        opt_level: int = 0,
+        size_level: int = 0,
+        cache: Optional[BuildCache] = None,
+        partitions: int = 1,
+        fast_math: Union[bool, Sequence[str]] = False,
+        *,
+        fold_constants: bool = True,
+        roots: Optional[Sequence[str]] = None,
+        profile_generate: Optional[ProfilePath] = None,
+        profile_use: Optional[Union[ProfilePath, BlockProfile]] = None,
+        report_passes: bool = False,
+    ) -> None:
+        """
+        Initialize LLVMIR.
+
+        Parameters
+        ----------
+            opt_level (int): The default speed optimization level (0-3).
+            size_level (int): The default size optimization level (0-2).
+            cache (BuildCache, optional): The cache used by `build` to
+                reuse the executables built for the same ASTx and options.
+            partitions (int): The maximum number of partitions of a module
+                compiled in parallel by `build`, see `emit_objects`.
+            fast_math (bool | Sequence[str]): Allow the floating-point
+                optimizations that don't keep the IEEE semantics, e.g.
+                reassociating the additions of a reduction so it can be
+                vectorized: True for all of them, or the fast-math flags
+                to be used, e.g. `("reassoc", "contract")`. Off by default.
+            fold_constants (bool): Fold the constant operations of the ASTx
+                before the translation, see `fold`.
+            roots (Sequence[str], optional): The functions that must be
+                emitted, e.g. `("main",)`. When given, the functions of a
+                module that can't be reached from them are removed before
+                the translation (see `prune`) and the builtins are only
+                added to the modules that use them. By default, all the
+                functions and builtins are emitted.
+            profile_generate (ProfilePath, optional): Build instrumented
+                programs, that count the runs of the function entries and
+                of the blocks of the `if` statements and of the loops, and
+                append the counts to this profile file when they exit.
+                Only ASTx modules can be instrumented, and they can't be
+                compiled by `jit`.
+            profile_use (ProfilePath | BlockProfile, optional): The profile
+                (or profile file) written by the instrumented programs of
+                the same ASTx. It sets the `branch_weights` of the `if`
+                statements and of the loops and the `inlinehint` and
+                `cold` attributes of the functions, so LLVM lays out the
+                blocks and optimizes the functions for the profiled runs.
+            report_passes (bool): Collect the name of the passes that ran in
+                `optimization_report.passes`. It uses the pass timers of
+                LLVM, that are global, so the optimizations of the reports
+                run one at a time.
+        """
         super().__init__()
-        self.translator: LLVMLiteIRVisitor = LLVMLiteIRVisitor()
+        check_optimization_levels(opt_level, size_level)
+        if partitions < 1:
+            raise Exception("[EE]: partitions must be positive.")
+        if profile_generate is not None and profile_use is not None:
+            raise Exception(
+                "[EE]: profile_generate and profile_use can't be used "
+                "together."
+            )
+        # the builder can be shared by threads, one build at a time
+        self._lock = threading.RLock()
+        self._call_depth = 0
+        self._call_fingerprint = None
+        self.roots = None if roots is None else tuple(roots)
+        self.profile_generate = profile_generate
+        self.profile_use = (
+            BlockProfile.load(profile_use)
+            if isinstance(profile_use, (str, os.PathLike))
+            else profile_use
+        )
+        self.translator: LLVMLiteIRVisitor = LLVMLiteIRVisitor(
+            fast_math=fast_math,
+            lazy_builtins=self.roots is not None,
+            profile_generate=self.profile_generate,
+            profile_use=self.profile_use,
+        )
+        self.fast_math = fast_math
+        self.opt_level = opt_level
+        self.size_level = size_level
+        self.optimization_report = None
+        self.report_passes = report_passes
+        self.cache = cache
+        self.link_result = None
+        self.partitions = partitions
+        self.fold_constants = fold_constants
+        self.folded_nodes = 0
+        self.pruned_functions = 0
+        self._translated_key = None
+        self._module_ref = None
+
+    @_synchronized
+    def reset(self) -> None:
+        """Reset the builder state, so it can be reused for a new ASTx."""
+        super().reset()
+        self.optimization_report = None
+        self.folded_nodes = 0
+        self.pruned_functions = 0
+        self._translated_key = None
+        self._module_ref = None
+
+    @_synchronized
+    def prune(self, expr: astx.AST) -> astx.AST:
+        """
+        Remove the functions that can't be reached from the `roots`.
+
+        See `prune_module`. The number of functions removed is stored in
+        `self.pruned_functions`.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be pruned.
+
+        Returns
+        -------
+            astx.AST: The ASTx to be translated, `expr` itself when `roots`
+                is not set or the ASTx is not a module.
+        """
+        if self.roots is None or not isinstance(expr, astx.Module):
+            return expr
+        with self.stats.phase("prune"):
+            pruned_expr, self.pruned_functions = prune_module(expr, self.roots)
+        return pruned_expr
+
+    @_synchronized
+    def fold(self, expr: astx.AST) -> astx.AST:
+        """
+        Fold the constant operations of the ASTx before its translation.
+
+        See `fold_constants`. The number of nodes removed is stored in
+        `self.folded_nodes`.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be simplified.
+
+        Returns
+        -------
+            astx.AST: The ASTx to be translated, `expr` itself when
+                `fold_constants` is not set.
+        """
+        if not self.fold_constants:
+            return expr
+        with self.stats.phase("fold"):
+            folded_expr, self.folded_nodes = fold_constants(expr)
+        return folded_expr
+
+    def _fingerprint(self, expr: astx.AST) -> str:
+        """Compute the fingerprint of the ASTx once per call of the builder."""
+        if self._call_fingerprint is not None:
+            call_expr, key = self._call_fingerprint
+            if call_expr is expr:
+                return key
+        with self.stats.phase("fingerprint"):
+            key = ast_fingerprint(expr)
+        if self._call_depth:
+            self._call_fingerprint = (expr, key)
+        return key
+
+    def _visit(self, expr: astx.AST) -> None:
+        # the translation is memoized by the structure of the ASTx, so a
+        # different tree, or the same tree changed in place, is translated
+        # again to a new module
+        key = self._fingerprint(expr)
+        if key == self._translated_key:
+            return
+        # the profile runtime is added at the end of the module
+        if self.profile_generate is not None and not isinstance(
+            expr, astx.Module
+        ):
+            raise Exception("[EE]: only ASTx modules can be instrumented.")
+        if self._translated_key is not None:
+            self.translator.reset()
+        # an empty key doesn't match any ASTx, so the translator is reset
+        # again if this translation fails
+        self._translated_key = ""
+        self._module_ref = None
+        self.stats.visit(self.translator, self.fold(self.prune(expr)))
+        self._translated_key = key
+
+    def get_cache_key(
+        self,
+        expr: astx.AST,
+        opt_level: int,
+        size_level: int,
+        shared: bool = False,
+    ) -> str:
+        """Compute the build cache key for the ASTx and build options."""
+        return cache_key(
+            self._fingerprint(expr),
+            self.translator.target_machine.triple,
+            llvm.get_host_cpu_name(),
+            opt_level,
+            size_level,
+            shared,
+            self.translator.fast_math_flags,
+            self.roots,
+            None
+            if self.profile_generate is None
+            else os.fspath(self.profile_generate),
+            None
+            if self.profile_use is None
+            else self.profile_use.fingerprint(),
+            irx.__version__,
+            llvmlite.__version__,
+        )
+
+    @_synchronized
+    def parse(self, expr: astx.AST) -> llvm.ModuleRef:
+        """
+        Transpile the ASTx to a parsed (not optimized) LLVM module.
+
+        The module is memoized for the last ASTx and must not be changed,
+        use `compile` to get a module that can be modified.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be parsed.
+
+        Returns
+        -------
+            llvm.ModuleRef: The parsed module.
+        """
+        self._visit(expr)
+        if self._module_ref is not None:
+            return self._module_ref
+
+        # llvmlite modules can only be handed to LLVM as LLVM-IR text, that
+        # isn't kept: the parsed module is memoized instead
+        with self.stats.phase("stringify"):
+            ir_text = str(self.translator._llvm.module)
+
+        with self.stats.phase("parse_assembly"):
+            module_ref = llvm.parse_assembly(ir_text)
+            module_ref.verify()
+
+        self._module_ref = module_ref
+        return module_ref
+
+    @_synchronized
+    def compile(
+        self,
+        expr: astx.AST,
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+    ) -> llvm.ModuleRef:
+        """
+        Transpile the ASTx to a parsed and optimized LLVM module.
 
-    def build(self, expr: astx.AST, output_file: str) -> None:
-        """Transpile the ASTx to LLVM-IR and build it to an executable file."""
-        result = self.translate(expr)
+        The report of the optimization pipeline is stored in
+        `self.optimization_report`.
 
-        result_mod = llvm.parse_assembly(result)
-        result_object = self.translator.target_machine.emit_object(result_mod)
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be compiled.
+            opt_level (int, optional): Override the builder `opt_level`.
+            size_level (int, optional): Override the builder `size_level`.
 
-        with tempfile.NamedTemporaryFile(suffix="", delete=False) as temp_file:
-            self.tmp_path = temp_file.name
+        Returns
+        -------
+            llvm.ModuleRef: The compiled module, owned by the caller.
+        """
+        opt_level = self.opt_level if opt_level is None else opt_level
+        size_level = self.size_level if size_level is None else size_level
+        check_optimization_levels(opt_level, size_level)
+
+        result_mod = self.parse(expr).clone()
+
+        with self.stats.phase("optimize"):
+            self.optimization_report = optimize_module(
+                result_mod,
+                self.translator.target_machine,
+                opt_level=opt_level,
+                size_level=size_level,
+                report=self.report_passes,
+            )
+        return result_mod
+
+    @_synchronized
+    def translate(
+        self,
+        expr: astx.AST,
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+    ) -> str:
+        """
+        Transpile ASTx to LLVM-IR.
+
+        When an optimization level is given (or set in the builder), the
+        returned LLVM-IR is the result of the optimization pipeline.
+        """
+        opt_level = self.opt_level if opt_level is None else opt_level
+        size_level = self.size_level if size_level is None else size_level
+
+        if opt_level or size_level:
+            return str(self.compile(expr, opt_level, size_level))
+
+        self._visit(expr)
+
+        with self.stats.phase("stringify"):
+            return str(self.translator._llvm.module)
+
+    @_synchronized
+    def build(
+        self,
+        expr: astx.AST,
+        output_file: str,
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+        *,
+        shared: bool = False,
+    ) -> BuildStats:
+        """
+        Transpile the ASTx to LLVM-IR and build it to an executable file.
+
+        The phases of the build are recorded in `self.stats`, that is
+        cleared at the start of each build.
 
-        file_path_o = f"{self.tmp_path}.o"
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be built.
+            output_file (str): The executable (or shared library) file.
+            opt_level (int, optional): Override the builder `opt_level`.
+            size_level (int, optional): Override the builder `size_level`.
+            shared (bool): Build a shared library (e.g. `libkernels.so`)
+                instead of an executable, see `load_shared_library`.
 
-        with open(file_path_o, "wb") as f:
-            f.write(result_object)
+        Returns
+        -------
+            BuildStats: The wall time of the build phases (`self.stats`).
+        """
+        opt_level = self.opt_level if opt_level is None else opt_level
+        size_level = self.size_level if size_level is None else size_level
 
         self.output_file = output_file
+        self.stats.clear()
 
-        run_command(
-            [
-                "clang",
-                file_path_o,
-                "-o",
-                self.output_file,
-            ]
+        key, objects = self._emit_uncached(
+            expr, output_file, opt_level, size_level, shared
+        )
+        if objects is None:
+            return self.stats
+
+        link_objects(objects, output_file, shared, self.stats)
+        self._put_cached(key, output_file, objects)
+        return self.stats
+
+    @_synchronized
+    def _emit_uncached(
+        self,
+        expr: astx.AST,
+        output_file: str,
+        opt_level: int,
+        size_level: int,
+        shared: bool,
+    ) -> tuple[str, Optional[list[bytes]]]:
+        """Return the cache key, and the objects if they aren't cached."""
+        # in one call, so the ASTx is hashed once for the key and the memo
+        key, cached = self._get_cached(
+            expr, output_file, opt_level, size_level, shared
+        )
+        if cached:
+            return key, None
+        return key, self.emit_objects(expr, opt_level, size_level)
+
+    def _get_cached(
+        self,
+        expr: astx.AST,
+        output_file: str,
+        opt_level: int,
+        size_level: int,
+        shared: bool,
+    ) -> tuple[str, bool]:
+        """Copy the cached output file, if any, and return the cache key."""
+        if self.cache is None:
+            return "", False
+        # hashed before the `cache` phase, that doesn't include it
+        self._fingerprint(expr)
+        with self.stats.phase("cache"):
+            key = self.get_cache_key(expr, opt_level, size_level, shared)
+            return key, self.cache.get(key, output_file)
+
+    def _put_cached(
+        self, key: str, output_file: str, objects: list[bytes]
+    ) -> None:
+        # the output file is passed explicitly: `self.output_file` can be
+        # changed by a concurrent `build_async`
+        if self.cache is not None:
+            object_data = objects[0] if len(objects) == 1 else None
+            self.cache.put(key, output_file, object_data)
+
+    async def build_async(  # noqa: PLR0913
+        self,
+        expr: astx.AST,
+        output_file: str,
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+        *,
+        shared: bool = False,
+        timeout: Optional[float] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> BuildStats:
+        """
+        Build the ASTx like `build`, without blocking the event loop.
+
+        The result of the linker is stored in `self.link_result`, None when
+        the output file comes from the cache.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be built.
+            output_file (str): The executable (or shared library) file.
+            opt_level (int, optional): Override the builder `opt_level`.
+            size_level (int, optional): Override the builder `size_level`.
+            shared (bool): Build a shared library instead of an executable.
+            timeout (float, optional): The maximum time of the linker in
+                seconds.
+            semaphore (asyncio.Semaphore, optional): Bound the linker
+                processes, by default the semaphore of the event loop (see
+                `get_link_semaphore`).
+
+        Returns
+        -------
+            BuildStats: The wall time of the build phases (`self.stats`).
+        """
+        opt_level = self.opt_level if opt_level is None else opt_level
+        size_level = self.size_level if size_level is None else size_level
+
+        self.output_file = output_file
+        self.stats.clear()
+        self.link_result = None
+
+        loop = asyncio.get_running_loop()
+        key, objects = await loop.run_in_executor(
+            None,
+            self._emit_uncached,
+            expr,
+            output_file,
+            opt_level,
+            size_level,
+            shared,
+        )
+        if objects is None:
+            return self.stats
+
+        async with semaphore or get_link_semaphore():
+            with ExitStack() as stack:
+                with self.stats.phase("write_objects"):
+                    object_files, _, fds = stack.enter_context(
+                        linker_files(objects)
+                    )
+                with self.stats.phase("link"):
+                    self.link_result = await run_process(
+                        get_link_command(object_files, output_file, shared),
+                        timeout=timeout,
+                        pass_fds=fds,
+                    )
+        self.link_result.check()
+
+        await loop.run_in_executor(
+            None, self._put_cached, key, output_file, objects
+        )
+        return self.stats
+
+    @_synchronized
+    def load_shared_library(
+        self, expr: astx.AST, path: Optional[str] = None
+    ) -> SharedLibrary:
+        """
+        Load a shared library built from the given ASTx.
+
+        The ctypes signature of each function is created from its
+        prototype in the ASTx.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx module the library was built from.
+            path (str, optional): The shared library file, by default the
+                last file built by this builder.
+
+        Returns
+        -------
+            SharedLibrary: The loaded library.
+        """
+        # the prototypes are translated to a new module, only to get the
+        # LLVM types of the functions
+        expr = self.prune(expr)
+        nodes = expr.nodes if isinstance(expr, astx.Module) else [expr]
+        translator = LLVMLiteIRVisitor(
+            lazy_builtins=self.translator.lazy_builtins
+        )
+        if translator.lazy_builtins:
+            defined = {
+                node.prototype.name
+                for node in nodes
+                if isinstance(node, astx.Function)
+            }
+            for name in get_callees(expr) & set(BUILTIN_FUNCTIONS) - defined:
+                translator.add_builtin(name)
+        function_types = {
+            fn.name: get_ctypes_function_type(fn)
+            for fn in translator._llvm.module.functions
+            if not fn.is_declaration
+        }
+
+        for node in nodes:
+            if isinstance(node, astx.Function):
+                translator.visit(node.prototype)
+                fn = translator.result_stack.pop()
+                function_types[fn.name] = get_ctypes_function_type(fn)
+
+        return SharedLibrary(
+            path or self.output_file, function_types, get_written_buffers(expr)
+        )
+
+    def _compile_for_emit(
+        self, expr: astx.AST, opt_level: int, size_level: int
+    ) -> llvm.ModuleRef:
+        if opt_level or size_level:
+            return self.compile(expr, opt_level, size_level)
+        # emitting the module doesn't change it, so there is no need for a
+        # copy of the parsed module
+        self.optimization_report = OptimizationReport()
+        return self.parse(expr)
+
+    @_synchronized
+    def emit(
+        self,
+        expr: astx.AST,
+        output: Optional[OutputTarget] = None,
+        output_format: str = "object",
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+    ) -> bytes:
+        """
+        Compile the ASTx to bitcode, assembly, an object or a shared object.
+
+        The output is generated in memory and written once to the given
+        output, see `write_output`.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be compiled.
+            output (OutputTarget, optional): A path, a binary file object or
+                a `bytearray`. By default, the output is only returned.
+            output_format (str): One of `EMIT_FORMATS`: `bitcode` (LLVM
+                bitcode), `assembly` (native assembly text), `object`
+                (relocatable object) or `shared` (shared object).
+            opt_level (int, optional): Override the builder `opt_level`.
+            size_level (int, optional): Override the builder `size_level`.
+
+        Returns
+        -------
+            bytes: The output.
+        """
+        if output_format not in EMIT_FORMATS:
+            raise Exception(f"[EE]: output format not valid: {output_format}")
+        opt_level = self.opt_level if opt_level is None else opt_level
+        size_level = self.size_level if size_level is None else size_level
+        check_optimization_levels(opt_level, size_level)
+
+        if output_format == "shared":
+            objects = self.emit_objects(expr, opt_level, size_level)
+            data = link_objects(objects, None, shared=True, stats=self.stats)
+        else:
+            result_mod = self._compile_for_emit(expr, opt_level, size_level)
+            target_machine = self.translator.target_machine
+            with self.stats.phase(f"emit_{output_format}"):
+                if output_format == "bitcode":
+                    data = result_mod.as_bitcode()
+                elif output_format == "assembly":
+                    data = target_machine.emit_assembly(result_mod).encode()
+                else:
+                    data = target_machine.emit_object(result_mod)
+
+        with self.stats.phase("write_output"):
+            return write_output(cast(bytes, data), output)
+
+    @_synchronized
+    def emit_objects(
+        self,
+        expr: astx.AST,
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+    ) -> list[bytes]:
+        """
+        Compile the ASTx to object code, in parallel for big modules.
+
+        The functions of a module are split in `partitions`, that are
+        compiled by worker processes (see `partition_module`).
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be compiled.
+            opt_level (int, optional): Override the builder `opt_level`.
+            size_level (int, optional): Override the builder `size_level`.
+
+        Returns
+        -------
+            list[bytes]: The object files to be linked together.
+        """
+        opt_level = self.opt_level if opt_level is None else opt_level
+        size_level = self.size_level if size_level is None else size_level
+        check_optimization_levels(opt_level, size_level)
+
+        partitions: list[astx.Module] = []
+        if self.partitions > 1 and isinstance(expr, astx.Module):
+            module = cast(astx.Module, self.fold(self.prune(expr)))
+            partitions = partition_module(module, self.partitions)
+
+        if len(partitions) < 2:  # noqa: PLR2004
+            result_mod = self._compile_for_emit(expr, opt_level, size_level)
+            with self.stats.phase("emit_object"):
+                target_machine = self.translator.target_machine
+                return [target_machine.emit_object(result_mod)]
+
+        prototypes = {
+            node.prototype.name: node.prototype
+            for partition in partitions
+            for node in partition.nodes
+            if isinstance(node, astx.Function)
+        }
+        options: list[dict[str, Any]] = [
+            {
+                "opt_level": opt_level,
+                "size_level": size_level,
+                "define_builtins": idx == 0,
+                "fast_math": self.fast_math,
+                "lazy_builtins": self.translator.lazy_builtins,
+                "profile_generate": self.profile_generate,
+                "profile_use": self.profile_use,
+                "report_passes": self.report_passes,
+            }
+            for idx in range(len(partitions))
+        ]
+        if self.translator.lazy_builtins:
+            # the first partition defines the builtins used by all of them
+            options[0]["builtins"] = sorted(
+                set(BUILTIN_FUNCTIONS) & get_callees(module) - set(prototypes)
+            )
+
+        workers = min(len(partitions), os.cpu_count() or 1)
+        with self.stats.phase("emit_partitions"):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(
+                    pool.map(
+                        _emit_partition,
+                        partitions,
+                        repeat(prototypes),
+                        options,
+                    )
+                )
+
+        reports = [report for *_, report in results if report is not None]
+        self.optimization_report = OptimizationReport(
+            opt_level,
+            size_level,
+            reports[0].passes if reports else [],
+            sum(report.elapsed for report in reports),
+        )
+        return [result_object for result_object, *_ in results]
+
+    def build_many(
+        self,
+        modules: Sequence[astx.AST],
+        output_files: Sequence[str],
+        workers: Optional[int] = None,
+        executor: str = "process",
+    ) -> list[BuildResult]:
+        """
+        Build many independent ASTx modules in parallel.
+
+        Each module is built by its own builder, created with the
+        optimization levels and the cache of this builder.
+
+        Parameters
+        ----------
+            modules (Sequence[astx.AST]): The ASTx modules to be built.
+            output_files (Sequence[str]): The executable file of each module.
+            workers (int, optional): The number of workers, by default the
+                number of CPUs.
+            executor (str): `process` or `thread`.
+
+        Returns
+        -------
+            list[BuildResult]: The result of each module, in the same order.
+                The build errors are reported in the results, not raised.
+        """
+        if len(modules) != len(output_files):
+            raise Exception(
+                "[EE]: modules and output_files must have the same length."
+            )
+
+        pools = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+        if executor not in pools:
+            raise Exception("[EE]: executor not valid.")
+
+        options = {
+            "opt_level": self.opt_level,
+            "size_level": self.size_level,
+            "cache": self.cache,
+            "fast_math": self.fast_math,
+            "fold_constants": self.fold_constants,
+            "roots": self.roots,
+            "profile_generate": self.profile_generate,
+            "profile_use": self.profile_use,
+            "report_passes": self.report_passes,
+        }
+
+        with pools[executor](max_workers=workers) as pool:
+            return list(
+                pool.map(_build_module, modules, output_files, repeat(options))
+            )
+
+    @_synchronized
+    def jit(
+        self,
+        expr: astx.AST,
+        opt_level: Optional[int] = None,
+        size_level: Optional[int] = None,
+    ) -> JITModule:
+        """
+        Transpile the ASTx to LLVM-IR and compile it in the current process.
+
+        Parameters
+        ----------
+            expr (astx.AST): The ASTx to be compiled.
+            opt_level (int, optional): Override the builder `opt_level`.
+            size_level (int, optional): Override the builder `size_level`.
+
+        Returns
+        -------
+            JITModule: The compiled module.
+        """
+        if self.profile_generate is not None:
+            # the dump function registered with `atexit` would be called
+            # after the execution engine is released
+            raise Exception(
+                "[EE]: instrumented modules (profile_generate) can't be "
+                "compiled by jit, use build."
+            )
+        result_mod = self.compile(expr, opt_level, size_level)
+
+        # the execution engine takes the ownership of the target machine, so
+        # it can't be the shared one
+        return JITModule(
+            self.translator._llvm.module,
+            result_mod,
+            create_target_machine(codemodel="small"),
+            get_written_buffers(expr),
         )
 
     def run(self) -> None:
-        """Run the generated executable."""
-        sh([self.output_file])
+        """Run the generated executable, as the `run` phase of `stats`."""
+        with self.stats.phase("run"):
+            sh([self.output_file])
+
+    async def run_async(
+        self,
+        args: Sequence[str] = (),
+        *,
+        timeout: Optional[float] = None,
+        input_data: Optional[bytes] = None,
+    ) -> ProcessResult:
+        """
+        Run the generated executable as an asyncio subprocess.
+
+        The exit code isn't checked, see `ProcessResult.check`.
+
+        Parameters
+        ----------
+            args (Sequence[str]): The command line arguments.
+            timeout (float, optional): The maximum wall time in seconds,
+                after which the program is killed and the result has
+                `timed_out` set.
+            input_data (bytes, optional): The standard input of the
+                program.
+
+        Returns
+        -------
+            ProcessResult: The exit code and the output of the program.
+        """
+        with self.stats.phase("run"):
+            return await run_process(
+                [self.output_file, *args],
+                timeout=timeout,
+                input_data=input_data,
+            )
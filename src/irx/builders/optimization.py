@@ -0,0 +1,173 @@
+"""LLVM optimization pipeline used by the LLVM-IR builder."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from llvmlite import binding as llvm
+from public import public
+
+# the pass timers used to report the passes that ran are global in LLVM
+_TIMING_LOCK = threading.Lock()
+
+# the same inlining thresholds used by clang for each optimization level
+INLINING_THRESHOLDS = {1: 225, 2: 225, 3: 275}
+SIZE_INLINING_THRESHOLDS = {1: 75, 2: 25}
+
+
+@public
+class OptimizationReport:
+    """Store the information about an optimization pipeline run."""
+
+    opt_level: int
+    size_level: int
+    passes: list[str]
+    elapsed: float
+
+    def __init__(
+        self,
+        opt_level: int = 0,
+        size_level: int = 0,
+        passes: list[str] | None = None,
+        elapsed: float = 0.0,
+    ) -> None:
+        """Initialize OptimizationReport object."""
+        self.opt_level = opt_level
+        self.size_level = size_level
+        self.passes = passes if passes is not None else []
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        """Return a string that represents the object."""
+        return (
+            f"OptimizationReport(opt_level={self.opt_level}, "
+            f"size_level={self.size_level}, passes={len(self.passes)}, "
+            f"elapsed={self.elapsed:.6f})"
+        )
+
+
+def check_optimization_levels(opt_level: int, size_level: int) -> None:
+    """Check if the given optimization levels are valid."""
+    if opt_level not in (0, 1, 2, 3):
+        raise Exception(f"[EE]: opt_level not valid: {opt_level}")
+    if size_level not in (0, 1, 2):
+        raise Exception(f"[EE]: size_level not valid: {size_level}")
+
+
+def parse_timing_report(report: str) -> list[str]:
+    """
+    Get the name of the passes from a LLVM pass timing report.
+
+    Parameters
+    ----------
+        report (str): The report returned by LLVM pass timers.
+
+    Returns
+    -------
+        list[str]: The name of the passes, in the order of the report.
+    """
+    passes: list[str] = []
+    in_table = False
+
+    for line in report.splitlines():
+        if "--- Name ---" in line:
+            in_table = True
+            continue
+        if not in_table:
+            continue
+        if not line.strip() or "Total" in line:
+            in_table = False
+            continue
+        # each row has 4 timing columns with the format `0.0000 ( 0.0%)`
+        name = line.rsplit("%)", 1)[-1].strip()
+        if name:
+            passes.append(name)
+
+    return passes
+
+
+def _populate_pass_manager(
+    pass_manager: llvm.PassManager, opt_level: int, size_level: int
+) -> None:
+    pmb = llvm.create_pass_manager_builder()
+    pmb.opt_level = opt_level
+    pmb.size_level = size_level
+
+    if size_level:
+        pmb.inlining_threshold = SIZE_INLINING_THRESHOLDS[size_level]
+    elif opt_level:
+        pmb.inlining_threshold = INLINING_THRESHOLDS[opt_level]
+
+    pmb.loop_vectorize = opt_level >= 2 and size_level < 2  # noqa: PLR2004
+    pmb.slp_vectorize = opt_level >= 2 and size_level < 2  # noqa: PLR2004
+
+    pmb.populate(pass_manager)
+
+
+@public
+def optimize_module(
+    module_ref: llvm.ModuleRef,
+    target_machine: llvm.TargetMachine,
+    opt_level: int = 2,
+    size_level: int = 0,
+    report: bool = False,
+) -> OptimizationReport:
+    """
+    Run the LLVM optimization pipeline on the given module.
+
+    Parameters
+    ----------
+        module_ref (llvm.ModuleRef): The parsed module, optimized in place.
+        target_machine (llvm.TargetMachine): The target used for the cost
+            models (e.g. by the vectorizers).
+        opt_level (int): The speed optimization level, from 0 to 3.
+        size_level (int): The size optimization level, from 0 to 2 (the
+            equivalent of -Os and -Oz).
+        report (bool): Collect the name of the passes that ran, with the
+            global pass timers of LLVM (one pipeline at a time).
+
+    Returns
+    -------
+        OptimizationReport: The information about the pipeline run.
+    """
+    check_optimization_levels(opt_level, size_level)
+
+    result = OptimizationReport(opt_level, size_level)
+
+    if not opt_level and not size_level:
+        return result
+
+    function_pm = llvm.create_function_pass_manager(module_ref)
+    target_machine.add_analysis_passes(function_pm)
+    _populate_pass_manager(function_pm, opt_level, size_level)
+
+    module_pm = llvm.create_module_pass_manager()
+    target_machine.add_analysis_passes(module_pm)
+    _populate_pass_manager(module_pm, opt_level, size_level)
+
+    def run() -> None:
+        function_pm.initialize()
+        for fn in module_ref.functions:
+            if not fn.is_declaration:
+                function_pm.run(fn)
+        function_pm.finalize()
+        module_pm.run(module_ref)
+
+    start = time.perf_counter()
+
+    if not report:
+        run()
+    else:
+        with _TIMING_LOCK:
+            llvm.set_time_passes(True)
+            try:
+                run()
+            finally:
+                timing_report = llvm.report_and_reset_timings()
+                llvm.set_time_passes(False)
+        result.passes = parse_timing_report(timing_report)
+
+    result.elapsed = time.perf_counter() - start
+
+    return result
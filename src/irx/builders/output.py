@@ -0,0 +1,109 @@
+"""Write the build outputs to paths, file objects or bytes buffers."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Sequence, Union
+
+from public import public
+
+# the outputs accepted by `write_output`
+OutputTarget = Union[str, "os.PathLike[str]", IO[bytes], bytearray]
+
+# the path of a file descriptor, as seen by the process that opens it
+FD_PATH = "/proc/self/fd/{}"
+
+
+def has_memory_files() -> bool:
+    """Return True if the linker can use in-memory files (Linux only)."""
+    return hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd")
+
+
+@public
+def write_output(data: bytes, output: Optional[OutputTarget]) -> bytes:
+    """
+    Write the data to a path, a binary file object or a bytes buffer.
+
+    Parameters
+    ----------
+        data (bytes): The content to be written.
+        output (OutputTarget, optional): A path (`str` or `os.PathLike`),
+            that is created or overwritten, an object with a `write` method
+            (e.g. an open binary file or `io.BytesIO`), or a `bytearray`,
+            that the data is appended to. When it is None, nothing is
+            written.
+
+    Returns
+    -------
+        bytes: The data.
+    """
+    if output is None:
+        return data
+    if isinstance(output, bytearray):
+        output.extend(data)
+    elif isinstance(output, (str, os.PathLike)):
+        with open(output, "wb") as f:
+            f.write(data)
+    elif hasattr(output, "write"):
+        output.write(data)
+    else:
+        raise Exception(
+            f"[EE]: output not valid: {type(output).__name__} (path, "
+            "binary file object or bytearray expected)."
+        )
+    return data
+
+
+@contextmanager
+def linker_files(
+    contents: Sequence[bytes], n_outputs: int = 0
+) -> Iterator[tuple[list[str], list[str], list[int]]]:
+    """
+    Create the input and output files of a linker command.
+
+    They are in-memory files on Linux, otherwise temporary files, and are
+    removed on exit.
+
+    Parameters
+    ----------
+        contents (Sequence[bytes]): The content of each input file.
+        n_outputs (int): The number of empty output files.
+
+    Yields
+    ------
+        tuple[list[str], list[str], list[int]]: The paths of the inputs,
+            the paths of the outputs and the file descriptors that must be
+            passed to the linker process. The outputs can be read by
+            their path in this process as well.
+    """
+    if not has_memory_files():
+        with tempfile.TemporaryDirectory(prefix="irx") as tmp_dir:
+            inputs = []
+            for idx, content in enumerate(contents):
+                path = os.path.join(tmp_dir, f"module_{idx}.o")
+                with open(path, "wb") as f:
+                    f.write(content)
+                inputs.append(path)
+            outputs = [
+                os.path.join(tmp_dir, f"output_{idx}")
+                for idx in range(n_outputs)
+            ]
+            yield inputs, outputs, []
+        return
+
+    fds: list[int] = []
+    try:
+        for idx, content in enumerate(contents):
+            fds.append(os.memfd_create(f"module_{idx}.o"))
+            with os.fdopen(fds[-1], "wb", closefd=False) as f:
+                f.write(content)
+        for idx in range(n_outputs):
+            fds.append(os.memfd_create(f"output_{idx}"))
+        paths = [FD_PATH.format(fd) for fd in fds]
+        yield paths[: len(contents)], paths[len(contents) :], fds
+    finally:
+        for fd in fds:
+            os.close(fd)
@@ -0,0 +1,109 @@
+"""Split an ASTx module in partitions that are compiled independently."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import astx
+
+from public import public
+
+# attributes that don't belong to the subtree of a node
+SKIPPED_ATTRIBUTES = {"comment", "loc", "parent", "ref"}
+
+
+def _children(node: astx.AST) -> list[Any]:
+    children = []
+    for key, value in vars(node).items():
+        if key in SKIPPED_ATTRIBUTES:
+            continue
+        # the callee of a function call is defined elsewhere
+        if key == "fn" and isinstance(node, astx.FunctionCall):
+            continue
+        if isinstance(value, astx.AST):
+            children.append(value)
+        elif isinstance(value, (list, tuple)):
+            children.extend(
+                item for item in value if isinstance(item, astx.AST)
+            )
+    return children
+
+
+@public
+def count_nodes(node: astx.AST) -> int:
+    """
+    Count the ASTx nodes of the given subtree.
+
+    It is used as an estimate of the cost to compile the subtree.
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(_children(current))
+    return count
+
+
+@public
+def get_callees(node: astx.AST) -> set[str]:
+    """Get the name of the functions called inside the given subtree."""
+    callees = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, astx.FunctionCall):
+            callees.add(current.fn.name)
+        stack.extend(_children(current))
+    return callees
+
+
+@public
+def partition_module(
+    module: astx.Module, n_partitions: int
+) -> list[astx.Module]:
+    """
+    Split the top-level nodes of the module in balanced partitions.
+
+    The nodes that aren't functions are kept in the first partition, and
+    empty partitions are not returned.
+
+    Parameters
+    ----------
+        module (astx.Module): The module to be split.
+        n_partitions (int): The maximum number of partitions.
+
+    Returns
+    -------
+        list[astx.Module]: The partitions, as new modules that share the
+            nodes of the given module.
+    """
+    if n_partitions < 1:
+        raise Exception("[EE]: n_partitions must be positive.")
+
+    sizes = [0] * n_partitions
+    assigned: list[list[int]] = [[] for _ in range(n_partitions)]
+
+    functions = []
+    for idx, node in enumerate(module.nodes):
+        if isinstance(node, astx.Function):
+            functions.append((count_nodes(node), idx))
+        else:
+            assigned[0].append(idx)
+
+    # from the biggest function, to the partition with the fewest nodes
+    for size, idx in sorted(functions, key=lambda item: -item[0]):
+        target = sizes.index(min(sizes))
+        sizes[target] += size
+        assigned[target].append(idx)
+
+    partitions: list[astx.Module] = []
+    for indexes in assigned:
+        if not indexes:
+            continue
+        partition = astx.Module(name=f"{module.name}_{len(partitions)}")
+        # in the order of the module
+        for idx in sorted(indexes):
+            partition.nodes.append(module.nodes[idx])
+        partitions.append(partition)
+    return partitions
@@ -0,0 +1,69 @@
+"""Pool of reusable builders."""
+
+from __future__ import annotations
+
+import threading
+
+from contextlib import contextmanager
+from typing import Callable, Generic, Iterator, TypeVar
+
+from public import public
+
+from irx.builders.base import Builder
+
+BuilderType = TypeVar("BuilderType", bound=Builder)
+
+
+@public
+class BuilderPool(Generic[BuilderType]):
+    """Pool of warm builders, that are reset when they are released."""
+
+    factory: Callable[[], BuilderType]
+    max_size: int
+
+    def __init__(
+        self, factory: Callable[[], BuilderType], max_size: int = 8
+    ) -> None:
+        """
+        Initialize BuilderPool object.
+
+        Parameters
+        ----------
+            factory (Callable): Create a new builder, e.g. `LLVMLiteIR` or
+                `functools.partial(LLVMLiteIR, opt_level=2)`.
+            max_size (int): The maximum number of idle builders kept.
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self._idle: list[BuilderType] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> BuilderType:
+        """Get an idle builder from the pool, or create a new one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self.factory()
+
+    def release(self, builder: BuilderType) -> None:
+        """Reset the builder and return it to the pool."""
+        builder.reset()
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(builder)
+
+    @contextmanager
+    def builder(self) -> Iterator[BuilderType]:
+        """
+        Borrow a builder from the pool.
+
+        If an error is raised while the builder is used, it is discarded
+        instead of being returned to the pool.
+        """
+        builder = self.acquire()
+        yield builder
+        self.release(builder)
+
+    def __len__(self) -> int:
+        """Return the number of idle builders."""
+        return len(self._idle)
@@ -0,0 +1,204 @@
+"""Run the linker and the executables as asyncio subprocesses."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import signal
+import time
+import weakref
+
+from typing import Optional, Sequence
+
+from public import public
+
+# the default maximum number of linker processes run at the same time
+LINK_CONCURRENCY = os.cpu_count() or 1
+
+_link_semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Semaphore
+] = weakref.WeakKeyDictionary()
+
+
+@public
+class ProcessResult:
+    """Exit status and captured output of a process."""
+
+    command: list[str]
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    elapsed: float
+    timed_out: bool
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        command: Sequence[str],
+        returncode: int,
+        stdout: bytes = b"",
+        stderr: bytes = b"",
+        elapsed: float = 0,
+        timed_out: bool = False,
+    ) -> None:
+        """
+        Initialize ProcessResult object.
+
+        Parameters
+        ----------
+            command (Sequence[str]): The command line of the process.
+            returncode (int): The exit code, negative for the processes
+                killed by a signal (e.g. when they time out).
+            stdout (bytes): The standard output.
+            stderr (bytes): The standard error.
+            elapsed (float): The wall time of the process in seconds.
+            timed_out (bool): True if the process was killed because it
+                didn't finish in time.
+        """
+        self.command = list(command)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the process finished in time with exit code 0."""
+        return self.returncode == 0 and not self.timed_out
+
+    def check(self) -> ProcessResult:
+        """Raise an exception with the standard error if it isn't `ok`."""
+        if self.ok:
+            return self
+        reason = (
+            "timed out"
+            if self.timed_out
+            else f"failed with exit code {self.returncode}"
+        )
+        stderr = self.stderr.decode(errors="replace").strip()
+        raise Exception(
+            f"[EE]: {self.command[0]} {reason}"
+            + (f":\n{stderr}" if stderr else ".")
+        )
+
+    def __repr__(self) -> str:
+        """Return the representation of the result."""
+        status = "timed out" if self.timed_out else self.returncode
+        return f"ProcessResult({self.command[0]!r}, {status})"
+
+
+@public
+def get_link_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore that bounds the linker processes of the event loop.
+
+    It allows `LINK_CONCURRENCY` linker processes at the same time.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _link_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(LINK_CONCURRENCY)
+        _link_semaphores[loop] = semaphore
+    return semaphore
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    try:
+        # the process is the leader of its own group, so its children
+        # (e.g. the linker started by clang) are killed too
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
+
+
+async def _read(stream: Optional[asyncio.StreamReader]) -> bytes:
+    return b"" if stream is None else await stream.read()
+
+
+async def _feed(
+    stream: Optional[asyncio.StreamWriter], input_data: Optional[bytes]
+) -> None:
+    if stream is None or input_data is None:
+        return
+    # the process may exit without reading its input
+    with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+        stream.write(input_data)
+        await stream.drain()
+    stream.close()
+
+
+@public
+async def run_process(
+    command: Sequence[str],
+    *,
+    timeout: Optional[float] = None,
+    input_data: Optional[bytes] = None,
+    pass_fds: Sequence[int] = (),
+) -> ProcessResult:
+    """
+    Run a process and capture its output, without blocking the event loop.
+
+    The process and its children are killed when the timeout expires or
+    the calling task is cancelled.
+
+    Parameters
+    ----------
+        command (Sequence[str]): The command line.
+        timeout (float, optional): The maximum wall time in seconds.
+        input_data (bytes, optional): The standard input of the process,
+            by default empty.
+        pass_fds (Sequence[int]): The file descriptors inherited by the
+            process.
+
+    Returns
+    -------
+        ProcessResult: The exit code and the output, also for the
+            processes that failed or timed out.
+    """
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE
+        if input_data is not None
+        else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        pass_fds=tuple(pass_fds),
+        start_new_session=True,
+    )
+    stdout_task = asyncio.ensure_future(_read(process.stdout))
+    stderr_task = asyncio.ensure_future(_read(process.stderr))
+    tasks = [
+        stdout_task,
+        stderr_task,
+        asyncio.ensure_future(_feed(process.stdin, input_data)),
+        asyncio.ensure_future(process.wait()),
+    ]
+    timed_out = False
+    try:
+        # the tasks aren't cancelled on timeout, so the output written
+        # before the process is killed is kept
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            timed_out = True
+            _kill(process)
+            await asyncio.wait(tasks)
+    except BaseException:
+        _kill(process)
+        for task in tasks:
+            task.cancel()
+        await process.wait()
+        raise
+
+    return ProcessResult(
+        command,
+        process.returncode if process.returncode is not None else -1,
+        stdout_task.result(),
+        stderr_task.result(),
+        time.perf_counter() - start,
+        timed_out,
+    )
@@ -0,0 +1,349 @@
+"""Block counters of instrumented builds and profile-guided hints."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+
+from typing import Mapping, Optional, Union
+
+from llvmlite import ir
+from public import public
+
+# the internal symbols of the profile runtime of an instrumented module
+PROFILE_COUNT = "__irx_profile_count"
+PROFILE_COUNTERS = "__irx_profile_counters"
+PROFILE_NAMES = "__irx_profile_names"
+PROFILE_OFFSETS = "__irx_profile_offsets"
+PROFILE_DUMP = "__irx_profile_dump"
+PROFILE_INIT = "__irx_profile_init"
+
+# the functions entered at least this fraction of the times of the most
+# entered function are hot
+HOT_FUNCTION_FRACTION = 0.1
+
+# the attribute of the functions of each temperature: llvmlite doesn't
+# know the `hot` attribute of LLVM, the hot functions are inlined instead
+TEMPERATURE_ATTRIBUTES = {"hot": "inlinehint", "cold": "cold"}
+
+# the branch weights are 32-bit integers
+MAX_BRANCH_WEIGHT = 2**32 - 1
+
+ProfilePath = Union[str, "os.PathLike[str]"]
+
+I8_PTR = ir.IntType(8).as_pointer()
+I32 = ir.IntType(32)
+I64 = ir.IntType(64)
+
+
+def get_block_key(function: str, block: str) -> str:
+    """Return the profile key of a basic block, e.g. `main:then`."""
+    return f"{function}:{block}"
+
+
+@public
+class BlockProfile:
+    """
+    Execution counts of the basic blocks of instrumented builds.
+
+    The counts are keyed by the function name and the block label, e.g.
+    `main:then`.
+    """
+
+    counts: dict[str, int]
+    _max_entry_count: Optional[int]
+
+    def __init__(self, counts: Optional[Mapping[str, int]] = None) -> None:
+        """
+        Initialize BlockProfile object.
+
+        Parameters
+        ----------
+            counts (Mapping[str, int], optional): The count of each block.
+        """
+        self.counts = dict(counts or {})
+        self._max_entry_count = None
+
+    @classmethod
+    def load(cls, path: ProfilePath) -> BlockProfile:
+        """Load the profile file written by instrumented programs."""
+        profile = cls()
+        with open(path, encoding="utf8") as f:
+            for line in f:
+                line = line.strip()  # noqa: PLW2901
+                if not line or line.startswith("#"):
+                    continue
+                key, _, count = line.rpartition(" ")
+                if not key or not count.isdigit():
+                    raise Exception(f"[EE]: profile line not valid: {line}")
+                profile.counts[key] = profile.counts.get(key, 0) + int(count)
+        return profile
+
+    def save(self, path: ProfilePath) -> None:
+        """Write the profile to a file, in the format of `load`."""
+        with open(path, "w", encoding="utf8") as f:
+            for key, count in sorted(self.counts.items()):
+                f.write(f"{key} {count}\n")
+
+    def merge(self, other: BlockProfile) -> BlockProfile:
+        """Add the counts of another profile to this one, and return it."""
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self._max_entry_count = None
+        return self
+
+    def get_count(self, function: str, block: str) -> Optional[int]:
+        """Return the count of the block, None if it isn't profiled."""
+        return self.counts.get(get_block_key(function, block))
+
+    def get_branch_weights(
+        self, function: str, true_block: str, false_block: str
+    ) -> Optional[tuple[int, int]]:
+        """
+        Return the `branch_weights` of a conditional branch.
+
+        Parameters
+        ----------
+            function (str): The name of the function of the branch.
+            true_block (str): The label of the successor when the condition
+                is true.
+            false_block (str): The label of the other successor.
+
+        Returns
+        -------
+            tuple[int, int], optional: The weights of the true and of the
+                false successors, None if the successors aren't profiled.
+        """
+        true_count = self.get_count(function, true_block)
+        false_count = self.get_count(function, false_block)
+        if true_count is None or false_count is None:
+            return None
+        # scaled down to 32 bits, plus one so no branch is impossible
+        scale = max(true_count, false_count) // (MAX_BRANCH_WEIGHT - 1) + 1
+        return true_count // scale + 1, false_count // scale + 1
+
+    def get_max_entry_count(self) -> int:
+        """Return the entry count of the most entered function."""
+        # computed once, and again only after a `merge`
+        if self._max_entry_count is None:
+            self._max_entry_count = max(
+                (
+                    value
+                    for key, value in self.counts.items()
+                    if key.endswith(":entry")
+                ),
+                default=0,
+            )
+        return self._max_entry_count
+
+    def get_function_temperature(self, function: str) -> Optional[str]:
+        """Return `hot` or `cold` for a function, from its entry count."""
+        count = self.get_count(function, "entry")
+        if count is None:
+            return None
+        if count == 0:
+            return "cold"
+        if count >= HOT_FUNCTION_FRACTION * self.get_max_entry_count():
+            return "hot"
+        return None
+
+    def fingerprint(self) -> str:
+        """Return a hash of the counts, e.g. for the build cache keys."""
+        digest = hashlib.sha256()
+        for key, count in sorted(self.counts.items()):
+            digest.update(f"{key} {count}\n".encode("utf8"))
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        """Return the number of profiled blocks."""
+        return len(self.counts)
+
+    def __repr__(self) -> str:
+        """Return the representation of the profile."""
+        return f"BlockProfile({len(self.counts)} blocks)"
+
+
+def set_function_profile(function: ir.Function, profile: BlockProfile) -> None:
+    """Add the entry count and the `inlinehint` or `cold` attribute."""
+    count = profile.get_count(function.name, "entry")
+    if count is None:
+        return
+    module = function.module
+    function.set_metadata(
+        "prof",
+        module.add_metadata(
+            [
+                ir.MetaDataString(module, "function_entry_count"),
+                ir.Constant(I64, count),
+            ]
+        ),
+    )
+
+    temperature = profile.get_function_temperature(function.name)
+    if temperature is None:
+        return
+    function.attributes.add(TEMPERATURE_ATTRIBUTES[temperature])
+
+
+def declare_count_function(module: ir.Module) -> ir.Function:
+    """Declare the function that increments a block counter."""
+    function = module.globals.get(PROFILE_COUNT)
+    if function is not None:
+        return function
+    fn_type = ir.FunctionType(ir.VoidType(), [I32])
+    function = ir.Function(module, fn_type, PROFILE_COUNT)
+    function.linkage = "internal"
+    function.attributes.add("alwaysinline")
+    function.attributes.add("nounwind")
+    return function
+
+
+def _get_libc_function(
+    module: ir.Module, name: str, fn_type: ir.FunctionType
+) -> ir.Function:
+    function = module.globals.get(name)
+    if function is None:
+        function = ir.Function(module, fn_type, name)
+    return function
+
+
+def _add_constant(module: ir.Module, name: str, data: bytes) -> ir.Value:
+    data_type = ir.ArrayType(I8_PTR.pointee, len(data))
+    constant = ir.GlobalVariable(module, data_type, name)
+    constant.linkage = "internal"
+    constant.global_constant = True
+    constant.initializer = ir.Constant(data_type, bytearray(data))
+    zero = ir.Constant(I32, 0)
+    return constant.gep([zero, zero])
+
+
+def _emit_count_function(module: ir.Module, counters: ir.Value) -> None:
+    # counters[idx] += 1
+    count = declare_count_function(module)
+    zero = ir.Constant(I32, 0)
+    ir_builder = ir.IRBuilder(count.append_basic_block("entry"))
+    counter = ir_builder.gep(counters, [zero, count.args[0]])
+    ir_builder.store(
+        ir_builder.add(ir_builder.load(counter), ir.Constant(I64, 1)), counter
+    )
+    ir_builder.ret_void()
+
+
+def _emit_dump_function(
+    module: ir.Module, counters: ir.Value, names: list[str], path: ProfilePath
+) -> ir.Function:
+    # append the "name count" lines to the profile file
+    zero = ir.Constant(I32, 0)
+
+    # the names, in one string, and the offset of each name
+    offsets = []
+    data = bytearray()
+    for name in names:
+        offsets.append(len(data))
+        data += name.encode("utf8") + b"\0"
+    names_ptr = _add_constant(module, PROFILE_NAMES, bytes(data))
+    offsets_type = ir.ArrayType(I32, len(names))
+    offsets_var = ir.GlobalVariable(module, offsets_type, PROFILE_OFFSETS)
+    offsets_var.linkage = "internal"
+    offsets_var.global_constant = True
+    offsets_var.initializer = ir.Constant(offsets_type, offsets)
+
+    fopen = _get_libc_function(
+        module, "fopen", ir.FunctionType(I8_PTR, [I8_PTR, I8_PTR])
+    )
+    fprintf = _get_libc_function(
+        module, "fprintf", ir.FunctionType(I32, [I8_PTR, I8_PTR], True)
+    )
+    fclose = _get_libc_function(
+        module, "fclose", ir.FunctionType(I32, [I8_PTR])
+    )
+
+    dump = ir.Function(
+        module, ir.FunctionType(ir.VoidType(), []), PROFILE_DUMP
+    )
+    dump.linkage = "internal"
+    entry_bb = dump.append_basic_block("entry")
+    loop_bb = dump.append_basic_block("loop")
+    close_bb = dump.append_basic_block("close")
+    exit_bb = dump.append_basic_block("exit")
+
+    # the program goes on without a profile if the file can't be opened
+    ir_builder = ir.IRBuilder(entry_bb)
+    path_ptr = _add_constant(
+        module, f"{PROFILE_DUMP}.path", os.fsencode(path) + b"\0"
+    )
+    mode_ptr = _add_constant(module, f"{PROFILE_DUMP}.mode", b"a\0")
+    file_ptr = ir_builder.call(fopen, [path_ptr, mode_ptr], "file")
+    is_null = ir_builder.icmp_unsigned(
+        "==", file_ptr, ir.Constant(I8_PTR, None)
+    )
+    ir_builder.cbranch(is_null, exit_bb, loop_bb)
+
+    ir_builder.position_at_end(loop_bb)
+    idx = ir_builder.phi(I32, "idx")
+    idx.add_incoming(zero, entry_bb)
+    offset = ir_builder.load(ir_builder.gep(offsets_var, [zero, idx]))
+    name_ptr = ir_builder.gep(names_ptr, [offset])
+    value = ir_builder.load(ir_builder.gep(counters, [zero, idx]))
+    format_ptr = _add_constant(
+        module, f"{PROFILE_DUMP}.format", b"%s %llu\n\0"
+    )
+    ir_builder.call(fprintf, [file_ptr, format_ptr, name_ptr, value])
+    next_idx = ir_builder.add(idx, ir.Constant(I32, 1), "next")
+    idx.add_incoming(next_idx, loop_bb)
+    done = ir_builder.icmp_unsigned(
+        "==", next_idx, ir.Constant(I32, len(names))
+    )
+    ir_builder.cbranch(done, close_bb, loop_bb)
+
+    ir_builder.position_at_end(close_bb)
+    ir_builder.call(fclose, [file_ptr])
+    ir_builder.branch(exit_bb)
+
+    ir_builder.position_at_end(exit_bb)
+    ir_builder.ret_void()
+    return dump
+
+
+def _emit_constructor(module: ir.Module, dump: ir.Function) -> None:
+    # the module constructor, that registers the dump function
+    atexit = _get_libc_function(
+        module, "atexit", ir.FunctionType(I32, [dump.type])
+    )
+    init = ir.Function(
+        module, ir.FunctionType(ir.VoidType(), []), PROFILE_INIT
+    )
+    init.linkage = "internal"
+    ir_builder = ir.IRBuilder(init.append_basic_block("entry"))
+    ir_builder.call(atexit, [dump])
+    ir_builder.ret_void()
+
+    ctor_type = ir.LiteralStructType([I32, init.type, I8_PTR])
+    ctors_type = ir.ArrayType(ctor_type, 1)
+    ctors = ir.GlobalVariable(module, ctors_type, "llvm.global_ctors")
+    ctors.linkage = "appending"
+    ctor = [ir.Constant(I32, 65535), init, ir.Constant(I8_PTR, None)]
+    ctors.initializer = ir.Constant(ctors_type, [ir.Constant(ctor_type, ctor)])
+
+
+def emit_profile_runtime(
+    module: ir.Module, names: list[str], path: ProfilePath
+) -> None:
+    """
+    Add the block counters and the function that dumps them at exit.
+
+    Parameters
+    ----------
+        module (ir.Module): The instrumented module.
+        names (list[str]): The block key of each counter, in order.
+        path (ProfilePath): The profile file.
+    """
+    counters_type = ir.ArrayType(I64, len(names))
+    counters = ir.GlobalVariable(module, counters_type, PROFILE_COUNTERS)
+    counters.linkage = "internal"
+    counters.initializer = ir.Constant(counters_type, None)
+
+    _emit_count_function(module, counters)
+    _emit_constructor(
+        module, _emit_dump_function(module, counters, names, path)
+    )
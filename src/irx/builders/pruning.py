@@ -0,0 +1,112 @@
+"""Remove the functions of a module that can't be reached from its roots."""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+import astx
+
+from public import public
+
+from irx.builders.partition import get_callees
+
+
+@public
+def get_call_graph(module: astx.Module) -> dict[str, set[str]]:
+    """
+    Get the functions called by each function defined in the module.
+
+    The callees can include functions that are not defined in the module,
+    e.g. the builtins.
+
+    Parameters
+    ----------
+        module (astx.Module): The module with the functions.
+
+    Returns
+    -------
+        dict[str, set[str]]: The names of the callees of each function.
+    """
+    return {
+        node.prototype.name: get_callees(node.body)
+        for node in module.nodes
+        if isinstance(node, astx.Function)
+    }
+
+
+@public
+def get_reachable_functions(
+    module: astx.Module, roots: Iterable[str]
+) -> set[str]:
+    """
+    Get the functions that can be called, directly or not, from the roots.
+
+    The functions called by the top-level nodes that are not functions are
+    reachable as well, because these nodes are always translated.
+
+    Parameters
+    ----------
+        module (astx.Module): The module with the functions.
+        roots (Iterable[str]): The names of the entry points, e.g. `main`
+            or the functions exported by a shared library.
+
+    Returns
+    -------
+        set[str]: The names of the reachable functions, including the
+            callees that are not defined in the module.
+    """
+    # only the bodies of the reachable functions are visited
+    functions = {
+        node.prototype.name: node
+        for node in module.nodes
+        if isinstance(node, astx.Function)
+    }
+    stack = list(roots)
+    for name in stack:
+        if name not in functions:
+            raise Exception(f"[EE]: root function not defined: {name}")
+    for node in module.nodes:
+        if not isinstance(node, astx.Function):
+            stack.extend(get_callees(node))
+
+    reachable: set[str] = set()
+    while stack:
+        name = stack.pop()
+        if name in reachable:
+            continue
+        reachable.add(name)
+        if name in functions:
+            stack.extend(get_callees(functions[name].body))
+    return reachable
+
+
+@public
+def prune_module(
+    module: astx.Module, roots: Iterable[str]
+) -> tuple[astx.Module, int]:
+    """
+    Remove the functions that can't be reached from the roots.
+
+    The module given is not changed: the result is a new module, with the
+    reachable functions and the other top-level nodes in the same order.
+
+    Parameters
+    ----------
+        module (astx.Module): The module to be pruned.
+        roots (Iterable[str]): The names of the entry points.
+
+    Returns
+    -------
+        tuple[astx.Module, int]: The pruned module and the number of
+            functions removed.
+    """
+    reachable = get_reachable_functions(module, roots)
+    pruned = astx.Module(name=module.name)
+    for node in module.nodes:
+        if (
+            isinstance(node, astx.Function)
+            and node.prototype.name not in reachable
+        ):
+            continue
+        pruned.nodes.append(node)
+    return pruned, len(module.nodes) - len(pruned.nodes)
@@ -0,0 +1,89 @@
+"""Load the shared libraries built by the LLVM-IR builder."""
+
+from __future__ import annotations
+
+import ctypes
+import os
+
+from typing import Any, Callable, Optional
+
+from public import public
+
+from irx.builders.jit import wrap_buffer_function
+
+
+@public
+class SharedLibrary:
+    """
+    Shared library loaded in the current process with ctypes.
+
+    The functions are called like the ones of a `JITModule`, e.g.
+    `library["add"](1, 2)`.
+    """
+
+    path: str
+    library: ctypes.CDLL
+    function_types: dict[str, Any]
+    written_buffers: dict[str, list[bool]]
+
+    def __init__(
+        self,
+        path: str,
+        function_types: dict[str, Any],
+        written_buffers: Optional[dict[str, list[bool]]] = None,
+    ) -> None:
+        """
+        Initialize SharedLibrary object.
+
+        Parameters
+        ----------
+            path (str): The shared library file.
+            function_types (dict[str, Any]): The ctypes function type
+                (`ctypes.CFUNCTYPE`) of each function, by name.
+            written_buffers (dict[str, list[bool]], optional): If each
+                function can write to each of its buffers, see
+                `get_written_buffers`.
+        """
+        self.path = os.path.abspath(path)
+        self.function_types = function_types
+        self.written_buffers = written_buffers or {}
+        # symbols are loaded with RTLD_LOCAL (the ctypes default), so the
+        # symbols of different libraries (e.g. `putchard`) don't collide
+        self.library = ctypes.CDLL(self.path)
+        self._functions: dict[str, Callable[..., Any]] = {}
+
+    @property
+    def function_names(self) -> list[str]:
+        """Return the names of the functions defined in the library."""
+        return list(self.function_types)
+
+    def get_function(self, name: str) -> Callable[..., Any]:
+        """
+        Get a Python callable for the function with the given name.
+
+        Parameters
+        ----------
+            name (str): The function name.
+
+        Returns
+        -------
+            A ctypes callable for the function.
+        """
+        if name in self._functions:
+            return self._functions[name]
+
+        if name not in self.function_types:
+            raise Exception(f"[EE]: Function not defined: {name}")
+
+        cfunc = self.function_types[name]((name, self.library))
+        function = wrap_buffer_function(cfunc, self.written_buffers.get(name))
+        self._functions[name] = function
+        return function
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        """Get a Python callable for the function with the given name."""
+        return self.get_function(name)
+
+    def __contains__(self, name: str) -> bool:
+        """Check if the library defines a function with the given name."""
+        return name in self.function_types
@@ -0,0 +1,174 @@
+"""Instrumentation of the build phases."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from types import GeneratorType
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import astx
+
+from public import public
+
+
+class _ProfiledTable(Dict[type, Callable[..., Any]]):
+    """Dispatch table of a visitor that profiles the visits."""
+
+    def __init__(self, visitor_class: Any, stats: BuildStats) -> None:
+        super().__init__()
+        self.visitor_class = visitor_class
+        self.stats = stats
+
+    def __missing__(self, node_type: type) -> Callable[..., Any]:
+        method = self.visitor_class.resolve_visit(node_type)
+        name = node_type.__name__
+        counts = self.stats.node_counts
+        times = self.stats.node_times
+
+        def profiled_visit(visitor: Any, node: astx.AST) -> Any:
+            start = time.perf_counter()
+            result = method(visitor, node)
+            # the children are visited while the generator is driven
+            if type(result) is GeneratorType:
+                yield from result
+            counts[name] = counts.get(name, 0) + 1
+            times[name] = times.get(name, 0.0) + time.perf_counter() - start
+
+        self[node_type] = profiled_visit
+        return profiled_visit
+
+
+@public
+class BuildStats:
+    """
+    Wall time of the build phases and of the ASTx node visits.
+
+    A phase that runs more than once accumulates its time.
+    """
+
+    profile_nodes: bool
+    on_phase: Optional[Callable[[str, float], None]]
+    phases: dict[str, float]
+    node_counts: dict[str, int]
+    node_times: dict[str, float]
+    events: list[dict[str, Any]]
+
+    def __init__(
+        self,
+        profile_nodes: bool = False,
+        on_phase: Optional[Callable[[str, float], None]] = None,
+    ) -> None:
+        """
+        Initialize BuildStats object.
+
+        Parameters
+        ----------
+            profile_nodes (bool): Count and time the visits of each ASTx
+                node type.
+            on_phase (Callable, optional): Called with the name and the wall
+                time (in seconds) of each phase when it ends, e.g. to send
+                the metrics to a monitoring service.
+        """
+        self.profile_nodes = profile_nodes
+        self.on_phase = on_phase
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove the recorded phases, visits and trace events."""
+        self.phases = {}
+        self.node_counts = {}
+        self.node_times = {}
+        self.events = []
+
+    @property
+    def total(self) -> float:
+        """Return the wall time of all the phases, in seconds."""
+        return sum(self.phases.values())
+
+    def add_phase(self, name: str, start: float, elapsed: float) -> None:
+        """
+        Record a phase that already ran.
+
+        Parameters
+        ----------
+            name (str): The phase name.
+            start (float): The `time.perf_counter()` at the phase start.
+            elapsed (float): The wall time of the phase, in seconds.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+        self.events.append(
+            {
+                "name": name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": elapsed * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+        )
+        if self.on_phase is not None:
+            self.on_phase(name, elapsed)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the wall time of the code inside the context."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, start, time.perf_counter() - start)
+
+    def visit(self, visitor: Any, expr: astx.AST) -> None:
+        """
+        Visit the ASTx with the given visitor, as the `visit` phase.
+
+        Parameters
+        ----------
+            visitor (BuilderVisitor): The visitor used for the translation.
+            expr (astx.AST): The ASTx to be visited.
+        """
+        with self.phase("visit"):
+            if not self.profile_nodes:
+                visitor.visit(expr)
+                return
+
+            # the instance attribute hides the table of the visitor class,
+            # with wrappers that count and time the visits of each node type
+            visitor._visit_table = _ProfiledTable(type(visitor), self)
+            try:
+                visitor.visit(expr)
+            finally:
+                del visitor._visit_table
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Return the phases as a Chrome trace, e.g. for Perfetto.
+
+        The node visits are in the metadata of the trace.
+        """
+        return {
+            "traceEvents": list(self.events),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "node_counts": dict(self.node_counts),
+                "node_times": dict(self.node_times),
+            },
+        }
+
+    def save_chrome_trace(self, path: str) -> None:
+        """Write the Chrome trace (see `to_chrome_trace`) to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def __repr__(self) -> str:
+        """Return a string that represents the object."""
+        phases = ", ".join(
+            f"{name}={elapsed:.6f}" for name, elapsed in self.phases.items()
+        )
+        return f"BuildStats({phases})"
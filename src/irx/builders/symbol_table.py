@@ -1,6 +1,6 @@
 """Symbol Table classes."""
 
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from astx.symbol_table import SymbolTable
 from public import public
@@ -35,3 +35,137 @@ class RegisterTable:
 
     def reset(self) -> None:
         self.stack[-1] = 0
+
+
+@public
+class SymbolEntry:
+    """
+    A name bound to a value in a scope of a `ScopedSymbolTable`.
+
+    The entry keeps the entry of the same name that it shadows, so the
+    shadowed one is visible again when the scope of this entry is popped.
+    """
+
+    __slots__ = ("depth", "name", "shadowed", "value")
+
+    name: str
+    value: Any
+    depth: int
+    shadowed: Optional["SymbolEntry"]
+
+    def __init__(
+        self,
+        name: str,
+        value: Any,
+        depth: int,
+        shadowed: Optional["SymbolEntry"] = None,
+    ) -> None:
+        """
+        Initialize SymbolEntry object.
+
+        Parameters
+        ----------
+            name (str): The name of the symbol.
+            value (Any): The value bound to the name, e.g. an alloca.
+            depth (int): The depth of the scope of the entry.
+            shadowed (SymbolEntry, optional): The entry of the same name in
+                an outer scope, if any.
+        """
+        self.name = name
+        self.value = value
+        self.depth = depth
+        self.shadowed = shadowed
+
+    def __repr__(self) -> str:
+        """Return the representation of the entry."""
+        return f"SymbolEntry({self.name!r}, depth={self.depth})"
+
+
+@public
+class ScopedSymbolTable:
+    """Symbol table with nested scopes (e.g. functions, blocks and loops)."""
+
+    symbols: Dict[str, SymbolEntry]
+    scopes: List[List[SymbolEntry]]
+
+    def __init__(self) -> None:
+        """Initialize ScopedSymbolTable object, with the global scope."""
+        # the visible entry of each name, so a lookup is a single dictionary
+        # access however deep the scopes are
+        self.symbols: Dict[str, SymbolEntry] = {}
+        # the entries defined in each scope, restored when it is popped
+        self.scopes: List[List[SymbolEntry]] = [[]]
+
+    @property
+    def depth(self) -> int:
+        """Return the depth of the current scope, 0 for the global scope."""
+        return len(self.scopes) - 1
+
+    def push_scope(self) -> None:
+        """Open a new scope, nested in the current one."""
+        self.scopes.append([])
+
+    def pop_scope(self) -> None:
+        """Close the current scope and remove the names defined in it."""
+        if len(self.scopes) == 1:
+            raise Exception("[EE]: the global scope can't be popped.")
+        symbols = self.symbols
+        for entry in reversed(self.scopes.pop()):
+            if entry.shadowed is None:
+                del symbols[entry.name]
+            else:
+                symbols[entry.name] = entry.shadowed
+
+    def define(self, name: str, value: Any) -> SymbolEntry:
+        """
+        Bind the name to the value in the current scope.
+
+        A name of an outer scope is shadowed until the current scope is
+        popped, and a name of the current scope is replaced.
+
+        Parameters
+        ----------
+            name (str): The name of the symbol.
+            value (Any): The value bound to the name.
+
+        Returns
+        -------
+            SymbolEntry: The new entry.
+        """
+        shadowed = self.symbols.get(name)
+        depth = len(self.scopes) - 1
+        if shadowed is not None and shadowed.depth == depth:
+            # the entry is replaced, it is restored with its own shadowed
+            shadowed.value = value
+            return shadowed
+        entry = SymbolEntry(name, value, depth, shadowed)
+        self.symbols[name] = entry
+        self.scopes[-1].append(entry)
+        return entry
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Return the value of the visible entry of the name, if any."""
+        entry = self.symbols.get(name)
+        return default if entry is None else entry.value
+
+    def is_local(self, name: str) -> bool:
+        """Return True if the name is defined in the current scope."""
+        entry = self.symbols.get(name)
+        return entry is not None and entry.depth == len(self.scopes) - 1
+
+    def clear(self) -> None:
+        """Remove all the names and scopes, but the empty global scope."""
+        self.symbols = {}
+        self.scopes = [[]]
+
+    def __contains__(self, name: object) -> bool:
+        """Return True if the name is visible in the current scope."""
+        return name in self.symbols
+
+    def __getitem__(self, name: str) -> Any:
+        """Return the value of the visible entry of the name."""
+        return self.symbols[name].value
+
+    def __len__(self) -> int:
+        """Return the number of visible names."""
+        return len(self.symbols)
@@ -0,0 +1,115 @@
+"""Process-wide LLVM initialization and target machines."""
+
+from __future__ import annotations
+
+import threading
+
+from typing import Any
+
+from llvmlite import binding as llvm
+from public import public
+
+_LOCK = threading.RLock()
+_INITIALIZED = False
+_TARGET_MACHINES: dict[tuple[Any, ...], llvm.TargetMachine] = {}
+
+
+@public
+def initialize_llvm() -> None:
+    """
+    Initialize the LLVM targets, once per process.
+
+    It is safe to call this function many times, only the first call
+    initializes LLVM.
+    """
+    global _INITIALIZED  # noqa: PLW0603
+
+    if _INITIALIZED:
+        return
+
+    with _LOCK:
+        if _INITIALIZED:
+            return
+
+        # initialize the target registry etc.
+        llvm.initialize()
+        llvm.initialize_all_asmprinters()
+        llvm.initialize_all_targets()
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmparser()
+        llvm.initialize_native_asmprinter()
+
+        _INITIALIZED = True
+
+
+@public
+def create_target_machine(
+    triple: str = "",
+    cpu: str = "",
+    features: str = "",
+    **options: Any,
+) -> llvm.TargetMachine:
+    """
+    Create a new target machine.
+
+    Use it for the target machines that will be owned by another object,
+    e.g. a MCJIT execution engine, otherwise prefer `get_target_machine`.
+
+    Parameters
+    ----------
+        triple (str): The target triple, by default the host triple.
+        cpu (str): The target CPU name, by default a generic CPU.
+        features (str): The target CPU features.
+        options: Other options for `llvm.Target.create_target_machine`,
+            e.g. `opt`, `reloc` and `codemodel`.
+
+    Returns
+    -------
+        llvm.TargetMachine: The new target machine.
+    """
+    initialize_llvm()
+
+    target = (
+        llvm.Target.from_triple(triple)
+        if triple
+        else llvm.Target.from_default_triple()
+    )
+    return target.create_target_machine(cpu=cpu, features=features, **options)
+
+
+@public
+def get_target_machine(
+    triple: str = "",
+    cpu: str = "",
+    features: str = "",
+    **options: Any,
+) -> llvm.TargetMachine:
+    """
+    Get a target machine shared by all the builders of the process.
+
+    The shared target machines must not be given to objects that take their
+    ownership (e.g. `llvm.create_mcjit_compiler`).
+
+    Parameters
+    ----------
+        triple (str): The target triple, by default the host triple.
+        cpu (str): The target CPU name, by default a generic CPU.
+        features (str): The target CPU features.
+        options: Other options for `llvm.Target.create_target_machine`,
+            e.g. `opt`, `reloc` and `codemodel`.
+
+    Returns
+    -------
+        llvm.TargetMachine: The target machine for the given options.
+    """
+    key = (triple, cpu, features, tuple(sorted(options.items())))
+    target_machine = _TARGET_MACHINES.get(key)
+    if target_machine is not None:
+        return target_machine
+
+    with _LOCK:
+        if key not in _TARGET_MACHINES:
+            _TARGET_MACHINES[key] = create_target_machine(
+                triple, cpu, features, **options
+            )
+        return _TARGET_MACHINES[key]
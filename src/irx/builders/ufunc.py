@@ -0,0 +1,234 @@
+"""Batch functions over buffers for scalar functions, like NumPy ufuncs."""
+
+from __future__ import annotations
+
+import array
+import ctypes
+
+from typing import Any, Optional, cast
+
+import astx
+
+from public import public
+
+from irx.builders.buffers import (
+    ELEMENT_TYPES,
+    BufferLength,
+    BufferLoad,
+    BufferStore,
+    BufferType,
+)
+from irx.builders.jit import BufferFunction, get_buffer_argument
+
+# the suffix of the name of the batch function of a scalar function
+BATCH_SUFFIX = "_batch"
+
+# the `array.array` type code of each element type
+ARRAY_TYPECODES = {
+    ctypes.c_int8: "b",
+    ctypes.c_int16: "h",
+    ctypes.c_int32: "i",
+    ctypes.c_int64: "q",
+    ctypes.c_float: "f",
+    ctypes.c_double: "d",
+}
+
+
+def _unique_name(name: str, names: set[str]) -> str:
+    while name in names:
+        name = f"{name}_"
+    return name
+
+
+@public
+def make_batch_function(
+    function: astx.Function, name: Optional[str] = None
+) -> astx.Function:
+    """
+    Create the batch function of a scalar function.
+
+    For `f(x, y)`, it is `f_batch(x, y, out)` over buffers, that stores
+    `f(x[i], y[i])` in `out[i]`. It should be added to the module of `f`.
+
+    Parameters
+    ----------
+        function (astx.Function): The scalar function, with arguments and
+            return value of the buffer element types.
+        name (str, optional): The name of the batch function, by default
+            the name of the function with the `_batch` suffix.
+
+    Returns
+    -------
+        astx.Function: The batch function, that returns 0.
+    """
+    proto = function.prototype
+    args = cast(list[astx.Argument], list(proto.args.nodes))
+    if not args:
+        raise Exception(
+            f"[EE]: batch function of {proto.name} needs arguments."
+        )
+    for arg in args:
+        if not isinstance(arg.type_, ELEMENT_TYPES):
+            raise Exception(
+                "[EE]: argument type not supported by batch functions: "
+                f"{arg.name} ({type(arg.type_).__name__})"
+            )
+    if not isinstance(proto.return_type, ELEMENT_TYPES):
+        raise Exception(
+            "[EE]: return type not supported by batch functions: "
+            f"{type(proto.return_type).__name__}"
+        )
+
+    names = {arg.name for arg in args}
+    out_name = _unique_name("out", names)
+    index_name = _unique_name("i", names | {out_name})
+
+    out = astx.Variable(out_name, type_=BufferType(proto.return_type))
+    index = astx.Variable(index_name, type_=astx.Int64())
+    call = astx.FunctionCall(
+        function,
+        [
+            BufferLoad(
+                astx.Variable(arg.name, type_=BufferType(arg.type_)), index
+            )
+            for arg in args
+        ],
+        type_=proto.return_type,
+    )
+
+    loop_body = astx.Block()
+    loop_body.append(BufferStore(out, index, call))
+    loop = astx.ForRangeLoopStmt(
+        variable=astx.InlineVariableDeclaration(
+            index_name, type_=astx.Int64(), value=astx.LiteralInt64(0)
+        ),
+        start=astx.LiteralInt64(0),
+        end=BufferLength(out),
+        step=astx.LiteralInt64(1),
+        body=loop_body,
+    )
+
+    block = astx.Block()
+    block.append(loop)
+    block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+
+    batch_proto = astx.FunctionPrototype(
+        name=name or f"{proto.name}{BATCH_SUFFIX}",
+        args=astx.Arguments(
+            *[astx.Argument(arg.name, BufferType(arg.type_)) for arg in args],
+            astx.Argument(out_name, BufferType(proto.return_type)),
+        ),
+        return_type=astx.Int32(),
+    )
+    return astx.Function(prototype=batch_proto, body=block)
+
+
+@public
+class Ufunc:
+    """
+    Vectorized Python callable for a compiled batch function.
+
+    It returns a NumPy array with the shape of the first argument when it
+    is a NumPy array, otherwise an `array.array`.
+    """
+
+    function: BufferFunction
+    input_types: list[Any]
+    output_type: Any
+
+    def __init__(self, function: Any) -> None:
+        """
+        Initialize Ufunc object.
+
+        Parameters
+        ----------
+            function (BufferFunction): The compiled batch function, e.g.
+                `jit_module["add_batch"]`.
+        """
+        buffer_types = getattr(function, "buffer_types", [])
+        if len(buffer_types) < 2 or None in buffer_types:  # noqa: PLR2004
+            raise Exception("[EE]: batch function expected.")
+        self.function = function
+        # the pointer type of each input and of the output
+        self.input_types = buffer_types[:-1]
+        self.output_type = buffer_types[-1]
+
+    @property
+    def nin(self) -> int:
+        """Return the number of inputs."""
+        return len(self.input_types)
+
+    def __call__(self, *args: Any, out: Any = None) -> Any:
+        """
+        Call the scalar function for each element of the arrays.
+
+        Parameters
+        ----------
+            args (Any): The input arrays.
+            out (Any, optional): The array of the results, by default a new
+                array.
+
+        Returns
+        -------
+            The array of the results.
+        """
+        if len(args) != self.nin:
+            raise Exception(
+                f"[EE]: {self.nin} arguments expected, got {len(args)}."
+            )
+        c_args: list[Any] = []
+        lengths = []
+        # the batch function only reads the inputs
+        for arg, pointer_type in zip(args, self.input_types):
+            pointer, length = get_buffer_argument(
+                arg, pointer_type, writable=False
+            )
+            c_args.extend((pointer, length))
+            lengths.append(length)
+
+        if out is None:
+            out = self._empty(args[0], lengths[0])
+        pointer, length = get_buffer_argument(out, self.output_type)
+        c_args.extend((pointer, length))
+        lengths.append(length)
+
+        if len(set(lengths)) != 1:
+            raise Exception(
+                f"[EE]: buffer lengths don't match: {tuple(lengths)}."
+            )
+        self.function.function(*c_args)
+        return out
+
+    def _empty(self, like: Any, length: int) -> Any:
+        element_type = self.output_type._type_
+        if hasattr(like, "__array_interface__"):
+            # NumPy is only imported when the argument is a NumPy array
+            import numpy as np  # noqa: PLC0415
+
+            return np.empty(np.shape(like), dtype=np.dtype(element_type))
+        return array.array(
+            ARRAY_TYPECODES[element_type],
+            bytes(length * ctypes.sizeof(element_type)),
+        )
+
+    def __repr__(self) -> str:
+        """Return a string that represents the object."""
+        return f"Ufunc(nin={self.nin})"
+
+
+@public
+def get_ufunc(compiled: Any, name: str) -> Ufunc:
+    """
+    Get the Ufunc of a scalar function of a compiled module.
+
+    Parameters
+    ----------
+        compiled (JITModule | SharedLibrary): The compiled module, with
+            the batch function created by `make_batch_function`.
+        name (str): The name of the scalar function.
+
+    Returns
+    -------
+        Ufunc: The vectorized callable.
+    """
+    return Ufunc(compiled[f"{name}{BATCH_SUFFIX}"])
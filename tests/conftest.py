@@ -4,9 +4,11 @@ import tempfile
 
 from difflib import SequenceMatcher
 from pathlib import Path
+from typing import Optional, Sequence
 
 import astx
 
+from astx.types.base import AnyType
 from irx.builders.base import Builder
 
 TEST_DATA_PATH = Path(__file__).parent / "data"
@@ -41,3 +43,49 @@ def check_result(
         print(f"\n{result}\n")
         print("=" * 80)
         assert similarity(result, expected) >= similarity_factor
+
+
+def make_int_args(*names: str) -> list[astx.Argument]:
+    """Create the `Int32` arguments with the given names."""
+    return [astx.Argument(name=name, type_=astx.Int32()) for name in names]
+
+
+def make_return_block(expr: astx.DataType) -> astx.Block:
+    """Create a block that returns the expression."""
+    block = astx.Block()
+    block.append(astx.FunctionReturn(expr))
+    return block
+
+
+def make_function(
+    name: str,
+    body: astx.Block,
+    args: Sequence[astx.Argument] = (),
+    return_type: Optional[AnyType] = None,
+) -> astx.Function:
+    """Create a function with the body, that returns `Int32` by default."""
+    proto = astx.FunctionPrototype(
+        name=name,
+        args=astx.Arguments(*args),
+        return_type=return_type or astx.Int32(),
+    )
+    return astx.Function(prototype=proto, body=body)
+
+
+def make_constant_function(name: str, value: int) -> astx.Function:
+    """Create a function `name()` that returns `value`."""
+    return make_function(name, make_return_block(astx.LiteralInt32(value)))
+
+
+def make_main_module(body: astx.Block, name: str = "main") -> astx.Module:
+    """Create a module with a main function with the given body."""
+    module = astx.Module()
+    module.block.append(make_function(name, body))
+    return module
+
+
+def make_constant_module(value: int, name: str = "main") -> astx.Module:
+    """Create a module with a main function that returns the value."""
+    module = astx.Module()
+    module.block.append(make_constant_function(name, value))
+    return module
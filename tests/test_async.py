@@ -0,0 +1,213 @@
+"""Tests for the asyncio build and run API."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from types import TracebackType
+from typing import Optional
+
+import astx
+import pytest
+
+from irx.builders.cache import BuildCache
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.process import ProcessResult, run_process
+
+from .conftest import make_function, make_int_args, make_main_module
+
+# the builtin function, only used as callee (it is not in the modules)
+PUTCHARD = make_function("putchard", astx.Block(), make_int_args("x"))
+
+
+def make_module(value: int, name: str = "main") -> astx.Module:
+    """Create a module where main prints `!` and returns the value."""
+    block = astx.Block()
+    block.append(astx.FunctionCall(PUTCHARD, [astx.LiteralInt32(33)]))
+    block.append(astx.FunctionReturn(astx.LiteralInt32(value)))
+    return make_main_module(block, name)
+
+
+def test_build_and_run_async() -> None:
+    """Test building and running a program with its output captured."""
+
+    async def build_and_run(tmp_dir: str) -> ProcessResult:
+        builder = LLVMLiteIR()
+        stats = await builder.build_async(
+            make_module(7), os.path.join(tmp_dir, "main")
+        )
+        assert {"visit", "write_objects", "link"} <= set(stats.phases)
+        assert builder.link_result is not None
+        assert builder.link_result.ok
+        return await builder.run_async()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = asyncio.run(build_and_run(tmp_dir))
+
+    assert result.returncode == 7  # noqa: PLR2004
+    assert result.stdout == b"!"
+    assert not result.ok
+    with pytest.raises(Exception, match="failed with exit code 7"):
+        result.check()
+
+
+def test_build_async_concurrency() -> None:
+    """Test that the linker processes are bounded by the semaphore."""
+    running = 0
+    max_running = 0
+
+    class CountingSemaphore(asyncio.Semaphore):
+        async def __aenter__(self) -> None:
+            nonlocal running, max_running
+            await super().__aenter__()
+            running += 1
+            max_running = max(max_running, running)
+
+        async def __aexit__(
+            self,
+            exc_type: Optional[type[BaseException]],
+            exc: Optional[BaseException],
+            traceback: Optional[TracebackType],
+        ) -> None:
+            nonlocal running
+            running -= 1
+            await super().__aexit__(exc_type, exc, traceback)
+
+    async def build_all(tmp_dir: str) -> list[ProcessResult]:
+        semaphore = CountingSemaphore(2)
+        builders = [LLVMLiteIR() for _ in range(4)]
+        files = [os.path.join(tmp_dir, f"main_{idx}") for idx in range(4)]
+        await asyncio.gather(
+            *[
+                builder.build_async(
+                    make_module(idx), output_file, semaphore=semaphore
+                )
+                for idx, (builder, output_file) in enumerate(
+                    zip(builders, files)
+                )
+            ]
+        )
+        return await asyncio.gather(
+            *[builder.run_async() for builder in builders]
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = asyncio.run(build_all(tmp_dir))
+
+    assert [result.returncode for result in results] == [0, 1, 2, 3]
+    assert max_running == 2  # noqa: PLR2004
+
+
+def test_build_async_link_error() -> None:
+    """Test that the linker errors are raised with their output."""
+    builder = LLVMLiteIR()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "main")
+        with pytest.raises(Exception, match="clang failed with exit code"):
+            # an executable without a main function
+            asyncio.run(
+                builder.build_async(make_module(0, "start"), output_file)
+            )
+    assert builder.link_result is not None
+    assert b"main" in builder.link_result.stderr
+
+
+def test_build_link_error() -> None:
+    """Test that the synchronous build raises the linker errors."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "main")
+        # an executable without a main function
+        with pytest.raises(Exception, match="clang failed") as error:
+            LLVMLiteIR().build(make_module(0, "start"), output_file)
+    assert "main" in str(error.value)
+
+
+def test_build_async_cache() -> None:
+    """Test that a cached executable is not linked again."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        builder = LLVMLiteIR(cache=BuildCache(os.path.join(tmp_dir, "cache")))
+        output_file = os.path.join(tmp_dir, "main")
+        asyncio.run(builder.build_async(make_module(5), output_file))
+        assert builder.link_result is not None
+
+        os.remove(output_file)
+        asyncio.run(builder.build_async(make_module(5), output_file))
+        assert builder.link_result is None
+        result = asyncio.run(builder.run_async())
+        assert result.returncode == 5  # noqa: PLR2004
+
+
+def test_build_async_cache_concurrent() -> None:
+    """Test that concurrent builds cache their own output file."""
+
+    async def build_all(builder: LLVMLiteIR, output_files: list[str]) -> None:
+        await asyncio.gather(
+            *[
+                builder.build_async(make_module(idx), output_file)
+                for idx, output_file in enumerate(output_files)
+            ]
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = BuildCache(os.path.join(tmp_dir, "cache"))
+        output_files = [
+            os.path.join(tmp_dir, f"main{idx}") for idx in range(4)
+        ]
+        asyncio.run(build_all(LLVMLiteIR(cache=cache), output_files))
+
+        for output_file in output_files:
+            os.remove(output_file)
+        builder = LLVMLiteIR(cache=cache)
+        asyncio.run(build_all(builder, output_files))
+        assert builder.link_result is None
+        for idx, output_file in enumerate(output_files):
+            result = asyncio.run(run_process([output_file], timeout=10))
+            assert result.returncode == idx
+
+
+def test_run_process_timeout() -> None:
+    """Test that a process is killed when it times out."""
+    start = time.perf_counter()
+    result = asyncio.run(
+        run_process(["sh", "-c", "echo started; sleep 10"], timeout=0.5)
+    )
+    assert time.perf_counter() - start < 5  # noqa: PLR2004
+    assert result.timed_out
+    assert result.returncode < 0
+    assert result.stdout == b"started\n"
+    with pytest.raises(Exception, match="sh timed out"):
+        result.check()
+
+    result = asyncio.run(run_process(["cat"], input_data=b"data"))
+    assert (result.ok, result.stdout) == (True, b"data")
+
+
+def test_run_process_cancel() -> None:
+    """Test that a cancelled task kills its process and its children."""
+
+    async def cancel(pid_file: str) -> None:
+        task = asyncio.ensure_future(
+            run_process(["sh", "-c", f"sleep 10 & echo $! > {pid_file}; wait"])
+        )
+        while not os.path.getsize(pid_file):
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pid_file = os.path.join(tmp_dir, "pid")
+        open(pid_file, "w").close()
+        asyncio.run(asyncio.wait_for(cancel(pid_file), 5))
+        with open(pid_file) as f:
+            child = int(f.read())
+
+    # the child is killed with its group (it may only be a zombie)
+    time.sleep(0.1)
+    try:
+        with open(f"/proc/{child}/stat") as f:
+            state = f.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        state = "X"
+    assert state in {"X", "Z"}
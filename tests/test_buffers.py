@@ -0,0 +1,299 @@
+"""Tests for the buffers, the SIMD vectors and the NumPy interop."""
+
+import array
+import os
+import tempfile
+
+import astx
+import pytest
+
+from irx.builders.analysis import get_written_buffers
+from irx.builders.buffers import (
+    BufferLength,
+    BufferLoad,
+    BufferStore,
+    BufferType,
+    VectorLoad,
+    VectorReduce,
+    VectorStore,
+    VectorType,
+)
+from irx.builders.llvmliteir import LLVMLiteIR
+from llvmlite import ir
+
+
+def make_range(
+    name: str, end: astx.Expr, step: int = 1
+) -> astx.ForRangeLoopStmt:
+    """Create a `for name in range(0, end, step)` loop with an empty body."""
+    return astx.ForRangeLoopStmt(
+        variable=astx.InlineVariableDeclaration(
+            name, type_=astx.Int64(), value=astx.LiteralInt64(0)
+        ),
+        start=astx.LiteralInt64(0),
+        end=end,
+        step=astx.LiteralInt64(step),
+        body=astx.Block(),
+    )
+
+
+def make_axpy(type_: astx.DataType) -> astx.Function:
+    """Create `axpy(a, x, y)`, that computes `y = a * x + y` in place."""
+    x = astx.Variable("x", type_=BufferType(type_))
+    y = astx.Variable("y", type_=BufferType(type_))
+    proto = astx.FunctionPrototype(
+        name="axpy",
+        args=astx.Arguments(
+            astx.Argument("a", type_),
+            astx.Argument("x", BufferType(type_)),
+            astx.Argument("y", BufferType(type_)),
+        ),
+        return_type=astx.Int32(),
+    )
+    loop = make_range("i", BufferLength(x))
+    loop.body.append(
+        BufferStore(
+            y,
+            astx.Variable("i"),
+            astx.BinaryOp(
+                "+",
+                astx.BinaryOp(
+                    "*", astx.Variable("a"), BufferLoad(x, astx.Variable("i"))
+                ),
+                BufferLoad(y, astx.Variable("i")),
+            ),
+        )
+    )
+    block = astx.Block()
+    block.append(loop)
+    block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    return astx.Function(prototype=proto, body=block)
+
+
+def make_vector_sum(width: int) -> astx.Function:
+    """Create `vector_sum(x)`, that sums `x` with vectors of `width` lanes."""
+    x = astx.Variable("x", type_=BufferType(astx.Float64()))
+    proto = astx.FunctionPrototype(
+        name="vector_sum",
+        args=astx.Arguments(astx.Argument("x", BufferType(astx.Float64()))),
+        return_type=astx.Float64(),
+    )
+    loop = make_range("i", BufferLength(x), width)
+    loop.body.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable("acc"),
+            astx.BinaryOp(
+                "+",
+                astx.Variable("acc"),
+                VectorLoad(x, astx.Variable("i"), width),
+            ),
+        )
+    )
+    block = astx.Block()
+    block.append(
+        astx.VariableDeclaration(
+            name="acc",
+            type_=VectorType(astx.Float64(), width),
+            value=astx.LiteralFloat64(0),
+        )
+    )
+    block.append(loop)
+    block.append(astx.FunctionReturn(VectorReduce("+", astx.Variable("acc"))))
+    return astx.Function(prototype=proto, body=block)
+
+
+def make_module(*functions: astx.Function) -> astx.Module:
+    """Create a module with the given functions."""
+    module = astx.Module()
+    for function in functions:
+        module.block.append(function)
+    return module
+
+
+def test_buffer_arguments_ir() -> None:
+    """Test that a buffer is lowered to the data pointer and the length."""
+    ir_result = LLVMLiteIR().translate(make_module(make_axpy(astx.Float64())))
+    assert (
+        'define i32 @"axpy"(double %"a", double* nocapture %"x.data", '
+        'i64 %"x.len", double* nocapture %"y.data", i64 %"y.len")'
+    ) in ir_result
+    # `axpy` only reads `x`
+    module = make_module(make_axpy(astx.Float64()))
+    assert get_written_buffers(module) == {"axpy": [False, True]}
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_buffer_array_module(opt_level: int) -> None:
+    """Test passing `array.array` objects, changed in place."""
+    jit_module = LLVMLiteIR(opt_level=opt_level).jit(
+        make_module(make_axpy(astx.Float64()))
+    )
+    x = array.array("d", [1.0, 2.0, 3.0])
+    y = array.array("d", [10.0, 20.0, 30.0])
+    assert jit_module["axpy"](2.0, x, y) == 0
+    assert list(y) == [12.0, 24.0, 36.0]
+
+    with pytest.raises(Exception, match="buffer format not valid"):
+        jit_module["axpy"](2.0, array.array("i", [1]), y)
+    # `x` is only read, so a read-only buffer is copied, but `y` is written
+    x_bytes = memoryview(array.array("d", [1.0, 2.0, 3.0]).tobytes())
+    assert jit_module["axpy"](1.0, x_bytes.cast("d"), y) == 0
+    assert list(y) == [13.0, 26.0, 39.0]
+    with pytest.raises(Exception, match="buffer must be writable"):
+        jit_module["axpy"](2.0, x, x_bytes.cast("d"))
+    with pytest.raises(Exception, match="3 arguments expected"):
+        jit_module["axpy"](2.0, x)
+
+
+@pytest.mark.parametrize(
+    "type_,dtype",
+    [
+        (astx.Float64(), "float64"),
+        (astx.Float32(), "float32"),
+        (astx.Int32(), "int32"),
+        (astx.Int64(), "int64"),
+    ],
+)
+def test_buffer_numpy(type_: astx.DataType, dtype: str) -> None:
+    """Test passing NumPy arrays, without copying them."""
+    np = pytest.importorskip("numpy")
+
+    jit_module = LLVMLiteIR(opt_level=2).jit(make_module(make_axpy(type_)))
+    x = np.arange(1000, dtype=dtype)
+    y = np.ones(1000, dtype=dtype)
+    jit_module["axpy"](3, x, y)
+    np.testing.assert_array_equal(y, 3 * np.arange(1000) + 1)
+
+    # read-only arrays are passed by the address of their data, but only
+    # the buffers that aren't written can be read-only
+    x.flags.writeable = False
+    jit_module["axpy"](1, x, y)
+    np.testing.assert_array_equal(y, 4 * np.arange(1000) + 1)
+    y.flags.writeable = False
+    with pytest.raises(Exception, match="buffer must be writable"):
+        jit_module["axpy"](1, np.ones_like(x), y)
+    np.testing.assert_array_equal(y, 4 * np.arange(1000) + 1)
+
+    with pytest.raises(Exception, match="buffer type not valid"):
+        jit_module["axpy"](1, x.astype("int16"), y)
+    with pytest.raises(Exception, match="C-contiguous"):
+        jit_module["axpy"](1, x[::2], y[::2])
+
+
+def test_buffer_numpy_2d() -> None:
+    """Test that a 2D array is passed as a flat buffer."""
+    np = pytest.importorskip("numpy")
+
+    jit_module = LLVMLiteIR().jit(make_module(make_vector_sum(4)))
+    x = np.arange(64, dtype="float64").reshape(8, 8)
+    assert jit_module["vector_sum"](x) == x.sum()
+
+
+@pytest.mark.parametrize("width", [2, 4, 8])
+def test_vector_sum(width: int) -> None:
+    """Test loading, adding and reducing vectors."""
+    jit_module = LLVMLiteIR(opt_level=2).jit(
+        make_module(make_vector_sum(width))
+    )
+    x = array.array("d", range(64))
+    assert jit_module["vector_sum"](x) == sum(range(64))
+
+
+def test_vector_store() -> None:
+    """Test storing vectors with a scalar broadcast to the lanes."""
+    x = astx.Variable("x", type_=BufferType(astx.Int32()))
+    proto = astx.FunctionPrototype(
+        name="scale",
+        args=astx.Arguments(astx.Argument("x", BufferType(astx.Int32()))),
+        return_type=astx.Int32(),
+    )
+    loop = make_range("i", BufferLength(x), 4)
+    loop.body.append(
+        VectorStore(
+            x,
+            astx.Variable("i"),
+            astx.BinaryOp(
+                "*",
+                VectorLoad(x, astx.Variable("i"), 4),
+                astx.LiteralInt32(3),
+            ),
+        )
+    )
+    block = astx.Block()
+    block.append(loop)
+    block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    module = make_module(astx.Function(prototype=proto, body=block))
+
+    ir_result = LLVMLiteIR().translate(module)
+    assert "mul <4 x i32>" in ir_result
+    assert "shufflevector <4 x i32>" in ir_result
+
+    x_values = array.array("i", range(8))
+    LLVMLiteIR().jit(module)["scale"](x_values)
+    assert list(x_values) == [3 * value for value in range(8)]
+
+
+def test_convert_booleans() -> None:
+    """Test that the `i1` values and masks are converted as unsigned."""
+    translator = LLVMLiteIR().translator
+    fn_type = ir.FunctionType(
+        ir.VoidType(), [ir.IntType(1), ir.VectorType(ir.IntType(1), 4)]
+    )
+    function = ir.Function(translator._llvm.module, fn_type, "f")
+    translator._llvm.ir_builder.position_at_end(
+        function.append_basic_block("entry")
+    )
+    flag, mask = function.args
+
+    assert translator.convert(flag, ir.IntType(32)).opname == "zext"
+    assert translator.convert(flag, ir.DoubleType()).opname == "uitofp"
+    mask_type = ir.VectorType(ir.IntType(32), 4)
+    assert translator.convert(mask, mask_type).opname == "zext"
+
+    value = ir.Constant(ir.IntType(8), -1)
+    assert translator.convert(value, ir.IntType(32)).opname == "sext"
+    assert translator.convert(value, ir.DoubleType()).opname == "sitofp"
+
+
+def test_buffer_shared_library() -> None:
+    """Test calling a shared library function with buffers."""
+    np = pytest.importorskip("numpy")
+
+    builder = LLVMLiteIR(opt_level=2)
+    module = make_module(make_axpy(astx.Float64()), make_vector_sum(4))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_file = os.path.join(tmpdir, "libkernels.so")
+        builder.build(module, output_file, shared=True)
+        library = builder.load_shared_library(module)
+
+        x = np.arange(16, dtype="float64")
+        y = np.zeros(16)
+        library["axpy"](2.0, x, y)
+        np.testing.assert_array_equal(y, 2 * x)
+        assert library["vector_sum"](y) == 2 * x.sum()
+
+
+def test_buffer_errors() -> None:
+    """Test the types and values not supported by the buffer nodes."""
+    with pytest.raises(Exception, match="element type not supported"):
+        BufferType(astx.Boolean())
+    with pytest.raises(Exception, match="width must be positive"):
+        VectorType(astx.Float64(), 0)
+    with pytest.raises(Exception, match="reduce operation not valid"):
+        VectorReduce("-", astx.Variable("acc"))
+
+    proto = astx.FunctionPrototype(
+        name="first",
+        args=astx.Arguments(astx.Argument("x", astx.Float64())),
+        return_type=astx.Float64(),
+    )
+    block = astx.Block()
+    block.append(
+        astx.FunctionReturn(
+            BufferLoad(astx.Variable("x"), astx.LiteralInt32(0))
+        )
+    )
+    module = make_module(astx.Function(prototype=proto, body=block))
+    with pytest.raises(Exception, match="buffer expected"):
+        LLVMLiteIR().translate(module)
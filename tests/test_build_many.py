@@ -0,0 +1,57 @@
+"""Tests for the parallel batch build."""
+
+import os
+import subprocess
+import tempfile
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import (
+    make_constant_module,
+    make_main_module,
+    make_return_block,
+)
+
+
+def make_invalid_module() -> astx.Module:
+    """Create a module that uses an unknown variable."""
+    return make_main_module(make_return_block(astx.Variable("unknown")))
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_build_many(executor: str) -> None:
+    """Test building many modules, with results in order."""
+    modules = [
+        make_constant_module(1),
+        make_invalid_module(),
+        make_constant_module(3),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_files = [
+            os.path.join(tmp_dir, f"module_{idx}")
+            for idx in range(len(modules))
+        ]
+        results = LLVMLiteIR().build_many(
+            modules, output_files, workers=2, executor=executor
+        )
+
+        assert [result.output_file for result in results] == output_files
+        assert [result.ok for result in results] == [True, False, True]
+        assert results[1].error
+
+        for result, expected in ((results[0], 1), (results[2], 3)):
+            process = subprocess.run([result.output_file], check=False)
+            assert process.returncode == expected
+
+
+def test_build_many_invalid_arguments() -> None:
+    """Test the validation of the build_many arguments."""
+    builder = LLVMLiteIR()
+    with pytest.raises(Exception, match="same length"):
+        builder.build_many([make_constant_module(1)], [])
+    with pytest.raises(Exception, match="executor not valid"):
+        builder.build_many([make_constant_module(1)], ["main"], executor="gpu")
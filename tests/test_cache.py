@@ -0,0 +1,119 @@
+"""Tests for the build cache."""
+
+import os
+import subprocess
+
+from pathlib import Path
+
+from irx.builders.cache import BuildCache, ast_fingerprint
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.stats import BuildStats
+
+from .conftest import make_constant_module
+
+
+def test_ast_fingerprint() -> None:
+    """Test that the fingerprint only depends on the tree structure."""
+    first, same, other = (
+        ast_fingerprint(make_constant_module(value)) for value in (3, 3, 4)
+    )
+    assert first == same
+    assert first != other
+
+
+def test_build_cache_hit(tmp_path: Path) -> None:
+    """Test that the second build of the same module uses the cache."""
+    cache = BuildCache(tmp_path / "cache")
+
+    output_file = str(tmp_path / "first.exe")
+    LLVMLiteIR(cache=cache).build(make_constant_module(3), output_file)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    builder = LLVMLiteIR(cache=cache)
+    cached_output_file = str(tmp_path / "second.exe")
+    builder.build(make_constant_module(3), cached_output_file)
+    assert (cache.hits, cache.misses) == (1, 1)
+    # the cache hit doesn't need to compile the module
+    assert builder.optimization_report is None
+
+    result = subprocess.run([cached_output_file], check=False)
+    assert result.returncode == 3  # noqa: PLR2004
+
+    # a different optimization level is a different entry
+    LLVMLiteIR(cache=cache).build(
+        make_constant_module(3), output_file, opt_level=2
+    )
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_build_cache_fingerprint(tmp_path: Path) -> None:
+    """Test that a build hashes the ASTx once for the key and the memo."""
+    builder = LLVMLiteIR(cache=BuildCache(tmp_path / "cache"))
+    ended: list[str] = []
+    builder.stats = BuildStats(
+        on_phase=lambda name, elapsed: ended.append(name)
+    )
+    module = make_constant_module(3)
+    builder.build(module, str(tmp_path / "a.exe"))
+    assert ended.count("fingerprint") == 1
+    assert ended.index("fingerprint") < ended.index("cache")
+
+    # each call hashes the ASTx again, as it can be changed in place
+    ended.clear()
+    builder.translate(module)
+    assert ended == ["fingerprint", "stringify"]
+
+
+def test_build_cache_object_file(tmp_path: Path) -> None:
+    """Test restoring the object file from the cache."""
+    cache = BuildCache(tmp_path / "cache", hardlink=True)
+    LLVMLiteIR(cache=cache).build(
+        make_constant_module(5), str(tmp_path / "a.exe")
+    )
+
+    key = LLVMLiteIR().get_cache_key(make_constant_module(5), 0, 0)
+    object_file = tmp_path / "a.o"
+    assert cache.get(key, tmp_path / "b.exe", object_file)
+    assert object_file.read_bytes() == cache.object_path(key).read_bytes()
+    assert os.access(tmp_path / "b.exe", os.X_OK)
+
+
+def test_build_cache_eviction(tmp_path: Path) -> None:
+    """Test that the least recently used entries are evicted."""
+    cache = BuildCache(tmp_path / "cache")
+
+    for value in range(3):
+        LLVMLiteIR(cache=cache).build(
+            make_constant_module(value), str(tmp_path / f"{value}.exe")
+        )
+
+    entry_size = cache.size // 3
+    cache.max_size = entry_size * 2
+    cache.evict()
+
+    assert cache.evictions == 1
+    assert cache.size <= cache.max_size
+
+    key = LLVMLiteIR().get_cache_key(make_constant_module(0), 0, 0)
+    assert not cache.executable_path(key).exists()
+
+
+def test_build_cache_eviction_object_file(tmp_path: Path) -> None:
+    """Test that the object file is evicted with its executable."""
+    cache = BuildCache(tmp_path / "cache")
+    output_file = tmp_path / "a.exe"
+    output_file.write_bytes(b"executable")
+    cache.put("old", output_file, b"object")
+    cache.put("new", output_file, b"object")
+    # `old` is the least recently used entry
+    os.utime(cache.object_path("old"), (0, 0))
+    os.utime(cache.executable_path("old"), (1, 1))
+
+    cache.max_size = cache.size - 1
+    cache.evict()
+
+    assert cache.evictions == 1
+    assert not cache.executable_path("old").exists()
+    assert not cache.object_path("old").exists()
+    assert cache.executable_path("new").exists()
+    assert cache.object_path("new").exists()
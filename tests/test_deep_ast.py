@@ -0,0 +1,51 @@
+"""Tests for the translation of deep ASTx."""
+
+import sys
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import make_main_module
+
+
+def test_deep_expression() -> None:
+    """Test an expression much deeper than the recursion limit."""
+    depth = sys.getrecursionlimit() * 5
+
+    expr: astx.DataType = astx.LiteralInt32(0)
+    for _ in range(depth):
+        expr = astx.BinaryOp("+", expr, astx.LiteralInt32(1))
+    block = astx.Block()
+    block.append(astx.FunctionReturn(expr))
+
+    jit_module = LLVMLiteIR(opt_level=1).jit(make_main_module(block))
+    assert jit_module["main"]() == depth
+
+
+def test_deep_blocks() -> None:
+    """Test blocks nested much deeper than the recursion limit."""
+    depth = sys.getrecursionlimit() * 5
+
+    block = astx.Block()
+    block.append(astx.LiteralInt32(1))
+    for _ in range(depth):
+        outer = astx.Block()
+        outer.append(block)
+        block = outer
+    block.append(astx.FunctionReturn(astx.LiteralInt32(3)))
+
+    builder = LLVMLiteIR()
+    assert "ret i32 3" in builder.translate(make_main_module(block))
+
+
+def test_statement_results_not_kept() -> None:
+    """Test that the results of the statements are not kept."""
+    block = astx.Block()
+    for value in range(10):
+        block.append(astx.LiteralInt32(value))
+    block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+
+    builder = LLVMLiteIR()
+    builder.translate(make_main_module(block))
+    assert builder.translator.result_stack == []
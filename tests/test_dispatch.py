@@ -0,0 +1,59 @@
+"""Tests for the fast-path dispatch of the visitor."""
+
+from typing import cast
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR, LLVMLiteIRVisitor
+from llvmlite import ir
+from plum import Function, NotFoundLookupError, dispatch
+
+from .conftest import make_main_module, make_return_block
+
+
+class DoubleLiteralVisitor(LLVMLiteIRVisitor):
+    """Visitor that doubles the integer literals."""
+
+    @dispatch
+    def visit(self, expr: astx.LiteralInt32) -> None:
+        """Translate an ASTx LiteralInt32 expression, doubled."""
+        self.result_stack.append(ir.Constant(ir.IntType(32), expr.value * 2))
+
+
+def make_module(value: astx.DataType) -> astx.Module:
+    """Create a module with a main function that returns the value."""
+    return make_main_module(make_return_block(value))
+
+
+def test_dispatch_table() -> None:
+    """Test that the resolved methods are cached per visitor class."""
+    translator = LLVMLiteIR().translator
+    translator.visit(make_module(astx.LiteralInt32(1)))
+
+    assert astx.LiteralInt32 in LLVMLiteIRVisitor._visit_table
+    assert astx.Module in LLVMLiteIRVisitor._visit_table
+    assert DoubleLiteralVisitor._visit_table is not (
+        LLVMLiteIRVisitor._visit_table
+    )
+
+
+def test_dispatch_subclass_override() -> None:
+    """Test that subclasses can override and inherit visit methods."""
+    builder = LLVMLiteIR(fold_constants=False)
+    builder.translator = DoubleLiteralVisitor()
+
+    ir_result = builder.translate(
+        make_module(astx.LiteralInt32(2) + astx.LiteralInt32(3))
+    )
+    assert "add i32 4, 6" in ir_result
+
+    # the plum function is still available from the class
+    assert cast(Function, LLVMLiteIRVisitor.visit).methods
+
+
+def test_dispatch_not_found() -> None:
+    """Test that an unsupported node still raises a lookup error."""
+    translator = LLVMLiteIR().translator
+    with pytest.raises(NotFoundLookupError):
+        translator.visit(astx.LiteralInt128(1))
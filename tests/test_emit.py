@@ -0,0 +1,131 @@
+"""Tests for the emission of bitcode, assembly and objects to outputs."""
+
+import io
+import os
+import pathlib
+import subprocess
+import tempfile
+
+import astx
+import pytest
+
+from irx.builders import output
+from irx.builders.llvmliteir import LLVMLiteIR, link_objects
+from llvmlite import binding as llvm
+
+from .conftest import make_function, make_int_args, make_return_block
+
+
+def make_module() -> astx.Module:
+    """Create a module with `add(x, y)` and a `main` that returns 42."""
+    add = make_function(
+        "add",
+        make_return_block(astx.Variable("x") + astx.Variable("y")),
+        make_int_args("x", "y"),
+    )
+    call = astx.FunctionCall(
+        add, [astx.LiteralInt32(40), astx.LiteralInt32(2)]
+    )
+    module = astx.Module()
+    module.block.append(add)
+    module.block.append(make_function("main", make_return_block(call)))
+    return module
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_emit_bitcode(opt_level: int) -> None:
+    """Test that the bitcode can be parsed back by LLVM."""
+    builder = LLVMLiteIR(opt_level=opt_level)
+    data = builder.emit(make_module(), output_format="bitcode")
+
+    module_ref = llvm.parse_bitcode(data)
+    names = {fn.name for fn in module_ref.functions}
+    assert {"add", "main"} <= names
+    assert "emit_bitcode" in builder.stats.phases
+
+
+def test_emit_assembly() -> None:
+    """Test the native assembly text of the module."""
+    data = LLVMLiteIR().emit(make_module(), output_format="assembly")
+    assembly = data.decode()
+    assert "add:" in assembly
+    assert "main:" in assembly
+
+
+def test_emit_object_outputs() -> None:
+    """Test writing an object to each kind of output."""
+    builder = LLVMLiteIR()
+    module = make_module()
+    data = builder.emit(module)
+    assert data[:4] == b"\x7fELF"
+
+    buffer = bytearray(b"prefix")
+    assert builder.emit(module, buffer) == data
+    assert buffer == b"prefix" + data
+
+    file_object = io.BytesIO()
+    builder.emit(module, file_object)
+    assert file_object.getvalue() == data
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = pathlib.Path(tmp_dir) / "module.o"
+        builder.emit(module, path)
+        assert path.read_bytes() == data
+        builder.emit(module, str(path), output_format="bitcode")
+        assert path.read_bytes()[:2] == b"BC"
+
+        # the object is linked as it is to an executable
+        output_file = os.path.join(tmp_dir, "main")
+        link_objects([data], output_file)
+        process = subprocess.run([output_file], check=False)
+        assert process.returncode == 42  # noqa: PLR2004
+
+    with pytest.raises(Exception, match="output not valid"):
+        builder.emit(module, 42)  # type: ignore[arg-type]
+    with pytest.raises(Exception, match="output format not valid"):
+        builder.emit(module, output_format="executable")
+
+
+@pytest.mark.parametrize("partitions", [1, 2])
+def test_emit_shared_object(partitions: int) -> None:
+    """Test linking a shared object in memory and loading it."""
+    builder = LLVMLiteIR(opt_level=2, partitions=partitions)
+    module = make_module()
+
+    file_object = io.BytesIO()
+    data = builder.emit(module, file_object, output_format="shared")
+    assert file_object.getvalue() == data
+    assert data[:4] == b"\x7fELF"
+    assert "link" in builder.stats.phases
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "libadd.so")
+        with open(path, "wb") as f:
+            f.write(data)
+        library = builder.load_shared_library(module, path)
+        assert library["add"](40, 2) == 42  # noqa: PLR2004
+
+
+@pytest.mark.skipif(
+    not output.has_memory_files(), reason="in-memory files not supported"
+)
+def test_linker_files_in_memory() -> None:
+    """Test that the linker files are in-memory files, not on the disk."""
+    with output.linker_files([b"object"], n_outputs=1) as files:
+        inputs, outputs, fds = files
+        assert inputs + outputs == [output.FD_PATH.format(fd) for fd in fds]
+        with open(inputs[0], "rb") as f:
+            assert f.read() == b"object"
+        with open(outputs[0], "wb") as f:
+            f.write(b"linked")
+        with open(outputs[0], "rb") as f:
+            assert f.read() == b"linked"
+
+    # the files are released on exit
+    for fd in fds:
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+    buffer = bytearray()
+    LLVMLiteIR().emit(make_module(), buffer, output_format="shared")
+    assert buffer[:4] == b"\x7fELF"
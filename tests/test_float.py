@@ -0,0 +1,154 @@
+"""Tests for the type-directed floating-point code generation."""
+
+import astx
+import pytest
+
+from astx.types.base import AnyType
+from irx.builders.llvmliteir import LLVMLiteIR
+
+
+def make_function(
+    name: str,
+    arg_types: list[AnyType],
+    return_type: AnyType,
+    body: astx.Block,
+) -> astx.Function:
+    """Create a function with the arguments `a`, `b`, ... and the body."""
+    args = [
+        astx.Argument(name=chr(ord("a") + idx), type_=type_)
+        for idx, type_ in enumerate(arg_types)
+    ]
+    proto = astx.FunctionPrototype(
+        name=name, args=astx.Arguments(*args), return_type=return_type
+    )
+    return astx.Function(prototype=proto, body=body)
+
+
+def make_mul_add(type_: AnyType) -> astx.Function:
+    """Create a function `mul_add(a, b, c) = a * b + c`."""
+    body = astx.Block()
+    body.append(
+        astx.FunctionReturn(
+            astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", astx.Variable("a"), astx.Variable("b")),
+                astx.Variable("c"),
+            )
+        )
+    )
+    return make_function("mul_add", [type_] * 3, type_, body)
+
+
+@pytest.mark.parametrize("type_", [astx.Float32, astx.Float64])
+def test_float_function(type_: type) -> None:
+    """Test a function with floating-point arguments and result."""
+    builder = LLVMLiteIR()
+    module = builder.module()
+    module.block.append(make_mul_add(type_()))
+
+    ir_result = builder.translate(module)
+    assert "fmul" in ir_result
+    assert "fadd" in ir_result
+
+    jit_module = builder.jit(module)
+    assert jit_module["mul_add"](1.5, 2.0, 0.25) == 3.25  # noqa: PLR2004
+
+
+def test_mixed_types() -> None:
+    """Test the promotion and conversion of the operands."""
+    body = astx.Block()
+    body.append(
+        astx.VariableDeclaration(
+            name="x", type_=astx.Float32(), value=astx.LiteralInt32(3)
+        )
+    )
+    body.append(
+        astx.VariableDeclaration(
+            name="y", type_=astx.Int64(), value=astx.LiteralFloat64(2.9)
+        )
+    )
+    # float32 * int32 + int64 -> float32, returned as float64
+    body.append(
+        astx.FunctionReturn(
+            astx.BinaryOp(
+                "+",
+                astx.BinaryOp("*", astx.Variable("x"), astx.Variable("a")),
+                astx.Variable("y"),
+            )
+        )
+    )
+    module = astx.Module()
+    module.block.append(
+        make_function("mixed", [astx.Int32()], astx.Float64(), body)
+    )
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["mixed"](5) == 17.0  # noqa: PLR2004
+
+
+def test_call_conversion() -> None:
+    """Test the conversion of the arguments to the parameter types."""
+    body = astx.Block()
+    body.append(
+        astx.FunctionReturn(
+            astx.BinaryOp("/", astx.Variable("a"), astx.LiteralFloat64(2.0))
+        )
+    )
+    half = make_function("half", [astx.Float64()], astx.Float64(), body)
+
+    # half(7) and half(a), with `a` an `Int64`
+    body = astx.Block()
+    body.append(
+        astx.FunctionReturn(
+            astx.BinaryOp(
+                "+",
+                astx.FunctionCall(half, [astx.LiteralInt32(7)]),
+                astx.FunctionCall(half, [astx.Variable("a")]),
+            )
+        )
+    )
+    module = astx.Module()
+    module.block.append(half)
+    module.block.append(
+        make_function("call_half", [astx.Int64()], astx.Float64(), body)
+    )
+
+    ir_result = LLVMLiteIR().translate(module)
+    assert "sitofp i64" in ir_result
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["call_half"](3) == 5.0  # noqa: PLR2004
+
+
+def test_comparison() -> None:
+    """Test the comparisons of integers and floating-point values."""
+    module = astx.Module()
+    for name, type_ in (("lt_int", astx.Int32()), ("lt_fp", astx.Float64())):
+        body = astx.Block()
+        body.append(
+            astx.FunctionReturn(
+                astx.BinaryOp("<", astx.Variable("a"), astx.Variable("b"))
+            )
+        )
+        module.block.append(make_function(name, [type_] * 2, type_, body))
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["lt_int"](1, 2) == 1
+    assert jit_module["lt_int"](2, 1) == 0
+    assert jit_module["lt_fp"](-1.5, 0.5) == 1.0
+    assert jit_module["lt_fp"](0.5, 0.5) == 0.0
+
+
+def test_fast_math() -> None:
+    """Test the fast-math flags of the floating-point instructions."""
+    module = astx.Module()
+    module.block.append(make_mul_add(astx.Float64()))
+
+    assert "fadd double" in LLVMLiteIR().translate(module)
+    assert "fadd fast double" in LLVMLiteIR(fast_math=True).translate(module)
+
+    ir_result = LLVMLiteIR(fast_math=("reassoc", "contract")).translate(module)
+    assert "fmul reassoc contract double" in ir_result
+
+    with pytest.raises(Exception, match="fast-math flag not valid"):
+        LLVMLiteIR(fast_math=("fastest",))
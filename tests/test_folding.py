@@ -0,0 +1,230 @@
+"""Tests for the constant folding of the ASTx."""
+
+from typing import Optional
+
+import astx
+import pytest
+
+from astx.types.base import AnyType
+from irx.builders.cache import ast_fingerprint
+from irx.builders.folding import fold_constants
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import make_function, make_main_module, make_return_block
+
+
+def make_module(
+    expr: astx.DataType,
+    return_type: AnyType,
+    arg_type: Optional[AnyType] = None,
+) -> astx.Module:
+    """Create a module with `f(x)` (or `f()`), that returns `expr`."""
+    args = [] if arg_type is None else [astx.Argument("x", arg_type)]
+    module = astx.Module()
+    module.block.append(
+        make_function("f", make_return_block(expr), args, return_type)
+    )
+    return module
+
+
+def get_body(ir_result: str) -> str:
+    """Get the body of the function `f` of the LLVM-IR."""
+    return ir_result.split('@"f"(')[1].split("}", maxsplit=1)[0]
+
+
+def test_fold_literals() -> None:
+    """Test folding nested literal operations to a literal."""
+    expr = astx.BinaryOp(
+        "*",
+        astx.BinaryOp("+", astx.LiteralInt32(2), astx.LiteralInt32(3)),
+        astx.LiteralInt32(4),
+    )
+    module = make_module(expr, astx.Int32())
+    fingerprint = ast_fingerprint(module)
+
+    builder = LLVMLiteIR()
+    body = get_body(builder.translate(module))
+    assert "ret i32 20" in body
+    assert "add" not in body
+    assert "mul" not in body
+    assert builder.folded_nodes == 4  # noqa: PLR2004
+    assert "fold" in builder.stats.phases
+    assert builder.jit(module)["f"]() == 20  # noqa: PLR2004
+
+    # the ASTx given is not changed
+    assert ast_fingerprint(module) == fingerprint
+    unfolded = LLVMLiteIR(fold_constants=False)
+    assert "mul i32" in get_body(unfolded.translate(module))
+    assert unfolded.folded_nodes == 0
+
+
+@pytest.mark.parametrize(
+    "op_code,lhs,rhs,return_type",
+    [
+        ("+", astx.LiteralInt8(100), astx.LiteralInt8(100), astx.Int8()),
+        ("*", astx.LiteralInt16(300), astx.LiteralInt16(300), astx.Int16()),
+        ("-", astx.LiteralInt64(-(2**63)), astx.LiteralInt64(1), astx.Int64()),
+        ("/", astx.LiteralInt32(-7), astx.LiteralInt32(2), astx.Int32()),
+        ("/", astx.LiteralInt32(7), astx.LiteralInt32(-2), astx.Int32()),
+        ("<", astx.LiteralInt32(1), astx.LiteralInt32(2), astx.Int32()),
+        (">", astx.LiteralInt8(1), astx.LiteralInt64(2), astx.Int64()),
+        (
+            "+",
+            astx.LiteralFloat32(0.1),
+            astx.LiteralFloat32(0.2),
+            astx.Float32(),
+        ),
+        (
+            "/",
+            astx.LiteralFloat32(1),
+            astx.LiteralFloat32(3),
+            astx.Float32(),
+        ),
+        (
+            "*",
+            astx.LiteralFloat64(0.1),
+            astx.LiteralInt32(3),
+            astx.Float64(),
+        ),
+        (
+            "-",
+            astx.LiteralFloat32(1e38),
+            astx.LiteralFloat64(-1e38),
+            astx.Float64(),
+        ),
+        (
+            "<",
+            astx.LiteralFloat64(0.5),
+            astx.LiteralFloat32(0.25),
+            astx.Float64(),
+        ),
+    ],
+)
+def test_fold_semantics(
+    op_code: str,
+    lhs: astx.DataType,
+    rhs: astx.DataType,
+    return_type: AnyType,
+) -> None:
+    """Test that a folded operation has the result of the instructions."""
+    module = make_module(astx.BinaryOp(op_code, lhs, rhs), return_type)
+    builder = LLVMLiteIR()
+    folded = builder.jit(module)["f"]()
+    assert builder.folded_nodes == 2  # noqa: PLR2004
+
+    expected = LLVMLiteIR(fold_constants=False).jit(module)["f"]()
+    assert folded == expected
+
+
+@pytest.mark.parametrize(
+    "lhs,rhs",
+    [
+        (astx.LiteralInt32(1), astx.LiteralInt32(0)),
+        (astx.LiteralInt32(-(2**31)), astx.LiteralInt32(-1)),
+        (astx.LiteralFloat64(1), astx.LiteralFloat64(0)),
+        (astx.LiteralInt64(2**60 + 1), astx.LiteralFloat64(1)),
+    ],
+)
+def test_fold_not_folded(lhs: astx.DataType, rhs: astx.DataType) -> None:
+    """Test that undefined and inexact operations are not folded."""
+    module = make_module(astx.BinaryOp("/", lhs, rhs), astx.Float64())
+    builder = LLVMLiteIR()
+    assert "div" in get_body(builder.translate(module))
+    assert builder.folded_nodes == 0
+
+
+@pytest.mark.parametrize(
+    "op_code,lhs,rhs",
+    [
+        ("*", astx.Variable("x"), astx.LiteralInt32(1)),
+        ("*", astx.LiteralInt32(1), astx.Variable("x")),
+        ("+", astx.Variable("x"), astx.LiteralInt32(0)),
+        ("+", astx.LiteralInt16(0), astx.Variable("x")),
+        ("-", astx.Variable("x"), astx.LiteralInt8(0)),
+        ("/", astx.Variable("x"), astx.LiteralInt32(1)),
+    ],
+)
+def test_fold_identities(
+    op_code: str, lhs: astx.DataType, rhs: astx.DataType
+) -> None:
+    """Test that the identities are simplified to the variable."""
+    module = make_module(
+        astx.BinaryOp(op_code, lhs, rhs), astx.Int32(), astx.Int32()
+    )
+    builder = LLVMLiteIR()
+    body = get_body(builder.translate(module))
+    assert not any(op in body for op in ("add", "sub", "mul", "div"))
+    assert builder.folded_nodes == 2  # noqa: PLR2004
+    assert builder.jit(module)["f"](7) == 7  # noqa: PLR2004
+
+
+def test_fold_identities_types() -> None:
+    """Test that the identities are only simplified when they are exact."""
+    x = astx.Variable("x")
+    cases = [
+        # x * 0 is 0 for integers
+        (astx.Int64(), astx.BinaryOp("*", x, astx.LiteralInt32(0)), 2),
+        # x + 0 converts an int8 to int32
+        (astx.Int8(), astx.BinaryOp("+", x, astx.LiteralInt32(0)), 0),
+        # x + 0.0 is 0.0 for x = -0.0, x * 0.0 is NaN for x = inf
+        (astx.Float64(), astx.BinaryOp("+", x, astx.LiteralFloat64(0)), 0),
+        (astx.Float64(), astx.BinaryOp("*", x, astx.LiteralFloat64(0)), 0),
+        # but x + -0.0, x - 0.0 and 1.0 * x are always x
+        (astx.Float64(), astx.BinaryOp("+", x, astx.LiteralFloat64(-0.0)), 2),
+        (astx.Float32(), astx.BinaryOp("-", x, astx.LiteralInt32(0)), 2),
+        (astx.Float64(), astx.BinaryOp("*", astx.LiteralFloat32(1), x), 2),
+    ]
+    for arg_type, expr, removed in cases:
+        builder = LLVMLiteIR()
+        builder.translate(make_module(expr, arg_type, arg_type))
+        assert builder.folded_nodes == removed, expr
+
+    # the type of a variable not declared is not known
+    _, removed = fold_constants(
+        astx.BinaryOp("*", astx.Variable("y"), astx.LiteralInt32(1))
+    )
+    assert removed == 0
+
+
+def test_fold_shared_and_nested_nodes() -> None:
+    """Test folding the operations of nested blocks and shared nodes."""
+    shared = astx.BinaryOp("+", astx.LiteralInt32(1), astx.LiteralInt32(2))
+    loop_body = astx.Block()
+    loop_body.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable("acc"),
+            astx.BinaryOp(
+                "+",
+                astx.Variable("acc"),
+                astx.BinaryOp("*", astx.Variable("i"), shared),
+            ),
+        )
+    )
+    loop = astx.ForRangeLoopStmt(
+        variable=astx.InlineVariableDeclaration(
+            "i", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        ),
+        start=astx.LiteralInt32(0),
+        end=astx.BinaryOp("+", shared, astx.LiteralInt32(1)),
+        step=astx.LiteralInt32(1),
+        body=loop_body,
+    )
+    block = astx.Block()
+    block.append(
+        astx.VariableDeclaration(
+            name="acc", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        )
+    )
+    block.append(loop)
+    block.append(astx.FunctionReturn(astx.Variable("acc")))
+    module = make_main_module(block, "f")
+
+    folded, removed = fold_constants(module)
+    assert folded is not module
+    # `1 + 2` is counted once, and `(1 + 2) + 1` is folded to 4
+    assert removed == 4  # noqa: PLR2004
+    assert loop.end is not None and isinstance(loop.end, astx.BinaryOp)
+    assert fold_constants(folded) == (folded, 0)
+    # 3 * (0 + 1 + 2 + 3)
+    assert LLVMLiteIR().jit(module)["f"]() == 18  # noqa: PLR2004
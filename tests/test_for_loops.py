@@ -5,6 +5,7 @@ from typing import Type
 import astx
 import pytest
 
+from astx.types.base import AnyType
 from irx.builders.base import Builder
 from irx.builders.llvmliteir import LLVMLiteIR
 
@@ -111,5 +112,192 @@ def test_for_count(
     module = builder.module()
     module.block.append(fn_main)
 
-    # note: not yet fully implemented
-    # check_result(action, builder, module, expected_file)
+    check_result(action, builder, module, expected_file)
+
+
+def make_sum(loop: astx.AST, type_: AnyType = astx.Int32()) -> astx.Module:
+    """Create a function `sum_to(n)` that returns `acc` after the loop."""
+    proto = astx.FunctionPrototype(
+        name="sum_to",
+        args=astx.Arguments(astx.Argument(name="n", type_=astx.Int32())),
+        return_type=type_,
+    )
+    block = astx.Block()
+    block.append(
+        astx.VariableDeclaration(
+            name="acc", type_=type_, value=astx.LiteralInt32(0)
+        )
+    )
+    block.append(loop)
+    block.append(astx.FunctionReturn(astx.Variable("acc")))
+    module = astx.Module()
+    module.block.append(astx.Function(prototype=proto, body=block))
+    return module
+
+
+def make_add_to_acc(value: astx.DataType) -> astx.Block:
+    """Create a block with `acc = acc + value`."""
+    block = astx.Block()
+    block.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable("acc"),
+            astx.BinaryOp("+", astx.Variable("acc"), value),
+        )
+    )
+    return block
+
+
+def make_range(
+    name: str, start: int, end: astx.Expr, step: int, body: astx.Block
+) -> astx.ForRangeLoopStmt:
+    """Create a `for name in range(start, end, step)` loop."""
+    return astx.ForRangeLoopStmt(
+        variable=astx.InlineVariableDeclaration(
+            name, type_=astx.Int32(), value=astx.LiteralInt32(start)
+        ),
+        start=astx.LiteralInt32(start),
+        end=end,
+        step=astx.LiteralInt32(step),
+        body=body,
+    )
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_for_range_run(opt_level: int) -> None:
+    """Test running range loops, also with a negative step."""
+    loop = make_range(
+        "i", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("i"))
+    )
+    jit_module = LLVMLiteIR(opt_level=opt_level).jit(make_sum(loop))
+    assert jit_module["sum_to"](100) == 4950  # noqa: PLR2004
+    assert jit_module["sum_to"](0) == 0
+
+    loop = make_range(
+        "i", 10, astx.LiteralInt32(0), -2, make_add_to_acc(astx.Variable("i"))
+    )
+    jit_module = LLVMLiteIR(opt_level=opt_level).jit(make_sum(loop))
+    # 10 + 8 + 6 + 4 + 2
+    assert jit_module["sum_to"](0) == 30  # noqa: PLR2004
+
+
+def test_for_range_nested() -> None:
+    """Test running nested range loops."""
+    inner = make_range(
+        "j",
+        0,
+        astx.Variable("i"),
+        1,
+        make_add_to_acc(
+            astx.BinaryOp("*", astx.Variable("i"), astx.Variable("j"))
+        ),
+    )
+    outer_body = astx.Block()
+    outer_body.append(inner)
+    outer = make_range("i", 0, astx.Variable("n"), 1, outer_body)
+
+    jit_module = LLVMLiteIR().jit(make_sum(outer))
+    expected = sum(i * j for i in range(10) for j in range(i))
+    assert jit_module["sum_to"](10) == expected
+
+
+def test_for_range_canonical() -> None:
+    """Test that the loop is top-tested with a phi induction variable."""
+    loop = make_range(
+        "i", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("i"))
+    )
+    ir_result = LLVMLiteIR().translate(make_sum(loop))
+
+    header = ir_result.split("loop.header:")[1].split("loop.body:")[0]
+    assert 'phi  i32 [0, %"entry"]' in header
+    assert "icmp slt" in header
+    # the end is evaluated once, before the loop
+    assert 'load i32, i32* %"n' not in header
+    assert '%"i" = alloca' not in ir_result
+
+    # the loop is replaced by its closed form
+    optimized = LLVMLiteIR(opt_level=2).translate(make_sum(loop))
+    assert "loop.header" not in optimized
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_for_range_assign_variable(opt_level: int) -> None:
+    """Test assigning the loop variable in the body of the loop."""
+    body = make_add_to_acc(astx.Variable("i"))
+    body.append(
+        astx.BinaryOp(
+            "=",
+            astx.Variable("i"),
+            astx.BinaryOp("+", astx.Variable("i"), astx.LiteralInt32(1)),
+        )
+    )
+    loop = make_range("i", 0, astx.Variable("n"), 1, body)
+    builder = LLVMLiteIR(opt_level=opt_level)
+
+    # the loop variable is stored in memory, instead of a phi node
+    if not opt_level:
+        assert '%"i" = alloca i32' in builder.translate(make_sum(loop))
+    # 0 + 2 + 4 + 6 + 8
+    assert builder.jit(make_sum(loop))["sum_to"](10) == 20  # noqa: PLR2004
+
+
+def test_for_range_fast_math_vectorize() -> None:
+    """Test that a floating-point reduction is vectorized with fast-math."""
+    loop = make_range(
+        "i", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("i"))
+    )
+    module = make_sum(loop, astx.Float64())
+
+    assert "vector.body" not in LLVMLiteIR(opt_level=3).translate(module)
+
+    builder = LLVMLiteIR(opt_level=3, fast_math=True)
+    assert "vector.body" in builder.translate(module)
+    assert builder.jit(module)["sum_to"](100) == 4950.0  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "op_code,end,update,expected",
+    [
+        ("<", 10, astx.UnaryOp("++", astx.Variable("k")), 45),
+        ("<=", 10, astx.UnaryOp("++", astx.Variable("k")), 55),
+        (
+            "<",
+            10,
+            astx.BinaryOp("+=", astx.Variable("k"), astx.LiteralInt32(3)),
+            18,
+        ),
+        (">", -1, astx.UnaryOp("--", astx.Variable("k")), 0),
+    ],
+)
+def test_for_count_run(
+    op_code: str, end: int, update: astx.Expr, expected: int
+) -> None:
+    """Test running count loops with the supported conditions/updates."""
+    loop = astx.ForCountLoopStmt(
+        initializer=astx.InlineVariableDeclaration(
+            "k", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        ),
+        condition=astx.BinaryOp(
+            op_code, astx.Variable("k"), astx.LiteralInt32(end)
+        ),
+        update=update,
+        body=make_add_to_acc(astx.Variable("k")),
+    )
+    jit_module = LLVMLiteIR().jit(make_sum(loop))
+    assert jit_module["sum_to"](0) == expected
+
+
+def test_for_count_not_supported() -> None:
+    """Test that a count loop with an unsupported update raises."""
+    loop = astx.ForCountLoopStmt(
+        initializer=astx.InlineVariableDeclaration(
+            "k", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        ),
+        condition=astx.BinaryOp(
+            "<", astx.Variable("k"), astx.LiteralInt32(10)
+        ),
+        update=astx.BinaryOp("*", astx.Variable("k"), astx.LiteralInt32(2)),
+        body=make_add_to_acc(astx.Variable("k")),
+    )
+    with pytest.raises(Exception, match="update not supported"):
+        LLVMLiteIR().translate(make_sum(loop))
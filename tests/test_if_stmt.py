@@ -0,0 +1,91 @@
+"""Tests for the lowering of the `if` statements."""
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import make_function, make_int_args, make_return_block
+
+
+def make_return(value: int) -> astx.Block:
+    """Create a block that returns `value`."""
+    return make_return_block(astx.LiteralInt32(value))
+
+
+def is_negative(name: str = "a") -> astx.BinaryOp:
+    """Create the condition `name < 0`."""
+    return astx.BinaryOp("<", astx.Variable(name), astx.LiteralInt32(0))
+
+
+def test_if_return_in_then() -> None:
+    """Test an `if` whose `then` block returns, without `else`."""
+    body = astx.Block()
+    body.append(astx.IfStmt(condition=is_negative(), then=make_return(-1)))
+    body.append(astx.FunctionReturn(astx.LiteralInt32(1)))
+    module = astx.Module()
+    module.block.append(make_function("sign", body, make_int_args("a")))
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["sign"](-5) == -1
+    assert jit_module["sign"](5) == 1
+
+
+def test_if_return_in_else() -> None:
+    """Test an `if` whose `else` block returns and `then` assigns."""
+    then = astx.Block()
+    then.append(astx.BinaryOp("=", astx.Variable("r"), astx.LiteralInt32(-1)))
+    body = astx.Block()
+    body.append(
+        astx.VariableDeclaration(
+            name="r", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        )
+    )
+    body.append(
+        astx.IfStmt(condition=is_negative(), then=then, else_=make_return(1))
+    )
+    body.append(astx.FunctionReturn(astx.Variable("r")))
+    module = astx.Module()
+    module.block.append(make_function("sign", body, make_int_args("a")))
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["sign"](-5) == -1
+    assert jit_module["sign"](5) == 1
+
+
+def test_if_return_in_both() -> None:
+    """Test an `if` where both blocks return."""
+    body = astx.Block()
+    body.append(
+        astx.IfStmt(
+            condition=is_negative(), then=make_return(-1), else_=make_return(1)
+        )
+    )
+    module = astx.Module()
+    module.block.append(make_function("sign", body, make_int_args("a")))
+
+    ir_result = LLVMLiteIR().translate(module)
+    assert "iftmp" not in ir_result
+    assert "ifcont" not in ir_result
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["sign"](-5) == -1
+    assert jit_module["sign"](5) == 1
+
+
+def test_if_declaration() -> None:
+    """Test an `if` whose blocks end in a declaration."""
+    then = astx.Block()
+    then.append(
+        astx.VariableDeclaration(
+            name="t", type_=astx.Int32(), value=astx.LiteralInt32(1)
+        )
+    )
+    body = astx.Block()
+    body.append(astx.IfStmt(condition=is_negative(), then=then))
+    body.append(astx.FunctionReturn(astx.Variable("a")))
+    module = astx.Module()
+    module.block.append(make_function("identity", body, make_int_args("a")))
+
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["identity"](-5) == -5  # noqa: PLR2004
+    assert jit_module["identity"](5) == 5  # noqa: PLR2004
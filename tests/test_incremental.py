@@ -0,0 +1,128 @@
+"""Tests for the incremental builds."""
+
+import os
+import subprocess
+import tempfile
+
+import astx
+
+from irx.builders.incremental import BUILTINS_UNIT, IncrementalBuilder
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import make_function as make_int_function
+from .conftest import make_int_args, make_return_block
+
+
+def make_function(name: str, n_args: int, value: int) -> astx.Function:
+    """Create a function that returns the sum of its args and a value."""
+    expr: astx.DataType = astx.LiteralInt32(value)
+    for idx in range(n_args):
+        expr = astx.BinaryOp("+", expr, astx.Variable(f"x{idx}"))
+    args = make_int_args(*[f"x{idx}" for idx in range(n_args)])
+    return make_int_function(name, make_return_block(expr), args)
+
+
+def make_module(
+    value_a: int = 1, value_b: int = 2, n_args_b: int = 1
+) -> astx.Module:
+    """Create a module where main returns `fn_a() + fn_b(...)`."""
+    fn_a = make_function("fn_a", 0, value_a)
+    fn_b = make_function("fn_b", n_args_b, value_b)
+
+    call_b = astx.FunctionCall(
+        fn_b, [astx.LiteralInt32(10) for _ in range(n_args_b)]
+    )
+    main_block = make_return_block(
+        astx.BinaryOp("+", astx.FunctionCall(fn_a, []), call_b)
+    )
+
+    module = astx.Module()
+    module.block.append(fn_a)
+    module.block.append(fn_b)
+    module.block.append(make_int_function("main", main_block))
+    return module
+
+
+def run(builder: IncrementalBuilder, module: astx.Module) -> int:
+    """Build and run the module, returning its exit code."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "main")
+        builder.build(module, output_file)
+        return subprocess.run([output_file], check=False).returncode
+
+
+def test_incremental_build() -> None:
+    """Test that only the changed functions are compiled again."""
+    builder = IncrementalBuilder(shards=None)
+
+    assert run(builder, make_module()) == 13  # noqa: PLR2004
+    assert sorted(builder.recompiled) == [
+        BUILTINS_UNIT,
+        "fn_a",
+        "fn_b",
+        "main",
+    ]
+
+    # same module, created again
+    assert run(builder, make_module()) == 13  # noqa: PLR2004
+    assert builder.recompiled == []
+
+    # the body of a callee changed, its callers are kept
+    assert run(builder, make_module(value_a=5)) == 17  # noqa: PLR2004
+    assert builder.recompiled == ["fn_a"]
+
+    # the signature of a callee changed, its callers are compiled again
+    assert run(builder, make_module(value_a=5, n_args_b=2)) == 27  # noqa: PLR2004
+    assert sorted(builder.recompiled) == ["fn_b", "main"]
+
+
+def test_incremental_build_shards() -> None:
+    """Test that the shards with changed functions are compiled again."""
+    builder = IncrementalBuilder(shards=2)
+
+    assert run(builder, make_module()) == 13  # noqa: PLR2004
+    assert run(builder, make_module()) == 13  # noqa: PLR2004
+    assert builder.changed == []
+    assert builder.recompiled == []
+
+    assert run(builder, make_module(value_b=4)) == 15  # noqa: PLR2004
+    assert builder.changed == ["fn_b"]
+    assert "fn_b" in builder.recompiled
+    assert BUILTINS_UNIT not in builder.recompiled
+
+
+def test_incremental_translate() -> None:
+    """Test the LLVM-IR of the module built incrementally."""
+    builder = IncrementalBuilder(opt_level=2)
+    ir_result = builder.translate(make_module())
+
+    for name in ("fn_a", "fn_b", "main", "putchard"):
+        assert f"define i32 @{name}(" in ir_result
+
+
+def test_incremental_fold_and_prune() -> None:
+    """Test that the units are folded and pruned like a full build."""
+    module = make_module()
+    fn_a = module.nodes[0]
+    assert isinstance(fn_a, astx.Function)
+    # fn_a returns (1 + 2) * 4
+    fn_a.body.nodes[0] = astx.FunctionReturn(
+        astx.BinaryOp(
+            "*",
+            astx.BinaryOp("+", astx.LiteralInt32(1), astx.LiteralInt32(2)),
+            astx.LiteralInt32(4),
+        )
+    )
+    module.block.append(make_function("unused", 0, 1))
+
+    builder = IncrementalBuilder(shards=None, roots=["main"])
+    ir_result = builder.translate(module)
+    assert "define i32 @unused(" not in ir_result
+    assert "unused" not in builder.recompiled
+
+    full_result = LLVMLiteIR(roots=["main"]).translate(module)
+    for result in (ir_result, full_result.replace('"', "")):
+        fn_a_body = result.split("@fn_a(")[1].split("}", maxsplit=1)[0]
+        assert "ret i32 12" in fn_a_body
+        assert "mul" not in fn_a_body
+    assert run(builder, module) == 24  # noqa: PLR2004
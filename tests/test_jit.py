@@ -0,0 +1,69 @@
+"""Tests for the in-process JIT execution."""
+
+import gc
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import (
+    make_constant_function,
+    make_function,
+    make_int_args,
+    make_return_block,
+)
+
+
+@pytest.fixture
+def fn_sub() -> astx.AST:
+    """Create a fixture for a function `sub`."""
+    return make_function(
+        "sub",
+        make_return_block(astx.Variable("x") - astx.Variable("y")),
+        make_int_args("x", "y"),
+    )
+
+
+def test_jit_function_call(fn_sub: astx.AST) -> None:
+    """Test calling a JIT compiled function with arguments."""
+    builder = LLVMLiteIR()
+
+    module = builder.module()
+    module.block.append(fn_sub)
+
+    module.block.append(make_constant_function("main", 7))
+
+    jit_module = builder.jit(module)
+
+    assert "sub" in jit_module
+    assert "main" in jit_module.function_names
+    assert jit_module["main"]() == 7  # noqa: PLR2004
+    assert jit_module.get_function("sub")(50, 8) == 42  # noqa: PLR2004
+    assert jit_module["sub"](-1, 1) == -2  # noqa: PLR2004
+
+
+def test_jit_unknown_function(fn_sub: astx.AST) -> None:
+    """Test that the JIT module rejects undefined functions."""
+    builder = LLVMLiteIR()
+
+    module = builder.module()
+    module.block.append(fn_sub)
+
+    jit_module = builder.jit(module)
+
+    with pytest.raises(Exception, match="Function not defined"):
+        jit_module["putchar"]
+
+
+def test_jit_function_outlives_module(fn_sub: astx.AST) -> None:
+    """Test that a compiled function keeps its JIT module alive."""
+    builder = LLVMLiteIR()
+
+    module = builder.module()
+    module.block.append(fn_sub)
+
+    sub = builder.jit(module)["sub"]
+    gc.collect()
+
+    assert sub(3, 1) == 2  # noqa: PLR2004
@@ -0,0 +1,140 @@
+"""Test the optimization hints of the loops."""
+
+import astx
+import pytest
+
+from irx.builders.hints import (
+    LoopHints,
+    get_loop_hints,
+    get_loop_metadata,
+    set_loop_hints,
+)
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .test_for_loops import make_add_to_acc, make_range, make_sum
+
+
+def make_float_sum(hints: LoopHints) -> astx.Module:
+    """Create a `sum_to(n)` function with a float loop with hints."""
+    loop = make_range(
+        "i", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("i"))
+    )
+    return make_sum(set_loop_hints(loop, hints), astx.Float64())
+
+
+def test_loop_hints_metadata() -> None:
+    """Test that the hints are attached to the latch branch."""
+    module = make_float_sum(
+        LoopHints(unroll_count=4, interleave_count=2, vectorize=False)
+    )
+    ir_result = LLVMLiteIR().translate(module)
+
+    latch = ir_result.split("loop.body:")[1].split("loop.exit:")[0]
+    assert 'br label %"loop.header", !llvm.loop !3' in latch
+    assert "!3 = !{ !3, !0, !1, !2 }" in ir_result
+
+    (loop,) = get_loop_metadata(ir_result)
+    assert loop.function == "sum_to"
+    assert loop.block == "loop.body"
+    assert loop.properties == {
+        "llvm.loop.unroll.count": 4,
+        "llvm.loop.vectorize.enable": 0,
+        "llvm.loop.interleave.count": 2,
+    }
+
+
+def test_loop_hints_distinct_ids() -> None:
+    """Test that loops with the same hints have distinct loop IDs."""
+    hints = LoopHints(vectorize_width=4)
+    first = make_range(
+        "i", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("i"))
+    )
+    second = make_range(
+        "j", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("j"))
+    )
+    body = astx.Block()
+    body.append(set_loop_hints(first, hints))
+    body.append(set_loop_hints(second, hints))
+    module = make_sum(body)
+
+    ir_result = LLVMLiteIR().translate(module)
+    assert "!2 = !{ !2, !0, !1 }" in ir_result
+    assert "!3 = !{ !3, !0, !1 }" in ir_result
+    loops = get_loop_metadata(ir_result)
+    assert len(loops) == 2  # noqa: PLR2004
+    assert loops[0].properties == loops[1].properties
+
+
+@pytest.mark.parametrize("width", [2, 8])
+def test_loop_hints_vectorize_width(width: int) -> None:
+    """Test that a float reduction is vectorized with the given width."""
+    module = make_float_sum(LoopHints(vectorize_width=width))
+    builder = LLVMLiteIR(opt_level=2)
+
+    # without fast-math, the reduction is only vectorized by the hints
+    vector_loops = [
+        loop
+        for loop in get_loop_metadata(builder.translate(module))
+        if loop.vector_width is not None
+    ]
+    assert len(vector_loops) == 1
+    assert vector_loops[0].is_vectorized
+    assert vector_loops[0].vector_width == width
+    assert builder.jit(module)["sum_to"](100) == 4950.0  # noqa: PLR2004
+
+
+def test_loop_hints_disable_vectorize() -> None:
+    """Test that the vectorization of a loop can be disabled."""
+    module = make_float_sum(LoopHints(vectorize=False))
+    builder = LLVMLiteIR(opt_level=3, fast_math=True)
+
+    ir_result = builder.translate(module)
+    assert "vector.body" not in ir_result
+    assert not any(loop.is_vectorized for loop in get_loop_metadata(ir_result))
+    assert builder.jit(module)["sum_to"](100) == 4950.0  # noqa: PLR2004
+
+
+def test_loop_hints_unroll_count() -> None:
+    """Test that a loop is unrolled by the given count."""
+    module = make_float_sum(LoopHints(unroll_count=4, vectorize=False))
+    builder = LLVMLiteIR(opt_level=2)
+
+    ir_result = builder.translate(module)
+    loops = {loop.block: loop for loop in get_loop_metadata(ir_result)}
+    # the unrolled loop is marked so it isn't unrolled again
+    assert "llvm.loop.unroll.disable" in loops["loop.body"].properties
+    body = ir_result.split("\nloop.body:")[1].split("\n\n")[0]
+    assert body.count("fadd") == 4  # noqa: PLR2004
+    assert builder.jit(module)["sum_to"](101) == 5050.0  # noqa: PLR2004
+
+
+def test_loop_hints_cache_key() -> None:
+    """Test that the hints are part of the cache key."""
+    builder = LLVMLiteIR()
+    module = make_float_sum(LoopHints(vectorize_width=4))
+    key = builder.get_cache_key(module, 2, 0)
+    assert key == builder.get_cache_key(
+        make_float_sum(LoopHints(vectorize_width=4)), 2, 0
+    )
+    assert key != builder.get_cache_key(
+        make_float_sum(LoopHints(vectorize_width=8)), 2, 0
+    )
+
+
+def test_loop_hints_set_and_remove() -> None:
+    """Test setting, removing and validating the hints."""
+    loop = make_range(
+        "i", 0, astx.Variable("n"), 1, make_add_to_acc(astx.Variable("i"))
+    )
+    hints = LoopHints(unroll_count=2)
+    assert set_loop_hints(loop, hints) is loop
+    assert get_loop_hints(loop) is hints
+    set_loop_hints(loop, None)
+    assert get_loop_hints(loop) is None
+
+    with pytest.raises(Exception, match="not supported"):
+        set_loop_hints(astx.Block(), hints)  # type: ignore[arg-type]
+    with pytest.raises(Exception, match="must be positive"):
+        LoopHints(vectorize_width=0)
+    with pytest.raises(Exception, match="vectorize=False"):
+        LoopHints(vectorize_width=4, vectorize=False)
@@ -8,7 +8,7 @@ import pytest
 from irx.builders.base import Builder
 from irx.builders.llvmliteir import LLVMLiteIR
 
-from .conftest import check_result
+from .conftest import check_result, make_constant_function
 
 
 @pytest.fixture
@@ -65,3 +65,47 @@ def test_module_fn_main(
     module.block.append(main_fn)
 
     check_result(action, builder, module, expected_file)
+
+
+def test_module_translate_and_build(fn_add: astx.AST) -> None:
+    """Test translating, building and compiling the same module."""
+    builder = LLVMLiteIR()
+
+    module = builder.module()
+    module.block.append(fn_add)
+
+    main_proto = astx.FunctionPrototype(
+        name="main", args=astx.Arguments(), return_type=astx.Int32()
+    )
+    main_block = astx.Block()
+    main_block.append(astx.FunctionReturn(astx.LiteralInt32(0)))
+    module.block.append(astx.Function(prototype=main_proto, body=main_block))
+
+    result = builder.translate(module)
+    assert 'define i32 @"add"' in result
+
+    # the LLVM-IR is parsed only once for the same module
+    module_ref = builder.parse(module)
+    assert builder.parse(module) is module_ref
+
+    check_result("build", builder, module)
+    assert builder.jit(module)["add"](1, 2) == 3  # noqa: PLR2004
+
+
+def test_module_jit_many_modules() -> None:
+    """Test compiling different and changed modules with one builder."""
+    builder = LLVMLiteIR()
+
+    first = builder.module()
+    first.block.append(make_constant_function("f", 1))
+    second = builder.module()
+    second.block.append(make_constant_function("f", 2))
+
+    assert builder.jit(first)["f"]() == 1
+    assert builder.jit(second)["f"]() == 2  # noqa: PLR2004
+    assert builder.jit(first)["f"]() == 1
+
+    # the module changed in place is translated again
+    first.block.append(make_constant_function("g", 3))
+    jit_module = builder.jit(first)
+    assert (jit_module["f"](), jit_module["g"]()) == (1, 3)
@@ -0,0 +1,89 @@
+"""Tests for the LLVM optimization pipeline."""
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import (
+    check_result,
+    make_constant_function,
+    make_function,
+    make_int_args,
+    make_return_block,
+)
+
+
+def make_module(builder: LLVMLiteIR) -> astx.Module:
+    """Create a module with a function `twice` and a main function."""
+    module = builder.module()
+    module.block.append(
+        make_function(
+            "twice",
+            make_return_block(astx.Variable("x") * astx.LiteralInt32(2)),
+            make_int_args("x"),
+        )
+    )
+    module.block.append(make_constant_function("main", 0))
+    return module
+
+
+def test_translate_without_optimization() -> None:
+    """Test that the default builder doesn't run any pass."""
+    builder = LLVMLiteIR()
+    result = builder.translate(make_module(builder))
+
+    assert "alloca" in result
+    assert builder.optimization_report is None
+
+
+@pytest.mark.parametrize("opt_level", [1, 2, 3])
+def test_translate_optimized(opt_level: int) -> None:
+    """Test that the optimization pipeline promotes the allocas."""
+    builder = LLVMLiteIR(report_passes=True)
+    result = builder.translate(make_module(builder), opt_level=opt_level)
+
+    assert "alloca" not in result
+
+    report = builder.optimization_report
+    assert report is not None
+    assert report.opt_level == opt_level
+    assert report.passes
+    assert report.elapsed > 0
+
+
+def test_build_size_level() -> None:
+    """Test building with the builder size optimization level."""
+    builder = LLVMLiteIR(opt_level=2, size_level=2, report_passes=True)
+    check_result("build", builder, make_module(builder))
+
+    report = builder.optimization_report
+    assert report is not None
+    assert report.size_level == 2  # noqa: PLR2004
+    assert report.passes
+
+
+def test_optimized_without_pass_report() -> None:
+    """Test that the passes are only collected when they are requested."""
+    builder = LLVMLiteIR(opt_level=2)
+    builder.translate(make_module(builder))
+
+    report = builder.optimization_report
+    assert report is not None
+    assert report.opt_level == 2  # noqa: PLR2004
+    assert report.passes == []
+
+
+def test_jit_optimized() -> None:
+    """Test the JIT execution with the optimization pipeline."""
+    builder = LLVMLiteIR(opt_level=3)
+    jit_module = builder.jit(make_module(builder))
+
+    assert jit_module["twice"](3) == 6  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("levels", [(4, 0), (-1, 0), (2, 3)])
+def test_invalid_levels(levels: tuple[int, int]) -> None:
+    """Test that invalid optimization levels are rejected."""
+    with pytest.raises(Exception, match="not valid"):
+        LLVMLiteIR(opt_level=levels[0], size_level=levels[1])
@@ -0,0 +1,72 @@
+"""Tests for the parallel compilation of module partitions."""
+
+import os
+import subprocess
+import tempfile
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.partition import count_nodes, partition_module
+
+from .conftest import make_function, make_int_args, make_return_block
+
+
+def make_add_function(name: str, value: int) -> astx.Function:
+    """Create a function `name(x)` that returns `x + value`."""
+    return make_function(
+        name,
+        make_return_block(astx.Variable("x") + astx.LiteralInt32(value)),
+        make_int_args("x"),
+    )
+
+
+def make_module() -> astx.Module:
+    """Create a module where main calls functions of the module."""
+    module = astx.Module()
+    functions = [make_add_function(f"add_{idx}", idx) for idx in range(4)]
+    for fn in functions:
+        module.block.append(fn)
+
+    # main returns add_3(add_2(add_1(1))) = 7
+    expr: astx.DataType = astx.LiteralInt32(1)
+    for fn in functions[1:]:
+        expr = astx.FunctionCall(fn, [expr])
+
+    module.block.append(make_function("main", make_return_block(expr)))
+    return module
+
+
+def test_partition_module() -> None:
+    """Test that the functions are split in balanced partitions."""
+    module = make_module()
+    partitions = partition_module(module, 3)
+
+    assert len(partitions) == 3  # noqa: PLR2004
+    nodes = [node for partition in partitions for node in partition.nodes]
+    assert sorted(map(id, nodes)) == sorted(map(id, module.nodes))
+
+    sizes = [count_nodes(partition) for partition in partitions]
+    biggest = max(count_nodes(node) for node in module.nodes)
+    assert max(sizes) - min(sizes) <= biggest
+
+    assert len(partition_module(module, 10)) == len(module.nodes)
+    with pytest.raises(Exception, match="must be positive"):
+        partition_module(module, 0)
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_build_partitions(opt_level: int) -> None:
+    """Test building a module compiled in parallel partitions."""
+    builder = LLVMLiteIR(opt_level=opt_level, partitions=3)
+    module = make_module()
+
+    objects = builder.emit_objects(module)
+    assert len(objects) == 3  # noqa: PLR2004
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "main")
+        builder.build(module, output_file=output_file)
+        process = subprocess.run([output_file], check=False)
+        assert process.returncode == 7  # noqa: PLR2004
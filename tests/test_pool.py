@@ -0,0 +1,49 @@
+"""Tests for the builder reuse (reset, pool and shared target machines)."""
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.pool import BuilderPool
+from irx.builders.target import get_target_machine
+
+from .conftest import make_constant_module
+
+
+def test_shared_target_machine() -> None:
+    """Test that the builders share the same target machine."""
+    assert get_target_machine() is get_target_machine()
+    assert (
+        LLVMLiteIR().translator.target_machine
+        is LLVMLiteIR().translator.target_machine
+    )
+
+
+def test_builder_reset() -> None:
+    """Test that a builder can translate a new module after reset."""
+    builder = LLVMLiteIR()
+    ir_first = builder.translate(make_constant_module(1, "first"))
+    assert '@"first"' in ir_first
+
+    builder.reset()
+    ir_second = builder.translate(make_constant_module(2, "second"))
+    assert '@"second"' in ir_second
+    assert '@"first"' not in ir_second
+    assert '@"putchard"' in ir_second
+
+
+def test_builder_pool() -> None:
+    """Test that the pool reuses the released builders."""
+    pool: BuilderPool[LLVMLiteIR] = BuilderPool(LLVMLiteIR, max_size=1)
+
+    with pool.builder() as builder:
+        builder.translate(make_constant_module(1, "first"))
+    assert len(pool) == 1
+
+    with pool.builder() as reused:
+        assert reused is builder
+        ir_second = reused.translate(make_constant_module(2, "second"))
+        assert '@"first"' not in ir_second
+    assert len(pool) == 1
+
+    extra = pool.acquire()
+    pool.release(pool.acquire())
+    pool.release(extra)
+    assert len(pool) == 1
@@ -0,0 +1,169 @@
+"""Tests for the instrumented builds and the profile-guided builds."""
+
+import os
+import subprocess
+import tempfile
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.profile import MAX_BRANCH_WEIGHT, BlockProfile
+
+from .conftest import make_function, make_int_args
+from .test_for_loops import make_add_to_acc, make_range
+
+
+def make_assignment(value: int) -> astx.Block:
+    """Create a block with `r = value`."""
+    block = astx.Block()
+    block.append(
+        astx.BinaryOp("=", astx.Variable("r"), astx.LiteralInt32(value))
+    )
+    return block
+
+
+def make_module() -> astx.Module:
+    """
+    Create a module where `main` calls `classify(i)` for `i` in `0..100`.
+
+    `classify(x)` returns 1 when `x < 10`, otherwise 2, so `main` returns
+    190. `unused` is never called.
+    """
+    body = astx.Block()
+    body.append(
+        astx.VariableDeclaration(
+            name="r", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        )
+    )
+    body.append(
+        astx.IfStmt(
+            condition=astx.BinaryOp(
+                "<", astx.Variable("x"), astx.LiteralInt32(10)
+            ),
+            then=make_assignment(1),
+            else_=make_assignment(2),
+        )
+    )
+    body.append(astx.FunctionReturn(astx.Variable("r")))
+    classify = make_function("classify", body, make_int_args("x"))
+
+    body = astx.Block()
+    body.append(astx.FunctionReturn(astx.Variable("x")))
+    unused = make_function("unused", body, make_int_args("x"))
+
+    body = astx.Block()
+    body.append(
+        astx.VariableDeclaration(
+            name="acc", type_=astx.Int32(), value=astx.LiteralInt32(0)
+        )
+    )
+    body.append(
+        make_range(
+            "i",
+            0,
+            astx.LiteralInt32(100),
+            1,
+            make_add_to_acc(astx.FunctionCall(classify, [astx.Variable("i")])),
+        )
+    )
+    body.append(astx.FunctionReturn(astx.Variable("acc")))
+
+    module = astx.Module()
+    for function in (classify, unused, make_function("main", body)):
+        module.block.append(function)
+    return module
+
+
+def test_block_profile() -> None:
+    """Test loading, merging and reading the counts of a profile."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "profile.txt")
+        with open(path, "w") as f:
+            f.write("f:entry 100\nf:then 1\nf:else 9\ng:entry 0\nf:then 2\n")
+        profile = BlockProfile.load(path)
+        assert profile.get_count("f", "then") == 3  # noqa: PLR2004
+        assert profile.get_count("f", "loop.body") is None
+
+        profile.merge(BlockProfile({"h:entry": 1}))
+        profile.save(path)
+        assert BlockProfile.load(path).counts == profile.counts
+
+        with open(path, "a") as f:
+            f.write("f:then many\n")
+        with pytest.raises(Exception, match="profile line not valid"):
+            BlockProfile.load(path)
+
+    assert profile.get_branch_weights("f", "then", "else") == (4, 10)
+    assert profile.get_branch_weights("f", "then", "loop.exit") is None
+    assert profile.get_function_temperature("f") == "hot"
+    assert profile.get_function_temperature("g") == "cold"
+    # entered less than 10% of the times of `f`
+    assert profile.get_function_temperature("h") is None
+    assert profile.get_max_entry_count() == 100  # noqa: PLR2004
+    # the most entered function changes with the merged counts
+    profile.merge(BlockProfile({"h:entry": 2000}))
+    assert profile.get_max_entry_count() == 2001  # noqa: PLR2004
+    assert profile.get_function_temperature("f") is None
+    assert profile.get_function_temperature("h") == "hot"
+
+    # the weights are scaled down to 32 bits
+    profile = BlockProfile({"f:a": 2**40, "f:b": 2**20})
+    weights = profile.get_branch_weights("f", "a", "b")
+    assert weights is not None
+    assert max(weights) <= MAX_BRANCH_WEIGHT
+    assert weights[0] / weights[1] == pytest.approx(2**20, rel=0.01)
+
+
+@pytest.mark.parametrize("partitions", [1, 2])
+def test_profile_guided_build(partitions: int) -> None:
+    """Test building with the profile of the instrumented program."""
+    module = make_module()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "profile.txt")
+        output_file = os.path.join(tmp_dir, "main")
+
+        builder = LLVMLiteIR(
+            opt_level=2, partitions=partitions, profile_generate=path
+        )
+        builder.build(module, output_file)
+        for _ in range(2):
+            process = subprocess.run([output_file], check=False)
+            assert process.returncode == 190  # noqa: PLR2004
+
+        # the counts of the two runs are added up
+        profile = BlockProfile.load(path)
+        assert profile.counts == {
+            "classify:entry": 200,
+            "classify:then": 20,
+            "classify:else": 180,
+            "unused:entry": 0,
+            "main:entry": 2,
+            "main:loop.body": 200,
+            "main:loop.exit": 2,
+        }
+
+        builder = LLVMLiteIR(opt_level=2, profile_use=path)
+        ir_result = builder.translate(module, opt_level=0)
+        builder.build(module, output_file)
+        process = subprocess.run([output_file], check=False)
+        assert process.returncode == 190  # noqa: PLR2004
+
+    assert '!"branch_weights", i32 21, i32 181' in ir_result
+    assert '!"branch_weights", i32 201, i32 3' in ir_result
+    assert '!"function_entry_count", i64 200' in ir_result
+    assert '@"classify"(i32 %"x") inlinehint' in ir_result
+    assert '@"unused"(i32 %"x") cold' in ir_result
+    assert "__irx_profile" not in ir_result
+
+
+def test_profile_errors() -> None:
+    """Test the builds that can't be instrumented."""
+    with pytest.raises(Exception, match="can't be used together"):
+        LLVMLiteIR(profile_generate="a.txt", profile_use=BlockProfile())
+
+    builder = LLVMLiteIR(profile_generate="profile.txt")
+    with pytest.raises(Exception, match="can't be compiled by jit"):
+        builder.jit(make_module())
+    with pytest.raises(Exception, match="only ASTx modules"):
+        builder.translate(make_module().nodes[1])
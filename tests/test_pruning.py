@@ -0,0 +1,183 @@
+"""Tests for the pruning of the functions that are not reachable."""
+
+import os
+import subprocess
+import tempfile
+
+from typing import cast
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.pruning import (
+    get_call_graph,
+    get_reachable_functions,
+    prune_module,
+)
+
+from .conftest import make_function as make_int_function
+from .conftest import make_int_args, make_return_block
+
+# the builtin function, only used as callee (it is not in the modules)
+PUTCHARD = make_int_function("putchard", astx.Block(), make_int_args("x"))
+
+
+def make_function(
+    name: str, *callees: astx.Function, value: int = 1
+) -> astx.Function:
+    """Create a function `name()` that returns `value` plus its callees."""
+    expr: astx.DataType = astx.LiteralInt32(value)
+    for callee in callees:
+        args = [astx.LiteralInt32(33)] if callee is PUTCHARD else []
+        expr = astx.BinaryOp("+", expr, astx.FunctionCall(callee, args))
+    return make_int_function(name, make_return_block(expr))
+
+
+def make_module() -> astx.Module:
+    """
+    Create a module where only some functions are reachable from main.
+
+    main calls helper, that calls putchard and leaf; unused calls leaf and
+    dead calls itself. main returns 1 + (1 + 0 + 1) = 3. leaf is the
+    biggest function, so putchard isn't called from the first partition.
+    """
+    leaf = make_function("leaf")
+    expr: astx.DataType = astx.LiteralInt32(1)
+    for _ in range(10):
+        expr = astx.BinaryOp("+", expr, astx.LiteralInt32(0))
+    leaf.body.nodes[0] = astx.FunctionReturn(expr)
+    helper = make_function("helper", PUTCHARD, leaf)
+    unused = make_function("unused", leaf)
+    dead = make_function("dead")
+    dead.body.append(astx.FunctionCall(dead, []))
+    main = make_function("main", helper)
+
+    module = astx.Module()
+    for function in (leaf, unused, helper, dead, main):
+        module.block.append(function)
+    return module
+
+
+def test_call_graph() -> None:
+    """Test the callees and the reachable functions of a module."""
+    module = make_module()
+    assert get_call_graph(module) == {
+        "leaf": set(),
+        "unused": {"leaf"},
+        "helper": {"putchard", "leaf"},
+        "dead": {"dead"},
+        "main": {"helper"},
+    }
+    assert get_reachable_functions(module, ["main"]) == {
+        "main",
+        "helper",
+        "leaf",
+        "putchard",
+    }
+    assert get_reachable_functions(module, ["dead"]) == {"dead"}
+
+    with pytest.raises(Exception, match="root function not defined: foo"):
+        get_reachable_functions(module, ["foo"])
+
+
+def test_prune_module() -> None:
+    """Test that a new module is created with the reachable functions."""
+    module = make_module()
+    nodes = list(module.nodes)
+
+    pruned, removed = prune_module(module, ["main"])
+    assert removed == 2  # noqa: PLR2004
+    assert [
+        cast(astx.Function, node).prototype.name for node in pruned.nodes
+    ] == [
+        "leaf",
+        "helper",
+        "main",
+    ]
+    assert module.nodes == nodes
+
+    pruned, removed = prune_module(module, ["main", "unused"])
+    assert removed == 1
+    pruned, removed = prune_module(module, [])
+    assert (len(pruned.nodes), removed) == (0, len(nodes))
+
+
+def test_prune_translate() -> None:
+    """Test that the builder only emits the reachable functions."""
+    builder = LLVMLiteIR(roots=["main"])
+    module = make_module()
+
+    ir_result = builder.translate(module)
+    assert '@"helper"' in ir_result
+    assert '@"unused"' not in ir_result
+    assert '@"dead"' not in ir_result
+    assert 'declare i32 @"putchar"' in ir_result
+    assert 'define i32 @"putchard"' in ir_result
+    assert builder.pruned_functions == 2  # noqa: PLR2004
+    assert "prune" in builder.stats.phases
+
+    # by default, all the functions are emitted
+    ir_result = LLVMLiteIR().translate(module)
+    assert '@"unused"' in ir_result
+    assert '@"dead"' in ir_result
+
+
+def test_prune_lazy_builtins() -> None:
+    """Test that the builtins are only added when they are called."""
+    module = astx.Module()
+    module.block.append(make_function("main", value=3))
+
+    ir_result = LLVMLiteIR(roots=["main"]).translate(module)
+    assert "putchar" not in ir_result
+    assert '"putchard"' in LLVMLiteIR().translate(module)
+
+    jit_module = LLVMLiteIR(opt_level=2, roots=["main"]).jit(module)
+    assert jit_module["main"]() == 3  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("partitions", [1, 3])
+def test_prune_build(partitions: int) -> None:
+    """Test building the reachable functions, also in partitions."""
+    # without folding, so leaf is still the biggest function
+    builder = LLVMLiteIR(
+        partitions=partitions, roots=["main"], fold_constants=False
+    )
+    module = make_module()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "main")
+        builder.build(module, output_file=output_file)
+        process = subprocess.run(
+            [output_file], check=False, capture_output=True
+        )
+        assert process.returncode == 3  # noqa: PLR2004
+        assert process.stdout == b"!"
+
+
+def test_prune_shared_library() -> None:
+    """Test that a shared library only exports the reachable functions."""
+    builder = LLVMLiteIR(roots=["helper"])
+    module = make_module()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "libhelper.so")
+        builder.build(module, output_file, shared=True)
+        library = builder.load_shared_library(module)
+
+        assert sorted(library.function_names) == [
+            "helper",
+            "leaf",
+            "putchard",
+        ]
+        with pytest.raises(Exception, match="Function not defined"):
+            library["main"]
+
+
+def test_prune_cache_key() -> None:
+    """Test that the roots are part of the cache key."""
+    module = make_module()
+    key = LLVMLiteIR(roots=["main"]).get_cache_key(module, 0, 0)
+    assert key == LLVMLiteIR(roots=("main",)).get_cache_key(module, 0, 0)
+    assert key != LLVMLiteIR().get_cache_key(module, 0, 0)
+    assert key != LLVMLiteIR(roots=["unused"]).get_cache_key(module, 0, 0)
@@ -0,0 +1,48 @@
+"""Tests for the shared library output."""
+
+import os
+import tempfile
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+
+from .conftest import make_function, make_int_args, make_return_block
+
+
+def make_operator_function(name: str, op_code: str) -> astx.Function:
+    """Create a function that applies the operator to its arguments."""
+    return make_function(
+        name,
+        make_return_block(
+            astx.BinaryOp(op_code, astx.Variable("x"), astx.Variable("y"))
+        ),
+        make_int_args("x", "y"),
+    )
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_shared_library(opt_level: int) -> None:
+    """Test building a shared library and calling its functions."""
+    builder = LLVMLiteIR(opt_level=opt_level)
+
+    module = builder.module()
+    module.block.append(make_operator_function("add", "+"))
+    module.block.append(make_operator_function("sub", "-"))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_file = os.path.join(tmpdir, "libkernels.so")
+        builder.build(module, output_file, shared=True)
+        library = builder.load_shared_library(module)
+
+        assert "add" in library
+        assert "sub" in library.function_names
+        for value in range(100):
+            assert library["add"](value, 2) == value + 2
+            assert library.get_function("sub")(value, 2) == value - 2
+
+        assert library["putchard"](10) == 0
+
+        with pytest.raises(Exception, match="Function not defined"):
+            library["mul"]
@@ -0,0 +1,78 @@
+"""Tests for the build instrumentation."""
+
+import json
+import os
+import tempfile
+
+import astx
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.stats import BuildStats
+
+from .conftest import make_main_module, make_return_block
+
+
+def make_module() -> astx.Module:
+    """Create a module with a main function that returns `1 + 2`."""
+    return make_main_module(
+        make_return_block(
+            astx.BinaryOp("+", astx.LiteralInt32(1), astx.LiteralInt32(2))
+        )
+    )
+
+
+def test_build_stats() -> None:
+    """Test the phases recorded by a build."""
+    builder = LLVMLiteIR(opt_level=2)
+    ended = []
+    builder.stats = BuildStats(
+        on_phase=lambda name, elapsed: ended.append(name)
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stats = builder.build(make_module(), os.path.join(tmpdir, "main"))
+        assert stats is builder.stats
+        assert list(stats.phases) == [
+            "fingerprint",
+            "fold",
+            "visit",
+            "stringify",
+            "parse_assembly",
+            "optimize",
+            "emit_object",
+            "write_objects",
+            "link",
+        ]
+        assert ended == list(stats.phases)
+        assert stats.total > 0
+        # visits are only profiled on demand
+        assert not stats.node_counts
+
+        trace_file = os.path.join(tmpdir, "build.trace.json")
+        stats.save_chrome_trace(trace_file)
+        with open(trace_file) as f:
+            trace = json.load(f)
+
+    events = trace["traceEvents"]
+    assert [event["name"] for event in events] == ended
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_build_stats_nodes() -> None:
+    """Test counting and timing the visits of each node type."""
+    # the constant operation of the module isn't folded
+    builder = LLVMLiteIR(fold_constants=False)
+    builder.stats = BuildStats(profile_nodes=True)
+    builder.translate(make_module())
+
+    stats = builder.stats
+    assert stats.node_counts["Module"] == 1
+    assert stats.node_counts["LiteralInt32"] == 2  # noqa: PLR2004
+    assert stats.node_counts["BinaryOp"] == 1
+    assert stats.node_times["Module"] >= stats.node_times["BinaryOp"]
+    # the dispatch table is restored after the translation
+    assert "_visit_table" not in vars(builder.translator)
+
+    builder.reset()
+    assert not stats.phases
+    assert not stats.node_counts
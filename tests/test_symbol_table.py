@@ -0,0 +1,109 @@
+"""Tests for the scoped symbol table and the scopes of the variables."""
+
+from typing import Optional
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.symbol_table import ScopedSymbolTable, SymbolEntry
+
+from .conftest import make_function, make_int_args
+
+
+def test_scoped_symbol_table() -> None:
+    """Test defining, shadowing and restoring names in nested scopes."""
+    table = ScopedSymbolTable()
+    table.define("x", 1)
+    assert table.depth == 0
+    assert (table.get("x"), table["x"], len(table)) == (1, 1, 1)
+
+    table.push_scope()
+    assert table.depth == 1
+    assert "x" in table
+    assert not table.is_local("x")
+    entry = table.define("x", 2)
+    table.define("y", 3)
+    assert table.is_local("x")
+    assert (table.get("x"), table.get("y")) == (2, 3)
+
+    # a name of the current scope is replaced, not shadowed again
+    assert table.define("x", 4) is entry
+    assert table.get("x") == 4  # noqa: PLR2004
+
+    table.pop_scope()
+    assert table.get("x") == 1
+    assert "y" not in table
+    assert table.get("y", 0) == 0
+    assert len(table.scopes) == 1
+
+    with pytest.raises(Exception, match="global scope"):
+        table.pop_scope()
+
+    table.push_scope()
+    table.define("z", 5)
+    table.clear()
+    assert (len(table), table.depth) == (0, 0)
+
+
+def test_symbol_entry_slots() -> None:
+    """Test that the entries don't have an instance dictionary."""
+    entry = SymbolEntry("x", 1, 0)
+    assert not hasattr(entry, "__dict__")
+    with pytest.raises(AttributeError):
+        entry.other = 1  # type: ignore[attr-defined]
+
+
+def make_block(name: str, value: int) -> astx.Block:
+    """Create a block that declares a variable."""
+    block = astx.Block()
+    block.append(
+        astx.VariableDeclaration(
+            name=name, type_=astx.Int32(), value=astx.LiteralInt32(value)
+        )
+    )
+    block.append(astx.Variable(name))
+    return block
+
+
+def make_module(result: Optional[astx.DataType] = None) -> astx.Module:
+    """
+    Create `pick(x)`, that declares `t` in both branches of an `if`.
+
+    It returns `result`, by default `x`.
+    """
+    block = astx.Block()
+    block.append(
+        astx.IfStmt(
+            condition=astx.Variable("x"),
+            then=make_block("t", 1),
+            else_=make_block("t", 2),
+        )
+    )
+    block.append(
+        astx.FunctionReturn(
+            result if result is not None else astx.Variable("x")
+        )
+    )
+    module = astx.Module()
+    module.block.append(make_function("pick", block, make_int_args("x")))
+    return module
+
+
+def test_variables_per_block() -> None:
+    """Test that the variables of sibling blocks don't conflict."""
+    jit_module = LLVMLiteIR().jit(make_module())
+    assert jit_module["pick"](3) == 3  # noqa: PLR2004
+
+    # the variable isn't visible after its block
+    with pytest.raises(Exception, match="Unknown variable name: t"):
+        LLVMLiteIR().translate(make_module(astx.Variable("t")))
+
+    # the arguments can't be declared again, even in a nested block
+    body = astx.Block()
+    body.append(make_block("t", 1))
+    body.append(astx.FunctionReturn(astx.Variable("t")))
+    module = astx.Module()
+    module.block.append(make_function("main", body, make_int_args("t")))
+    with pytest.raises(Exception, match="Variable already declared: t"):
+        LLVMLiteIR().translate(module)
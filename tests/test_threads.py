@@ -0,0 +1,130 @@
+"""Stress tests for the builders used by many threads."""
+
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import astx
+import pytest
+
+from irx.builders.llvmliteir import LLVMLiteIR, LLVMLiteIRVisitor
+from irx.builders.pool import BuilderPool
+
+from .test_for_loops import make_add_to_acc, make_range, make_sum
+
+N_MODULES = 48
+N_THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def switch_often() -> Iterator[None]:
+    """Switch between the threads as often as possible."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def make_module(idx: int) -> astx.Module:
+    """Create `sum_{idx}(n)`, that returns `idx * sum(range(n))`."""
+    loop = make_range(
+        "i",
+        0,
+        astx.Variable("n"),
+        1,
+        make_add_to_acc(
+            astx.BinaryOp("*", astx.Variable("i"), astx.LiteralInt32(idx))
+        ),
+    )
+    module = make_sum(loop)
+    function = module.nodes[0]
+    assert isinstance(function, astx.Function)
+    function.prototype.name = f"sum_{idx}"
+    return module
+
+
+def test_visitor_state_per_instance() -> None:
+    """Test that the translators don't share any mutable state."""
+    assert "symbols" not in vars(LLVMLiteIRVisitor)
+    assert "result_stack" not in vars(LLVMLiteIRVisitor)
+
+    first, second = LLVMLiteIRVisitor(), LLVMLiteIRVisitor()
+    assert first.symbols is not second.symbols
+    assert first.result_stack is not second.result_stack
+    assert first._llvm.context is not second._llvm.context
+
+    context = first._llvm.context
+    first.reset()
+    assert first._llvm.context is not context
+    assert first._llvm.module.context is first._llvm.context
+
+    # the same module is translated twice, by two builders in a row
+    module = make_module(1)
+    assert LLVMLiteIR().translate(module) == LLVMLiteIR().translate(module)
+
+
+def test_variables_per_function() -> None:
+    """Test that two functions can declare variables with the same name."""
+    module = make_module(1)
+    module.block.append(make_module(2).nodes[0])
+    jit_module = LLVMLiteIR().jit(module)
+    assert jit_module["sum_1"](10) == 45  # noqa: PLR2004
+    assert jit_module["sum_2"](10) == 90  # noqa: PLR2004
+
+
+def test_translate_concurrently() -> None:
+    """Test translating and compiling many modules in a thread pool."""
+    modules = [make_module(idx) for idx in range(N_MODULES)]
+    expected = [LLVMLiteIR().translate(module) for module in modules]
+
+    def compile_module(idx: int) -> tuple[str, int]:
+        builder = LLVMLiteIR(opt_level=2)
+        ir_result = builder.translate(modules[idx], opt_level=0)
+        jit_module = builder.jit(modules[idx])
+        return ir_result, jit_module[f"sum_{idx}"](100)
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+        results = list(pool.map(compile_module, range(N_MODULES)))
+
+    for idx, (ir_result, value) in enumerate(results):
+        assert ir_result == expected[idx]
+        assert value == idx * 4950
+
+
+def test_pool_concurrently() -> None:
+    """Test reusing the builders of a pool in many threads."""
+    pool: BuilderPool[LLVMLiteIR] = BuilderPool(LLVMLiteIR, N_THREADS)
+    modules = [make_module(idx) for idx in range(N_MODULES)]
+
+    def emit_module(idx: int) -> tuple[str, bytes]:
+        with pool.builder() as builder:
+            return builder.translate(modules[idx]), builder.emit(modules[idx])
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        results = list(executor.map(emit_module, range(N_MODULES)))
+
+    for idx, (ir_result, object_data) in enumerate(results):
+        names = [
+            f"sum_{other}"
+            for other in range(N_MODULES)
+            if f'@"sum_{other}"(' in ir_result
+        ]
+        assert names == [f"sum_{idx}"]
+        assert object_data[:4] == b"\x7fELF"
+
+
+def test_shared_builder_concurrently() -> None:
+    """Test that the threads sharing a builder take turns."""
+    builder = LLVMLiteIR()
+    modules = [make_module(idx) for idx in range(N_MODULES)]
+
+    def compile_module(idx: int) -> bool:
+        # the modules are translated to the same LLVM module, that must
+        # stay valid after each translation
+        module_ref = builder.compile(modules[idx])
+        module_ref.verify()
+        return not module_ref.get_function(f"sum_{idx}").is_declaration
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        assert all(executor.map(compile_module, range(N_MODULES)))
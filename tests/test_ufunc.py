@@ -0,0 +1,173 @@
+"""Tests for the batch functions and the ufunc-style callables."""
+
+import array
+import os
+import tempfile
+
+import astx
+import pytest
+
+from astx.types.base import AnyType
+from irx.builders.llvmliteir import LLVMLiteIR
+from irx.builders.ufunc import Ufunc, get_ufunc, make_batch_function
+
+
+def make_scalar(
+    name: str, type_: AnyType, op_code: str = "*"
+) -> astx.Function:
+    """Create `name(x, y)`, that returns `x op y + 1`."""
+    proto = astx.FunctionPrototype(
+        name=name,
+        args=astx.Arguments(
+            astx.Argument("x", type_), astx.Argument("y", type_)
+        ),
+        return_type=type_,
+    )
+    block = astx.Block()
+    block.append(
+        astx.FunctionReturn(
+            astx.BinaryOp(
+                "+",
+                astx.BinaryOp(op_code, astx.Variable("x"), astx.Variable("y")),
+                astx.LiteralInt32(1),
+            )
+        )
+    )
+    return astx.Function(prototype=proto, body=block)
+
+
+def make_module(*functions: astx.Function) -> astx.Module:
+    """Create a module with the functions and their batch functions."""
+    module = astx.Module()
+    for function in functions:
+        module.block.append(function)
+        module.block.append(make_batch_function(function))
+    return module
+
+
+def test_batch_function_ir() -> None:
+    """Test the signature of the batch function and the inlined call."""
+    module = make_module(make_scalar("f", astx.Int32()))
+    ir_result = LLVMLiteIR().translate(module)
+    assert (
+        'define i32 @"f_batch"(i32* nocapture %"x.data", i64 %"x.len", '
+        'i32* nocapture %"y.data", i64 %"y.len", '
+        'i32* nocapture %"out.data", i64 %"out.len")'
+    ) in ir_result
+    assert 'call i32 @"f"' in ir_result
+
+    optimized = LLVMLiteIR(opt_level=2).translate(module)
+    batch = optimized.split("@f_batch(")[1]
+    assert "call" not in batch
+    assert "vector.body" in batch
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_ufunc_array(opt_level: int) -> None:
+    """Test a ufunc with `array.array` objects."""
+    module = make_module(make_scalar("f", astx.Int32()))
+    f = get_ufunc(LLVMLiteIR(opt_level=opt_level).jit(module), "f")
+    assert f.nin == 2  # noqa: PLR2004
+
+    x = array.array("i", range(10))
+    y = array.array("i", range(10, 20))
+    result = f(x, y)
+    assert isinstance(result, array.array)
+    assert list(result) == [a * b + 1 for a, b in zip(x, y)]
+
+    out = array.array("i", [0] * 10)
+    assert f(x, y, out=out) is out
+    assert out == result
+
+
+@pytest.mark.parametrize(
+    "type_,dtype",
+    [
+        (astx.Float64(), "float64"),
+        (astx.Float32(), "float32"),
+        (astx.Int16(), "int16"),
+        (astx.Int64(), "int64"),
+    ],
+)
+def test_ufunc_numpy(type_: AnyType, dtype: str) -> None:
+    """Test a ufunc with NumPy arrays, keeping the shape."""
+    np = pytest.importorskip("numpy")
+
+    module = make_module(make_scalar("f", type_, "-"))
+    f = get_ufunc(LLVMLiteIR(opt_level=2).jit(module), "f")
+    x = np.arange(24, dtype=dtype).reshape(4, 6)
+    y = np.ones((4, 6), dtype=dtype)
+    result = f(x, y)
+    assert result.dtype == np.dtype(dtype)
+    assert result.shape == (4, 6)
+    np.testing.assert_array_equal(result, x)
+
+
+def test_ufunc_shared_library() -> None:
+    """Test a ufunc of a shared library."""
+    np = pytest.importorskip("numpy")
+
+    builder = LLVMLiteIR(opt_level=2)
+    module = make_module(make_scalar("f", astx.Float64()))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        builder.build(module, os.path.join(tmpdir, "libf.so"), shared=True)
+        f = get_ufunc(builder.load_shared_library(module), "f")
+
+        # the inputs are only read, so they can be read-only, not the output
+        x = np.linspace(0, 1, 1000)
+        x.flags.writeable = False
+        np.testing.assert_array_equal(f(x, x), x * x + 1)
+        with pytest.raises(Exception, match="buffer must be writable"):
+            f(x, x, out=x)
+
+
+def test_ufunc_errors() -> None:
+    """Test the functions and arrays not supported."""
+    jit_module = LLVMLiteIR().jit(make_module(make_scalar("f", astx.Int32())))
+    f = get_ufunc(jit_module, "f")
+    x = array.array("i", range(4))
+
+    with pytest.raises(Exception, match="2 arguments expected"):
+        f(x)
+    with pytest.raises(Exception, match="lengths don't match"):
+        f(x, array.array("i", range(5)))
+    with pytest.raises(Exception, match="lengths don't match"):
+        f(x, x, out=array.array("i", range(3)))
+    with pytest.raises(Exception, match="buffer format not valid"):
+        f(x, array.array("d", range(4)))
+    with pytest.raises(Exception, match="batch function expected"):
+        Ufunc(jit_module["f"])
+
+    proto = astx.FunctionPrototype(
+        name="g",
+        args=astx.Arguments(astx.Argument("x", astx.Boolean())),
+        return_type=astx.Int32(),
+    )
+    with pytest.raises(Exception, match="argument type not supported"):
+        make_batch_function(astx.Function(prototype=proto, body=astx.Block()))
+
+
+def test_batch_function_names() -> None:
+    """Test that the names of the batch function don't clash."""
+    proto = astx.FunctionPrototype(
+        name="h",
+        args=astx.Arguments(
+            astx.Argument("out", astx.Float64()),
+            astx.Argument("i", astx.Float64()),
+        ),
+        return_type=astx.Float64(),
+    )
+    block = astx.Block()
+    block.append(
+        astx.FunctionReturn(
+            astx.BinaryOp("/", astx.Variable("out"), astx.Variable("i"))
+        )
+    )
+    function = astx.Function(prototype=proto, body=block)
+    module = astx.Module()
+    module.block.append(function)
+    module.block.append(make_batch_function(function, name="divide"))
+
+    divide = Ufunc(LLVMLiteIR(opt_level=1).jit(module)["divide"])
+    result = divide(array.array("d", [1, 4]), array.array("d", [2, 8]))
+    assert list(result) == [0.5, 0.5]